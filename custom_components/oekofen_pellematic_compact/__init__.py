@@ -1,10 +1,12 @@
 """The Ökofen Pellematic Compact Integration."""
 import asyncio
 import logging
+import os
 import re
 import time
 from datetime import timedelta
-from typing import Optional, Callable, Any, Dict, Set
+from functools import partial
+from typing import Optional, Callable, Any, Dict, List, Set
 from collections.abc import Awaitable
 import json
 import urllib
@@ -14,10 +16,31 @@ import voluptuous as vol
 import homeassistant.helpers.config_validation as cv
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME, CONF_HOST, CONF_SCAN_INTERVAL
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.core import callback
-from homeassistant.helpers.event import async_track_time_interval
-from .migration import async_migrate_entity_ids, async_check_and_warn_entity_changes, ENTITY_WARNING_SHOWN_KEY, MIGRATION_NOTIFICATION_SHOWN_KEY
+from homeassistant.components import websocket_api
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from .replay import (
+    RECORDING_SUFFIX,
+    ReplayedFetchError,
+    ReplayFinished,
+    TrafficRecorder,
+    TrafficReplay,
+    controller_password,
+)
+from .executor import async_run_controller_io, async_shutdown_controller_executor
+from .scheduler import async_get_poll_scheduler
+from .charset import decode_payload, detect_charset
+from .capabilities import build_capability_profile, is_current_profile, polls_with_metadata, response_has_metadata
+from .adaptive import AdaptiveInterval
+from .tiers import PollTiers, component_url
+from .components import ComponentIndex
+from .deadband import DeadbandFilter
+from .aggregation import WindowPublisher
+from .entity_filter import EntityFilter
+from .snapshot import SnapshotStore
+from .datalog import DataLogger
+from .migration import async_migrate_and_check_entities, ENTITY_WARNING_SHOWN_KEY, MIGRATION_NOTIFICATION_SHOWN_KEY
 from .const import (
     CONF_CHARSET,
     DEFAULT_CHARSET,
@@ -25,10 +48,39 @@ from .const import (
     DEFAULT_API_SUFFIX,
     CONF_OLD_FIRMWARE,
     DEFAULT_OLD_FIRMWARE,
+    CONF_FIXED_DELAY_POLLING,
+    DEFAULT_FIXED_DELAY_POLLING,
+    CONF_ADAPTIVE_POLLING,
+    DEFAULT_ADAPTIVE_POLLING,
+    CONF_MIN_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    MIN_FETCH_INTERVAL,
+    CONF_TIERED_POLLING,
+    DEFAULT_TIERED_POLLING,
+    CONF_FULL_REFRESH_INTERVAL,
+    DEFAULT_FULL_REFRESH_INTERVAL,
+    CONF_DEADBAND_FILTER,
+    DEFAULT_DEADBAND_FILTER,
+    CONF_DEADBAND_MAX_SILENCE,
+    DEFAULT_DEADBAND_MAX_SILENCE,
+    CONF_PUBLISH_INTERVAL,
+    DEFAULT_PUBLISH_INTERVAL,
+    CONF_SNAPSHOT_EVENT,
+    DEFAULT_SNAPSHOT_EVENT,
+    EVENT_SNAPSHOT,
+    CONF_DATA_LOG,
+    DEFAULT_DATA_LOG,
+    CONF_DATA_LOG_MAX_SIZE,
+    DEFAULT_DATA_LOG_MAX_SIZE,
+    CONF_CAPABILITIES,
     DEFAULT_HOST,
     DOMAIN,
     DEFAULT_NAME,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_RECORDING_MINUTES,
+    MAX_RECORDING_MINUTES,
     CONF_NUM_OF_HEATING_CIRCUIT,
     CONF_NUM_OF_HOT_WATER,
     CONF_NUM_OF_PELLEMATIC_HEATER,
@@ -89,28 +141,27 @@ def _api_response_has_metadata(data: dict) -> bool:
     Returns:
         True if response contains metadata, False if simple values only
     """
-    for section_key, section_value in data.items():
-        if isinstance(section_value, dict):
-            for field_key, field_value in section_value.items():
-                if isinstance(field_value, dict):
-                    if any(key in field_value for key in ['val', 'unit', 'factor', 'format']):
-                        return True
-    return False
+    return response_has_metadata(data)
 
 
-def _detect_api_config(host: str) -> tuple[str, str, bool]:
-    """Detect charset and API suffix from API response (blocking function for executor).
+def _probe_capabilities(
+    host: str, api_suffix: Optional[str] = None, charset: Optional[str] = None
+) -> tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Probe the controller once and build its capability profile (blocking function for executor).
     
-    Detection logic:
-    - Try '?' first and check if response contains metadata (val, unit, factor)
+    Detection logic (if no API suffix is given):
+    - Fetch with '?' and check if response contains metadata (val, unit, factor)
     - If HAS metadata → Modern firmware (v3.52+): use '?', old_firmware=False
     - If NO metadata → Old firmware (v3.10d-): use '??', old_firmware=True
     
     Args:
         host: The API host URL (without ? or ??)
+        api_suffix: Configured API suffix to probe with, None to detect it
+        charset: Configured charset to decode with, None to detect it
         
     Returns:
-        Tuple of (charset, api_suffix, old_firmware)
+        Tuple of (capability profile, parsed response). The response is None
+        if the hub polls with another suffix than the probe used.
         
     Raises:
         Exception: If API is unreachable or invalid
@@ -120,62 +171,62 @@ def _detect_api_config(host: str) -> tuple[str, str, bool]:
     
     # Remove any existing suffix
     clean_host = host.strip().rstrip('?')
-    charset = DEFAULT_CHARSET  # Default fallback
-    
-    # Try with single ? first (modern firmware)
-    url_single = clean_host + '?'
-    req = urllib.request.Request(url_single)
+    probe_suffix = api_suffix or '?'
+    req = urllib.request.Request(clean_host + probe_suffix)
     response = None
     
-    _LOGGER.debug("Checking API with '?' to detect firmware type...")
+    _LOGGER.debug("Probing API capabilities with '%s'...", probe_suffix)
     try:
         response = urllib.request.urlopen(req, timeout=10)  # Increased timeout to 10s for slow APIs
         raw_data = response.read()
-        
-        if not raw_data:
-            raise ValueError("Empty API response")
-        
-        # Detect charset with mixed encoding support
-        try:
-            raw_data.decode('utf-8')
-            charset = 'utf-8'
-        except UnicodeDecodeError:
-            # Try UTF-8 with replace to detect mixed encoding
-            decoded_utf8_replace = raw_data.decode('utf-8', errors='replace')
-            replacement_count = decoded_utf8_replace.count('�')
-            non_ascii_count = sum(1 for char in decoded_utf8_replace if ord(char) > 127)
-            
-            # If less than 20% of non-ASCII chars are problematic, prefer UTF-8
-            # This handles mixed encoding where most content is UTF-8 but some fields have ISO-8859-1 bytes
-            # Increased threshold from 10% to 20% to handle smaller responses
-            if non_ascii_count > 0 and replacement_count / non_ascii_count < 0.2:
-                charset = 'utf-8'
-            else:
-                charset = 'iso-8859-1'
-        
-        # Decode and parse
-        str_response = raw_data.decode(charset, 'ignore')
-        str_response = str_response.replace("L_statetext:", 'L_statetext":')
-        data = json.loads(str_response, strict=False)
-        
-        # Check if metadata exists
-        if _api_response_has_metadata(data):
-            # Modern firmware - has metadata with single ?
-            _LOGGER.info("API response has metadata with '?' - modern firmware detected")
-            return charset, '?', False  # old_firmware=False
-        else:
-            # Old firmware - no metadata with ?
-            _LOGGER.info("API response has no metadata with '?' - old firmware detected")
-            return charset, '??', True  # old_firmware=True
     except Exception as e:
-        # If ? fails completely, raise error
-        _LOGGER.error("Failed to fetch with '?': %s", e)
+        _LOGGER.error("Failed to fetch with '%s': %s", probe_suffix, e)
         raise
     finally:
         if response is not None:
             response.close()
     
-    # No second request here: the '?' response is enough to determine firmware type.
+    if not raw_data:
+        raise ValueError("Empty API response")
+    
+    if charset is None:
+        # Detect charset with mixed encoding support
+        detection = detect_charset(raw_data)
+        _LOGGER.debug(
+            "Detected charset '%s' (confidence %.2f, %d invalid UTF-8 sequences)",
+            detection.charset, detection.confidence, detection.invalid
+        )
+        charset = detection.charset
+    data = parse_api_response(raw_data, charset)
+    
+    if api_suffix is None:
+        if response_has_metadata(data):
+            _LOGGER.info("API response has metadata with '?' - modern firmware detected")
+            api_suffix = '?'
+        else:
+            _LOGGER.info("API response has no metadata with '?' - old firmware detected")
+            api_suffix = '??'
+    
+    profile = build_capability_profile(
+        data, charset, api_suffix, probe_suffix, discover_components_from_api(data)
+    )
+    return profile, data if api_suffix == probe_suffix else None
+
+
+def _detect_api_config(host: str) -> tuple[str, str, bool]:
+    """Detect charset and API suffix from API response (blocking function for executor).
+    
+    Args:
+        host: The API host URL (without ? or ??)
+        
+    Returns:
+        Tuple of (charset, api_suffix, old_firmware)
+        
+    Raises:
+        Exception: If API is unreachable or invalid
+    """
+    profile, _data = _probe_capabilities(host)
+    return profile[CONF_CHARSET], profile[CONF_API_SUFFIX], profile[CONF_OLD_FIRMWARE]
 
 
 def _detect_api_charset(host: str) -> str:
@@ -190,48 +241,8 @@ def _detect_api_charset(host: str) -> str:
     Raises:
         Exception: If API is unreachable or invalid
     """
-    if not host or host == DEFAULT_HOST:
-        # Don't try to connect to placeholder/invalid hosts
-        raise ValueError(f"Invalid host: {host}")
-    
-    url = host.strip()
-    if not url.endswith('?'):
-        url += '?'
-    
-    req = urllib.request.Request(url)
-    response = None
-    
-    try:
-        response = urllib.request.urlopen(req, timeout=5)
-        raw_data = response.read()
-        
-        if not raw_data:
-            raise ValueError("Empty API response")
-        
-        # Try UTF-8 first with strict decoding and mixed encoding support
-        try:
-            decoded_utf8 = raw_data.decode('utf-8')
-            # Check if it contains any non-ASCII characters
-            if any(ord(char) > 127 for char in decoded_utf8):
-                return 'utf-8'
-            # Only ASCII characters - default to UTF-8 (modern standard)
-            return 'utf-8'
-        except UnicodeDecodeError:
-            # Try UTF-8 with replace to detect mixed encoding
-            decoded_utf8_replace = raw_data.decode('utf-8', errors='replace')
-            replacement_count = decoded_utf8_replace.count('�')
-            non_ascii_count = sum(1 for char in decoded_utf8_replace if ord(char) > 127)
-            
-            # If less than 20% of non-ASCII chars are problematic, prefer UTF-8
-            # This handles mixed encoding where most content is UTF-8 but some fields have ISO-8859-1 bytes
-            # Increased threshold from 10% to 20% to handle smaller responses
-            if non_ascii_count > 0 and replacement_count / non_ascii_count < 0.2:
-                return 'utf-8'
-            else:
-                return 'iso-8859-1'
-    finally:
-        if response is not None:
-            response.close()
+    profile, _data = _probe_capabilities(host)
+    return profile[CONF_CHARSET]
 
 
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -259,15 +270,16 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if CONF_CHARSET not in new_data or CONF_API_SUFFIX not in new_data or CONF_OLD_FIRMWARE not in new_data:
             try:
                 host = new_data.get(CONF_HOST, DEFAULT_HOST).rstrip('?')
-                detected_charset, detected_suffix, detected_old_firmware = await hass.async_add_executor_job(
-                    _detect_api_config, host
+                profile, _data = await async_run_controller_io(
+                    hass, new_data.get(CONF_NAME, DEFAULT_NAME), _probe_capabilities, host
                 )
-                new_data[CONF_CHARSET] = detected_charset
-                new_data[CONF_API_SUFFIX] = detected_suffix
-                new_data[CONF_OLD_FIRMWARE] = detected_old_firmware
+                new_data[CONF_CHARSET] = profile[CONF_CHARSET]
+                new_data[CONF_API_SUFFIX] = profile[CONF_API_SUFFIX]
+                new_data[CONF_OLD_FIRMWARE] = profile[CONF_OLD_FIRMWARE]
+                new_data[CONF_CAPABILITIES] = profile
                 _LOGGER.info(
                     "Migration V1→V2: Auto-detected charset '%s', API suffix '%s', old_firmware=%s for %s",
-                    detected_charset, detected_suffix, detected_old_firmware, host
+                    profile[CONF_CHARSET], profile[CONF_API_SUFFIX], profile[CONF_OLD_FIRMWARE], host
                 )
             except Exception as e:
                 _LOGGER.warning(
@@ -371,121 +383,64 @@ async def setup_platform_with_retry(
                 _LOGGER.info("%s entity setup completed successfully after retry", platform_name.capitalize())
                 # Cancel further retries
                 if hasattr(retry_setup, 'cancel'):
-                    retry_setup.cancel()
+                    hub.async_cancel_timer(retry_setup.cancel)
         
-        # Track the interval so we can cancel it later
+        # Track the interval on the hub so unloading the entry cancels it too
         retry_setup.cancel = async_track_time_interval(
             hass, retry_setup, timedelta(seconds=RETRY_INTERVAL_SECONDS)
         )
+        hub.async_track_timer(retry_setup.cancel)
 
 
-def discover_components_from_api(data: Dict[str, Any]) -> Dict[str, Any]:
+def discover_components_from_api(data: Dict[str, Any], index: Optional[ComponentIndex] = None) -> Dict[str, Any]:
     """Auto-discover available components from API response.
     
     Args:
         data: The API response data
+        index: Component index of ``data``, if the caller already built one
         
     Returns:
         Dictionary with discovered component counts
     """
-    discovered = {}
-    
-    # Count heating circuits (hk1, hk2, ...)
-    hk_count = len([k for k in data.keys() if k.startswith('hk') and k[2:].isdigit()])
-    if hk_count > 0:
-        discovered[CONF_NUM_OF_HEATING_CIRCUIT] = hk_count
-        _LOGGER.debug("Discovered %d heating circuit(s)", hk_count)
-    
-    # Count hot water circuits (ww1, ww2, ...)
-    ww_count = len([k for k in data.keys() if k.startswith('ww') and k[2:].isdigit()])
-    if ww_count > 0:
-        discovered[CONF_NUM_OF_HOT_WATER] = ww_count
-        _LOGGER.debug("Discovered %d hot water circuit(s)", ww_count)
-    
-    # Count pellematic heaters (pe1, pe2, ...)
-    pe_count = len([k for k in data.keys() if k.startswith('pe') and k[2:].isdigit()])
-    if pe_count > 0:
-        discovered[CONF_NUM_OF_PELLEMATIC_HEATER] = pe_count
-        _LOGGER.debug("Discovered %d pellematic heater(s)", pe_count)
-    
-    # Count solar collectors SK (sk1, sk2, ...)
-    sk_count = len([k for k in data.keys() if k.startswith('sk') and k[2:].isdigit()])
-    if sk_count > 0:
-        discovered[CONF_NUM_OF_SMART_PV_SK] = sk_count
-        discovered[CONF_SOLAR_CIRCUIT] = True
-        _LOGGER.debug("Discovered %d solar collector(s) SK", sk_count)
-    
-    # Count solar collectors SE (se1, se2, ...)
-    se_count = len([k for k in data.keys() if k.startswith('se') and k[2:].isdigit()])
-    if se_count > 0:
-        discovered[CONF_NUM_OF_SMART_PV_SE] = se_count
-        if not discovered.get(CONF_SOLAR_CIRCUIT):
-            discovered[CONF_SOLAR_CIRCUIT] = True
-        _LOGGER.debug("Discovered %d solar collector(s) SE", se_count)
-    
-    # Count heat pumps (wp1, wp2, ...)
-    wp_count = len([k for k in data.keys() if k.startswith('wp') and k[2:].isdigit()])
-    if wp_count > 0:
-        discovered[CONF_NUM_OF_HEAT_PUMPS] = wp_count
-        _LOGGER.debug("Discovered %d heat pump(s)", wp_count)
-    
-    # Count buffer storage (pu1, pu2, ...)
-    pu_count = len([k for k in data.keys() if k.startswith('pu') and k[2:].isdigit()])
-    if pu_count > 0:
-        discovered[CONF_NUM_OF_BUFFER_STORAGE] = pu_count
-        _LOGGER.debug("Discovered %d buffer storage(s)", pu_count)
-    
-    # Count wireless sensors (wireless1, wireless2, ...)
-    wireless_count = len([k for k in data.keys() if k.startswith('wireless') and k[8:].isdigit()])
-    if wireless_count > 0:
-        discovered[CONF_NUM_OF_WIRELESS_SENSORS] = wireless_count
-        _LOGGER.debug("Discovered %d wireless sensor(s)", wireless_count)
-    
-    # Detect special components
-    if 'stirling' in data:
-        discovered[CONF_STIRLING] = True
-        _LOGGER.debug("Discovered Stirling engine")
-    
-    if 'circ1' in data:
-        discovered[CONF_CIRCULATOR] = True
-        _LOGGER.debug("Discovered circulator")
-    
-    if 'power' in data:
-        discovered[CONF_SMART_PV] = True
-        _LOGGER.debug("Discovered Smart PV")
-    
-    return discovered
+    if index is None:
+        index = ComponentIndex(data)
+    return index.discovered()
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up a Ökofen Pellematic Component."""
     host = entry.data[CONF_HOST].rstrip('?')  # Remove any existing suffix
     name = entry.data[CONF_NAME]
     scan_interval = entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    fixed_delay = entry.data.get(CONF_FIXED_DELAY_POLLING, DEFAULT_FIXED_DELAY_POLLING)
     
     # CRITICAL: Auto-detect and save charset/api_suffix/old_firmware if missing
     # This is a fallback for installations that were migrated before auto-detection was added
+    capabilities = entry.data.get(CONF_CAPABILITIES)
+    # Response of a capability probe, used as the first data instead of a pre-fetch
+    probed_data = None
     if CONF_CHARSET not in entry.data or CONF_API_SUFFIX not in entry.data or CONF_OLD_FIRMWARE not in entry.data:
         _LOGGER.warning(
             "Setup %s: CONF_CHARSET, CONF_API_SUFFIX, or CONF_OLD_FIRMWARE missing! Attempting auto-detection...",
             name
         )
         try:
-            detected_charset, detected_suffix, detected_old_firmware = await hass.async_add_executor_job(
-                _detect_api_config, host
+            capabilities, probed_data = await async_run_controller_io(
+                hass, name, _probe_capabilities, host
             )
             # Update the config entry with detected values
             new_data = {
                 **entry.data,
-                CONF_CHARSET: detected_charset,
-                CONF_API_SUFFIX: detected_suffix,
-                CONF_OLD_FIRMWARE: detected_old_firmware
+                CONF_CHARSET: capabilities[CONF_CHARSET],
+                CONF_API_SUFFIX: capabilities[CONF_API_SUFFIX],
+                CONF_OLD_FIRMWARE: capabilities[CONF_OLD_FIRMWARE],
+                CONF_CAPABILITIES: capabilities,
             }
             hass.config_entries.async_update_entry(entry, data=new_data)
-            charset = detected_charset
-            api_suffix = detected_suffix
+            charset = capabilities[CONF_CHARSET]
+            api_suffix = capabilities[CONF_API_SUFFIX]
             _LOGGER.info(
                 "Setup %s: Auto-detected and saved charset '%s', API suffix '%s', old_firmware=%s",
-                name, detected_charset, detected_suffix, detected_old_firmware
+                name, charset, api_suffix, capabilities[CONF_OLD_FIRMWARE]
             )
         except Exception as e:
             _LOGGER.error(
@@ -497,23 +452,82 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     else:
         charset = entry.data[CONF_CHARSET]
         api_suffix = entry.data[CONF_API_SUFFIX]
+        if not is_current_profile(capabilities):
+            # Entries created before the capability profile (or with an older
+            # version) are probed once with the configured suffix and
+            # charset, which stay as they are.
+            try:
+                capabilities, probed_data = await async_run_controller_io(
+                    hass, name, _probe_capabilities, host, api_suffix, charset
+                )
+                hass.config_entries.async_update_entry(
+                    entry, data={**entry.data, CONF_CAPABILITIES: capabilities}
+                )
+            except Exception as e:
+                _LOGGER.debug("Setup %s: Capability probe failed (non-critical): %s", name, e)
+                capabilities = None
 
     _LOGGER.debug("Setup Pellematic Hub %s, %s (charset: %s, API suffix: %s)", 
                   DOMAIN, name, charset, api_suffix)
     _LOGGER.info("Setting up Ökofen Pellematic integration '%s' at %s", name, host)
 
-    hub = PellematicHub(hass, name, host, scan_interval, charset, api_suffix)
+    adaptive = None
+    if entry.data.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING):
+        adaptive = AdaptiveInterval(
+            scan_interval,
+            entry.data.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+            entry.data.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+        )
+
+    tiers = None
+    if entry.data.get(CONF_TIERED_POLLING, DEFAULT_TIERED_POLLING):
+        tiers = PollTiers(entry.data.get(CONF_FULL_REFRESH_INTERVAL, DEFAULT_FULL_REFRESH_INTERVAL))
+
+    deadband = None
+    if entry.data.get(CONF_DEADBAND_FILTER, DEFAULT_DEADBAND_FILTER):
+        deadband = DeadbandFilter(entry.data.get(CONF_DEADBAND_MAX_SILENCE, DEFAULT_DEADBAND_MAX_SILENCE))
+
+    publisher = None
+    publish_interval = entry.data.get(CONF_PUBLISH_INTERVAL, DEFAULT_PUBLISH_INTERVAL)
+    if publish_interval > scan_interval:
+        publisher = WindowPublisher(publish_interval, scan_interval)
+
+    datalog = None
+    if entry.data.get(CONF_DATA_LOG, DEFAULT_DATA_LOG):
+        datalog = DataLogger(
+            hass.config.path(DOMAIN, "datalog"),
+            name,
+            entry.data.get(CONF_DATA_LOG_MAX_SIZE, DEFAULT_DATA_LOG_MAX_SIZE) * 1024 * 1024,
+            # Values without a factor are scaled by their unit, like the hub's sensors do
+            unit_fallback=not polls_with_metadata(capabilities, api_suffix),
+        )
 
-    # Pre-fetch API data before setting up platforms
-    # This ensures all platforms have data available immediately
     try:
-        _LOGGER.debug("Pre-fetching API data for %s", name)
-        await hub.fetch_pellematic_data()
-        _LOGGER.info("Successfully pre-fetched API data for '%s' - %d top-level keys found", 
-                    name, len(hub.data) if hub.data else 0)
-    except Exception as e:
-        _LOGGER.error("Failed to pre-fetch API data for %s: %s", name, e)
-        # Continue anyway - platforms will retry later
+        entity_filter = EntityFilter.from_config(entry.data)
+    except ValueError as err:
+        _LOGGER.error("Ignoring invalid entity filter of %s: %s", name, err)
+        entity_filter = None
+
+    hub = PellematicHub(
+        hass, name, host, scan_interval, charset, api_suffix, fixed_delay, adaptive, tiers, capabilities, deadband,
+        publisher, entity_filter, entry.data.get(CONF_SNAPSHOT_EVENT, DEFAULT_SNAPSHOT_EVENT), datalog,
+    )
+
+    if probed_data:
+        # The capability probe just fetched the payload the hub polls
+        hub.seed_data(probed_data)
+        _LOGGER.debug("Using capability probe response as initial data for %s", name)
+    else:
+        # Pre-fetch API data before setting up platforms
+        # This ensures all platforms have data available immediately
+        try:
+            _LOGGER.debug("Pre-fetching API data for %s", name)
+            await hub.fetch_pellematic_data()
+            _LOGGER.info("Successfully pre-fetched API data for '%s' - %d top-level keys found", 
+                        name, len(hub.data) if hub.data else 0)
+        except Exception as e:
+            _LOGGER.error("Failed to pre-fetch API data for %s: %s", name, e)
+            # Continue anyway - platforms will retry later
 
     # Register the hub.
     hass.data[DOMAIN][name] = {"hub": hub}
@@ -525,29 +539,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # drop the first flag (which would make the migration re-run on every restart).
     flags_to_persist = {}
 
-    if not entry.data.get(MIGRATION_NOTIFICATION_SHOWN_KEY, False):
+    migrate = not entry.data.get(MIGRATION_NOTIFICATION_SHOWN_KEY, False)
+    check = not entry.data.get(ENTITY_WARNING_SHOWN_KEY, False)
+    if migrate or check:
+        # One pass over the entity registry for both
         try:
-            migrated = await async_migrate_entity_ids(hass, entry.entry_id, name)
+            migrated, warnings = await async_migrate_and_check_entities(
+                hass, entry.entry_id, name, migrate, check
+            )
             if migrated > 0:
                 _LOGGER.info("Preserved %d entity IDs for backwards compatibility", migrated)
-        except Exception as e:
-            _LOGGER.warning("Entity ID migration failed (non-critical): %s", e)
-        # Always mark as done — even on failure — so the notification is never
-        # re-sent on subsequent restarts regardless of what went wrong above.
-        flags_to_persist[MIGRATION_NOTIFICATION_SHOWN_KEY] = True
-    else:
-        _LOGGER.debug("Entity ID migration already completed for %s, skipping", name)
-
-    if not entry.data.get(ENTITY_WARNING_SHOWN_KEY, False):
-        try:
-            warnings = await async_check_and_warn_entity_changes(hass, entry.entry_id, name)
             for warning in warnings:
                 _LOGGER.warning(warning)
         except Exception as e:
-            _LOGGER.debug("Entity ID check failed (non-critical): %s", e)
-        flags_to_persist[ENTITY_WARNING_SHOWN_KEY] = True
+            # Migration and check errors are handled separately inside; this is the registry pass
+            _LOGGER.warning("Entity ID migration and check failed (non-critical): %s", e)
+        # Always mark as done — even on failure — so the notification is never
+        # re-sent on subsequent restarts regardless of what went wrong above.
+        if migrate:
+            flags_to_persist[MIGRATION_NOTIFICATION_SHOWN_KEY] = True
+        if check:
+            flags_to_persist[ENTITY_WARNING_SHOWN_KEY] = True
     else:
-        _LOGGER.debug("Entity ID warning check already completed for %s, skipping", name)
+        _LOGGER.debug("Entity ID migration and warning check already completed for %s, skipping", name)
 
     if flags_to_persist:
         hass.config_entries.async_update_entry(
@@ -580,6 +594,22 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             for entry in hass.config_entries.async_entries(DOMAIN):
                 await rediscover_and_update_entry(hass, entry)
     
+    async def handle_record_traffic(call) -> None:
+        """Handle the record_traffic service call."""
+        config_entry_id = call.data.get("config_entry_id")
+        duration = call.data.get("duration", DEFAULT_RECORDING_MINUTES)
+
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            if config_entry_id and entry.entry_id != config_entry_id:
+                continue
+            hub_data = hass.data[DOMAIN].get(entry.data[CONF_NAME])
+            if hub_data is not None:
+                await async_record_traffic(hass, hub_data["hub"], duration)
+
+    async def handle_get_snapshot(call: ServiceCall) -> ServiceResponse:
+        """Handle the get_snapshot service call."""
+        return async_get_snapshots(hass, call.data.get("config_entry_id"), call.data.get("since_generation"))
+
     # Register service only once
     if not hass.services.has_service(DOMAIN, "rediscover_components"):
         hass.services.async_register(
@@ -587,6 +617,96 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             "rediscover_components",
             handle_rediscover_components,
         )
+    if not hass.services.has_service(DOMAIN, "record_traffic"):
+        hass.services.async_register(
+            DOMAIN,
+            "record_traffic",
+            handle_record_traffic,
+            schema=vol.Schema(
+                {
+                    vol.Optional("config_entry_id"): cv.string,
+                    vol.Optional("duration", default=DEFAULT_RECORDING_MINUTES): vol.All(
+                        vol.Coerce(int), vol.Range(min=1, max=MAX_RECORDING_MINUTES)
+                    ),
+                }
+            ),
+        )
+    if not hass.services.has_service(DOMAIN, "get_snapshot"):
+        hass.services.async_register(
+            DOMAIN,
+            "get_snapshot",
+            handle_get_snapshot,
+            schema=vol.Schema(
+                {
+                    vol.Optional("config_entry_id"): cv.string,
+                    vol.Optional("since_generation"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                }
+            ),
+            supports_response=SupportsResponse.ONLY,
+        )
+        websocket_api.async_register_command(hass, websocket_get_snapshot)
+
+
+@callback
+def async_get_snapshots(
+    hass: HomeAssistant, config_entry_id: Optional[str] = None, since_generation: Optional[int] = None
+) -> Dict[str, Any]:
+    """Return the data snapshots of the loaded hubs, by hub name.
+
+    Args:
+        hass: Home Assistant instance
+        config_entry_id: Only the hub of this entry (optional, all if not specified)
+        since_generation: Return only the keys changed after this generation
+            (see ``snapshot.SnapshotStore.get``)
+    """
+    snapshots = {}
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if config_entry_id and entry.entry_id != config_entry_id:
+            continue
+        hub_data = hass.data[DOMAIN].get(entry.data[CONF_NAME])
+        if hub_data is not None and "hub" in hub_data:
+            hub = hub_data["hub"]
+            snapshots[hub.name] = hub.snapshot.get(hub.data, since_generation)
+    return snapshots
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/get_snapshot",
+        vol.Optional("config_entry_id"): str,
+        vol.Optional("since_generation"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    }
+)
+@callback
+def websocket_get_snapshot(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: Dict[str, Any]) -> None:
+    """Send the data snapshots of the loaded hubs (see async_get_snapshots)."""
+    connection.send_result(
+        msg["id"], async_get_snapshots(hass, msg.get("config_entry_id"), msg.get("since_generation"))
+    )
+
+
+async def async_record_traffic(hass: HomeAssistant, hub: 'PellematicHub', duration: int) -> str:
+    """Record a hub's controller traffic for a number of minutes.
+
+    The recording is written to ``<config>/oekofen_pellematic_compact/`` and
+    can be replayed with ``replay.async_replay``.
+
+    Args:
+        hass: Home Assistant instance
+        hub: Hub to record
+        duration: Recording duration in minutes
+
+    Returns:
+        Path of the recording file
+    """
+    directory = hass.config.path(DOMAIN)
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    filename = f"{hub.name}_{timestamp}{RECORDING_SUFFIX}".replace(" ", "_")
+    path = os.path.join(directory, filename)
+
+    await hass.async_add_executor_job(partial(os.makedirs, directory, exist_ok=True))
+    await hub.async_start_recording(path, duration * 60)
+    return path
 
 
 async def rediscover_and_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
@@ -634,7 +754,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.error("Failed to unload some platforms for '%s'", name)
         return False
 
-    hass.data[DOMAIN].pop(entry.data["name"])
+    hub = hass.data[DOMAIN].pop(entry.data["name"])["hub"]
+    hub.async_shutdown()
+    if not hass.data[DOMAIN]:
+        # Last entry: release the controller I/O threads
+        async_shutdown_controller_executor(hass)
     _LOGGER.info("Successfully unloaded Ökofen Pellematic integration '%s'", name)
     return True
 
@@ -650,8 +774,36 @@ class PellematicHub:
         scan_interval: int,
         charset: str = DEFAULT_CHARSET,
         api_suffix: str = DEFAULT_API_SUFFIX,
+        fixed_delay: bool = DEFAULT_FIXED_DELAY_POLLING,
+        adaptive: Optional[AdaptiveInterval] = None,
+        tiers: Optional[PollTiers] = None,
+        capabilities: Optional[Dict[str, Any]] = None,
+        deadband: Optional[DeadbandFilter] = None,
+        publisher: Optional[WindowPublisher] = None,
+        entity_filter: Optional[EntityFilter] = None,
+        snapshot_event: bool = DEFAULT_SNAPSHOT_EVENT,
+        datalog: Optional[DataLogger] = None,
     ) -> None:
-        """Initialize the hub."""
+        """Initialize the hub.
+
+        Args:
+            capabilities: Capability profile from the config entry, used
+                for fast paths that depend on the firmware
+            adaptive: Adaptive interval controller; the poll then runs with a
+                fixed delay whose length it sets after every poll
+            tiers: Tier plan; polls then fetch the fast-tier components and
+                the full payload only once per full refresh interval
+            deadband: Deadband filter; sensors then skip state writes for
+                changes within their threshold
+            publisher: Window publisher; every poll is sampled into the
+                sensors' windows, but entities are only updated once per
+                publish interval
+            entity_filter: Include/exclude filter for entity discovery
+            snapshot_event: Fire an EVENT_SNAPSHOT event with the changed
+                values after every poll that changed any
+            datalog: Data logger; the values of every poll are appended to
+                its files in batches written by executor jobs
+        """
         self._hass = hass
         self._host = host
         self._charset = charset
@@ -659,19 +811,40 @@ class PellematicHub:
         self._lock = asyncio.Lock()
         self._name = name
         self._scan_interval = timedelta(seconds=scan_interval)
+        self._adaptive = adaptive
+        self._tiers = tiers
+        self.capabilities = capabilities
+        self.deadband = deadband
+        self.publisher = publisher
+        self.entity_filter = entity_filter
+        # Built on request (get_snapshot service and websocket command) or, with
+        # snapshot events, after every poll
+        self.snapshot = SnapshotStore(self.unit_fallback)
+        self.snapshot_event = snapshot_event
+        self.datalog = datalog
+        self._last_poll_started: Optional[float] = None
+        # The adaptive interval changes with every poll, which only works with a fixed delay
+        self._fixed_delay = fixed_delay or adaptive is not None
         self._unsub_interval_method = None
+        self._timer_cancels: List[Callable[[], None]] = []
+        self._recorder: Optional[TrafficRecorder] = None
+        self._unsub_recording_stop: Optional[Callable[[], None]] = None
+        self._replay: Optional[TrafficReplay] = None
         self._sensors = []
         self.data = {}
+        self._component_index: Optional[ComponentIndex] = None
         self._last_fetch_time = 0.0  # Track last API call time for rate limiting
-        self._min_fetch_interval = 2.5  # Minimum seconds between API calls (Ökofen requirement)
+        # Seconds the requests of the last fetch took, without rate-limit waits
+        self._request_time = 0.0
+        self._min_fetch_interval = MIN_FETCH_INTERVAL  # Minimum seconds between API calls (Ökofen requirement)
 
     @callback
     def async_add_pellematic_sensor(self, update_callback) -> None:
         """Listen for data updates."""
-        # This is the first sensor, set up interval.
+        # This is the first sensor, register the hub's poll with the scheduler.
         if not self._sensors:
-            self._unsub_interval_method = async_track_time_interval(
-                self._hass, self.async_refresh_api_data, self._scan_interval
+            self._unsub_interval_method = async_get_poll_scheduler(self._hass).async_register(
+                self._name, self._scan_interval, self.async_refresh_api_data, self._fixed_delay
             )
 
         self._sensors.append(update_callback)
@@ -681,11 +854,99 @@ class PellematicHub:
         """Remove data update."""
         self._sensors.remove(update_callback)
 
-        if not self._sensors:
+        if not self._sensors and self._unsub_interval_method is not None:
             # stop the interval timer upon removal of last sensor.
             self._unsub_interval_method()
             self._unsub_interval_method = None
-            
+
+    @callback
+    def async_track_timer(self, cancel: Callable[[], None]) -> None:
+        """Keep a timer (e.g. a platform setup retry) so it is cancelled on unload."""
+        self._timer_cancels.append(cancel)
+
+    @callback
+    def async_cancel_timer(self, cancel: Callable[[], None]) -> None:
+        """Cancel a timer tracked with async_track_timer."""
+        if cancel in self._timer_cancels:
+            self._timer_cancels.remove(cancel)
+        cancel()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel all timers owned by the hub.
+
+        Called when the entry is unloaded. Entities unsubscribe themselves,
+        but setup retry timers of platforms that never got data would keep
+        the hub alive and keep polling after a reload.
+        """
+        for cancel in self._timer_cancels:
+            cancel()
+        self._timer_cancels.clear()
+        if self._unsub_interval_method is not None:
+            self._unsub_interval_method()
+            self._unsub_interval_method = None
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+        if self.datalog is not None:
+            batch = self.datalog.take_batch()
+            if batch is not None:
+                self._hass.async_add_executor_job(self.datalog.write, batch)
+
+    async def async_start_recording(self, path: str, duration: float) -> None:
+        """Record traffic to a file for ``duration`` seconds.
+
+        A recording that is still running is finished first.
+        """
+        if self._unsub_recording_stop is not None:
+            self.async_cancel_timer(self._unsub_recording_stop)
+            self._unsub_recording_stop = None
+        await self._hass.async_add_executor_job(self.start_recording, path)
+
+        @callback
+        def stop(_now: Any) -> None:
+            self.async_cancel_timer(stop.cancel)
+            self._unsub_recording_stop = None
+            self._hass.async_add_executor_job(self.stop_recording)
+
+        stop.cancel = async_call_later(self._hass, duration, stop)
+        self._unsub_recording_stop = stop.cancel
+        self.async_track_timer(stop.cancel)
+
+    def start_recording(self, path: str) -> None:
+        """Record all controller traffic to a file (blocking, opens the file).
+
+        Args:
+            path: Recording file; an existing recording is continued
+        """
+        self.stop_recording()
+        self._recorder = TrafficRecorder(path, controller_password(self._host))
+        _LOGGER.info("Recording traffic of '%s' to %s", self._name, path)
+
+    def stop_recording(self) -> Optional[str]:
+        """Stop recording traffic.
+
+        Returns:
+            Path of the finished recording, None if nothing was recorded
+        """
+        recorder, self._recorder = self._recorder, None
+        if recorder is None:
+            return None
+        recorder.close()
+        _LOGGER.info("Recorded %d records of '%s' to %s", recorder.records, self._name, recorder.path)
+        return recorder.path
+
+    def start_replay(self, replay: TrafficReplay) -> None:
+        """Serve recorded responses instead of fetching from the controller.
+
+        Writes are collected in ``replay.writes`` instead of being sent.
+        """
+        self._replay = replay
+
+    def stop_replay(self) -> None:
+        """Return to fetching from the controller."""
+        self._replay = None
+
     def send_pellematic_data(self, val: Any, prefix: str, key: str) -> None:
         """Send data update to API.
         
@@ -694,65 +955,236 @@ class PellematicHub:
             prefix: Component prefix (e.g., 'hk1')
             key: Parameter key
         """
-        # Remove '/all' or '/all?' from the end of the host URL
-        base_url = self._host.replace('/all?', '/').replace('/all', '/')
-        urlsent = f"{base_url}{prefix}_{key}={val}"
+        urlsent = component_url(self._host, f"{prefix}_{key}={val}")
+        if self._replay is not None:
+            _LOGGER.debug("Replay active, not sending API update: %s", urlsent)
+            self._replay.writes.append(urlsent)
+            return
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.record_write(urlsent)
         _LOGGER.debug("Sending API update: %s", urlsent)
         result = send_data(urlsent, self._charset)
 
+    async def async_send_pellematic_data(self, val: Any, prefix: str, key: str) -> None:
+        """Send a data update to the API on the controller executor.
+
+        Args:
+            val: Value to set
+            prefix: Component prefix (e.g., 'hk1')
+            key: Parameter key
+        """
+        await self._async_run_io(self.send_pellematic_data, val, prefix, key)
+
+    async def _async_run_io(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking controller I/O, one job per hub at a time."""
+        return await async_run_controller_io(self._hass, self._name, func, *args)
+
     async def async_refresh_api_data(self, _now: Optional[int] = None) -> None:
         """Time to update."""
         if not self._sensors:
             return
 
+        started = time.monotonic()
         try:
             update_result = await self.fetch_pellematic_data()
         except Exception as e:
             _LOGGER.exception("Error reading pellematic data")
             update_result = False
 
+        if self._adaptive is not None:
+            # The controller's load shows in its request times, not in the rate-limit waits
+            interval = self._adaptive.update(
+                self.data if update_result else None, self._request_time, time.monotonic()
+            )
+            async_get_poll_scheduler(self._hass).async_set_interval(self._name, timedelta(seconds=interval))
+
         if update_result:
+            if self.snapshot_event:
+                self._fire_snapshot_event(started)
+            if self.datalog is not None:
+                batch = self.datalog.append(self.data)
+                if batch is not None:
+                    self._hass.async_add_executor_job(self.datalog.write, batch)
+            if self.publisher is not None:
+                self.publisher.sample()
+                if not self.publisher.due(time.monotonic()):
+                    return
             for update_callback in self._sensors:
                 update_callback()
 
+    def _fire_snapshot_event(self, started: float) -> None:
+        """Fire an EVENT_SNAPSHOT event with the values the last poll changed.
+
+        Nothing is fired if no value changed, nor for the first snapshot
+        (the initial state is not a change).
+
+        Args:
+            started: Monotonic time the poll started
+        """
+        interval = None if self._last_poll_started is None else started - self._last_poll_started
+        self._last_poll_started = started
+        first = self.snapshot.generation == 0
+        changes = self.snapshot.update(self.data)
+        if not changes or first:
+            return
+        self._hass.bus.async_fire(
+            EVENT_SNAPSHOT,
+            {
+                "hub": self._name,
+                "generation": self.snapshot.generation,
+                "changes": [list(change) for change in changes],
+                "duration": round(time.monotonic() - started, 3),
+                "interval": None if interval is None else round(interval, 3),
+            },
+        )
+
     @property
     def name(self) -> str:
         """Return the name of this hub."""
         return self._name
 
+    @property
+    def unit_fallback(self) -> bool:
+        """Return True if sensors need the unit-based scaling for old firmware.
+
+        Not needed if the capability profile guarantees that the polled
+        payload carries metadata (and thus a factor for every scaled value).
+        """
+        return not polls_with_metadata(self.capabilities, self._api_suffix)
+
+    def seed_data(self, data: Dict[str, Any]) -> None:
+        """Use a payload fetched during setup as the current data.
+
+        The fetch counts for the controller's request spacing and as a
+        full fetch for tiered polling.
+        """
+        self.data = data
+        self._last_fetch_time = time.monotonic()
+        if self._tiers is not None:
+            self._tiers.record_full_fetch(self._last_fetch_time)
+
     async def fetch_pellematic_data(self) -> bool:
         """Get data from API with rate limiting.
         
         The Ökofen API requires at least 2500ms between requests.
         Returns HTTP 401 with 'Wait at least 2500ms during requests' if called too frequently.
         """
+        self._request_time = 0.0
+        if self._replay is not None:
+            return self._fetch_replayed_data()
+
         async with self._lock:
-            # Calculate time since last fetch
-            current_time = time.monotonic()
-            time_since_last_fetch = current_time - self._last_fetch_time
-            
-            # Wait if needed to honor minimum interval
-            if time_since_last_fetch < self._min_fetch_interval:
-                wait_time = self._min_fetch_interval - time_since_last_fetch
-                _LOGGER.debug(
-                    "Rate limiting: waiting %.2fs before next API call (last call was %.2fs ago)",
-                    wait_time, time_since_last_fetch
+            # Recordings hold full payloads only, so that they can be replayed
+            if self._tiers is not None and self._recorder is None:
+                components = self._tiers.plan(
+                    self.data, time.monotonic(), self._current_interval(), self._min_fetch_interval
                 )
-                await asyncio.sleep(wait_time)
-            
-            # Mark the attempt time before the request so even failures are rate-limited.
-            self._last_fetch_time = time.monotonic()
+                if components is not None:
+                    try:
+                        data = await self._async_fetch_components_locked(components)
+                    except Exception as e:
+                        _LOGGER.error("Failed to fetch Pellematic component data: %s", e)
+                        return False
+                    if data is not None:
+                        self.data = data
+                        return True
+
             try:
-                result = await self._hass.async_add_executor_job(
-                    fetch_data, self._host, self._charset, self._api_suffix
-                )
-                self.data = result
-                return True
+                result = await self._async_fetch_locked(self._host)
             except Exception as e:
                 _LOGGER.error("Failed to fetch Pellematic data: %s", e)
                 # Keep existing data if available
                 return False
-    
+            self.data = result
+            if self._tiers is not None:
+                finished = time.monotonic()
+                self._tiers.record_full_fetch(finished, finished - self._last_fetch_time)
+            return True
+
+    def _current_interval(self) -> float:
+        """Return the current poll interval in seconds."""
+        if self._adaptive is not None:
+            return self._adaptive.interval
+        return self._scan_interval.total_seconds()
+
+    async def _async_fetch_components_locked(self, components: List[str]) -> Optional[Dict[str, Any]]:
+        """Fetch fast-tier components and merge them into a copy of the current data.
+
+        The caller must hold ``self._lock``.
+
+        Returns:
+            The merged data, or None if a response did not contain its
+            component (tiered polling is then switched off)
+        """
+        data = dict(self.data)
+        for component in components:
+            result = await self._async_fetch_locked(component_url(self._host, component))
+            fields = result.get(component) if isinstance(result, dict) else None
+            if not isinstance(fields, dict):
+                self._tiers.reject(component)
+                return None
+            data[component] = fields
+        self._tiers.record_component_fetch(len(components), self._request_time)
+        return data
+
+    async def _async_fetch_locked(self, url: str) -> Dict[str, Any]:
+        """Fetch an endpoint, keeping the controller's minimum request spacing.
+
+        The caller must hold ``self._lock``.
+        """
+        # Calculate time since last fetch
+        current_time = time.monotonic()
+        time_since_last_fetch = current_time - self._last_fetch_time
+
+        # Wait if needed to honor minimum interval
+        if time_since_last_fetch < self._min_fetch_interval:
+            wait_time = self._min_fetch_interval - time_since_last_fetch
+            _LOGGER.debug(
+                "Rate limiting: waiting %.2fs before next API call (last call was %.2fs ago)",
+                wait_time, time_since_last_fetch
+            )
+            await asyncio.sleep(wait_time)
+
+        # Mark the attempt time before the request so even failures are rate-limited.
+        self._last_fetch_time = time.monotonic()
+        loop = asyncio.get_running_loop()
+        request_started = loop.time()
+        try:
+            if self._recorder is None:
+                return await self._async_run_io(fetch_data, url, self._charset, self._api_suffix)
+            return await self._async_run_io(self._fetch_and_record, self._recorder, url)
+        finally:
+            # Time of the request itself, without the rate-limit wait before it
+            self._request_time += loop.time() - request_started
+
+    def _fetch_and_record(self, recorder: TrafficRecorder, url: str) -> Dict[str, Any]:
+        """Fetch data like fetch_data and append the raw response to a recording."""
+        try:
+            raw_data = fetch_raw_data(url, self._api_suffix)
+        except Exception as e:
+            recorder.record_error(e)
+            raise
+        recorder.record_response(raw_data)
+        return parse_api_response(raw_data, self._charset)
+
+    def _fetch_replayed_data(self) -> bool:
+        """Take the next response from the active replay instead of the network."""
+        try:
+            raw_data = self._replay.next_response()
+        except ReplayFinished:
+            _LOGGER.debug("Replay of '%s' finished", self._name)
+            return False
+        except ReplayedFetchError as e:
+            _LOGGER.error("Failed to fetch Pellematic data (replayed): %s", e)
+            return False
+        try:
+            self.data = parse_api_response(raw_data, self._charset)
+        except Exception as e:
+            _LOGGER.error("Failed to parse replayed Pellematic data: %s", e)
+            return False
+        return True
+
     async def async_get_data(self, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
         """Get current API data, fetch if not available or forced.
         
@@ -770,9 +1202,75 @@ class PellematicHub:
                 return None
         return self.data
     
+    @property
+    def component_index(self) -> ComponentIndex:
+        """Return the component index of the current data, built once per snapshot."""
+        index = self._component_index
+        if index is None or index.data is not self.data:
+            index = self._component_index = ComponentIndex(self.data)
+        return index
+
     def get_discovered_components(self) -> dict:
         """Get auto-discovered components from current API data."""
-        return discover_components_from_api(self.data)
+        return discover_components_from_api(self.data, self.component_index)
+
+
+# Matches JSON string literals (handling escaped quotes)
+_JSON_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)(?<!\\)"')
+
+
+def decode_api_response(raw_data: bytes, charset: str = DEFAULT_CHARSET) -> str:
+    """Decode a raw API response.
+    
+    Args:
+        raw_data: Raw response bytes from the controller
+        charset: Character encoding for response
+        
+    Returns:
+        Decoded response text
+    """
+    return decode_payload(raw_data, charset)
+
+
+def _escape_control_chars(match: re.Match) -> str:
+    """Escape newlines, tabs and carriage returns inside a JSON string literal."""
+    string_content = match.group(1)
+    string_content = string_content.replace('\n', '\\n')
+    string_content = string_content.replace('\r', '\\r')
+    string_content = string_content.replace('\t', '\\t')
+    return f'"{string_content}"'
+
+
+def repair_api_json(str_response: str) -> str:
+    """Repair known defects in the controller's JSON output.
+    
+    Args:
+        str_response: Decoded response text
+        
+    Returns:
+        Response text that can be parsed with json.loads(strict=False)
+    """
+    # Hotfix for pellematic update 4.02 (invalid json)
+    str_response = str_response.replace("L_statetext:", 'L_statetext":')
+    
+    # Fix for control characters (newlines, tabs) in string values from Ökofen API
+    # The API sometimes returns error messages with actual newlines in JSON strings
+    # which is invalid JSON. We need to escape them before parsing.
+    return _JSON_STRING_RE.sub(_escape_control_chars, str_response)
+
+
+def parse_api_response(raw_data: bytes, charset: str = DEFAULT_CHARSET) -> Dict[str, Any]:
+    """Decode, repair and parse a raw API response.
+    
+    Args:
+        raw_data: Raw response bytes from the controller
+        charset: Character encoding for response
+        
+    Returns:
+        Parsed JSON data from API
+    """
+    str_response = repair_api_json(decode_api_response(raw_data, charset))
+    return json.loads(str_response, strict=False)
 
 
 def fetch_data(url: str, charset: str = DEFAULT_CHARSET, api_suffix: str = DEFAULT_API_SUFFIX) -> Dict[str, Any]:
@@ -786,6 +1284,19 @@ def fetch_data(url: str, charset: str = DEFAULT_CHARSET, api_suffix: str = DEFAU
     Returns:
         Parsed JSON data from API
     """
+    return parse_api_response(fetch_raw_data(url, api_suffix), charset)
+
+
+def fetch_raw_data(url: str, api_suffix: str = DEFAULT_API_SUFFIX) -> bytes:
+    """Get the undecoded response body from the API.
+    
+    Args:
+        url: API endpoint URL (without ? or ??)
+        api_suffix: API suffix to use ("?" for modern firmware, "??" for old firmware)
+        
+    Returns:
+        Raw response bytes
+    """
     # Strip any leading/trailing whitespace and existing suffix
     url = url.strip().rstrip('?')
 
@@ -794,37 +1305,18 @@ def fetch_data(url: str, charset: str = DEFAULT_CHARSET, api_suffix: str = DEFAU
         
     req = urllib.request.Request(url)
     response = None
-    str_response = None
+    raw_data = None
 
     try:
         response = urllib.request.urlopen(
             req, timeout=3
         )  # Ökofen API recommended timeout is 2.5s
-        str_response = response.read().decode(charset, "ignore")
+        raw_data = response.read()
     finally:
         if response is not None:
             response.close()
 
-    # Hotfix for pellematic update 4.02 (invalid json)
-    str_response = str_response.replace("L_statetext:", 'L_statetext":')
-    
-    # Fix for control characters (newlines, tabs) in string values from Ökofen API
-    # The API sometimes returns error messages with actual newlines in JSON strings
-    # which is invalid JSON. We need to escape them before parsing.
-    # Find all string values and escape control characters within them
-    def escape_control_chars(match):
-        string_content = match.group(1)
-        # Escape newlines, tabs, carriage returns
-        string_content = string_content.replace('\n', '\\n')
-        string_content = string_content.replace('\r', '\\r')
-        string_content = string_content.replace('\t', '\\t')
-        return f'"{string_content}"'
-    
-    # Match strings in JSON (handling escaped quotes)
-    str_response = re.sub(r'"((?:[^"\\]|\\.)*)(?<!\\)"', escape_control_chars, str_response)
-    
-    result = json.loads(str_response, strict=False)
-    return result
+    return raw_data
 
 
 def send_data(url: str, charset: str = DEFAULT_CHARSET) -> str:
@@ -0,0 +1,152 @@
+"""Adaptive poll interval for a Pellematic hub.
+
+In adaptive mode the hub's poll interval follows what the plant is doing:
+
+- it halves (down to the lower bound) while key values change quickly, and
+  drops straight to the lower bound when a boiler changes state (burner
+  start-up, ignition, shutdown)
+- it grows by half (up to the upper bound) while the key values are quiet,
+  e.g. at night
+- it grows when the controller answers slowly, so that requests take at
+  most ``MAX_REQUEST_SHARE`` of the time, and doubles after a failed poll
+
+The interval never goes below the controller's minimum request spacing
+(``MIN_FETCH_INTERVAL``).
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from .const import (
+    ADAPTIVE_ACTIVE_RATE,
+    ADAPTIVE_QUIET_RATE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    MIN_FETCH_INTERVAL,
+)
+
+# Values whose change rate drives the interval (component pattern, key)
+KEY_VALUES: Tuple[Tuple[re.Pattern, str], ...] = (
+    (re.compile(r"pe\d+$"), "L_temp_act"),
+    (re.compile(r"hk\d+$"), "L_flowtemp_act"),
+)
+# Values whose change switches to the lower bound immediately
+STATE_VALUES: Tuple[Tuple[re.Pattern, str], ...] = ((re.compile(r"pe\d+$"), "L_state"),)
+
+# Largest share of the interval a request may take before the interval grows
+MAX_REQUEST_SHARE = 0.2
+
+
+def _scaled_value(field: Any) -> Optional[float]:
+    """Return a field's value with its factor applied, None if not numeric."""
+    factor = 1.0
+    if isinstance(field, dict):
+        try:
+            factor = float(field.get("factor", 1))
+        except (TypeError, ValueError):
+            factor = 1.0
+        field = field.get("val")
+    try:
+        return float(field) * factor
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_key_values(data: Dict[str, Any]) -> Tuple[Dict[str, float], Dict[str, Any]]:
+    """Pick the key values and state values out of an API response.
+
+    Args:
+        data: Parsed API response
+
+    Returns:
+        Tuple of (numeric key values, state values), keyed by "component.key"
+    """
+    values: Dict[str, float] = {}
+    states: Dict[str, Any] = {}
+    for component, fields in data.items():
+        if not isinstance(fields, dict):
+            continue
+        for pattern, key in KEY_VALUES:
+            if key in fields and pattern.match(component):
+                value = _scaled_value(fields[key])
+                if value is not None:
+                    values[f"{component}.{key}"] = value
+        for pattern, key in STATE_VALUES:
+            if key in fields and pattern.match(component):
+                field = fields[key]
+                states[f"{component}.{key}"] = field.get("val") if isinstance(field, dict) else field
+    return values, states
+
+
+class AdaptiveInterval:
+    """Derives the next poll interval from value change rates and latency."""
+
+    def __init__(
+        self,
+        initial: float,
+        min_interval: float = DEFAULT_MIN_SCAN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_SCAN_INTERVAL,
+    ) -> None:
+        """Initialize the controller.
+
+        Args:
+            initial: Interval to start with in seconds (the scan interval)
+            min_interval: Lower bound in seconds, raised to MIN_FETCH_INTERVAL
+            max_interval: Upper bound in seconds
+        """
+        self.min_interval = max(float(min_interval), MIN_FETCH_INTERVAL)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.interval = self._clamp(initial)
+        self.rate: Optional[float] = None
+        self._values: Dict[str, float] = {}
+        self._states: Dict[str, Any] = {}
+        self._timestamp: Optional[float] = None
+
+    def _clamp(self, interval: float) -> float:
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def update(self, data: Optional[Dict[str, Any]], latency: float, timestamp: float) -> float:
+        """Feed the result of a poll and compute the next interval.
+
+        Args:
+            data: Parsed API response, None if the poll failed
+            latency: Time the poll's request took in seconds
+            timestamp: Monotonic time of the poll in seconds
+
+        Returns:
+            Next poll interval in seconds
+        """
+        if data is None:
+            self.interval = self._clamp(self.interval * 2)
+            return self.interval
+
+        values, states = extract_key_values(data)
+        interval = self.interval
+        if self._timestamp is not None and timestamp > self._timestamp:
+            minutes = (timestamp - self._timestamp) / 60
+            self.rate = max(
+                (abs(value - self._values[key]) / minutes for key, value in values.items() if key in self._values),
+                default=0.0,
+            )
+            if any(self._states.get(key, value) != value for key, value in states.items()):
+                interval = self.min_interval
+            elif self.rate >= ADAPTIVE_ACTIVE_RATE:
+                interval /= 2
+            elif self.rate <= ADAPTIVE_QUIET_RATE:
+                interval *= 1.5
+        self._values, self._states, self._timestamp = values, states, timestamp
+
+        # Keep the controller's share of request time bounded
+        interval = max(interval, latency / MAX_REQUEST_SHARE)
+        self.interval = self._clamp(interval)
+        return self.interval
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the current state for diagnostics."""
+        return {
+            "interval": self.interval,
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+            "rate_per_minute": self.rate,
+        }
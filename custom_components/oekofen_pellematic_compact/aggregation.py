@@ -0,0 +1,176 @@
+"""Publish rate decoupled from the poll rate, with window aggregates.
+
+With a publish interval longer than the scan interval the hub polls the
+controller at the scan interval (e.g. every 5 s for combustion diagnostics)
+but updates the Home Assistant entities only once per publish interval.
+Between publications every measurement sensor is sampled into a
+``RollingWindow``, and the published state carries the window's mean, min,
+max and last value. Event bus and recorder load follow the publish rate,
+while the integration itself sees every poll.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+
+class RollingWindow:
+    """Mean, min and max of the last ``size`` values, updated incrementally.
+
+    The values live in a fixed-size ring buffer with a running sum; min and
+    max come from monotonic queues, so every ``add`` is amortized O(1).
+    """
+
+    __slots__ = ("size", "_values", "_next", "_count", "_sum", "_seq", "_mins", "_maxs")
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty window.
+
+        Args:
+            size: Number of values in the window
+        """
+        self.size = max(1, size)
+        self._values = [0.0] * self.size
+        self._next = 0
+        self._count = 0
+        self._sum = 0.0
+        self._seq = 0
+        # (sequence number, value), values increasing resp. decreasing
+        self._mins: Deque[Tuple[int, float]] = deque()
+        self._maxs: Deque[Tuple[int, float]] = deque()
+
+    def add(self, value: float) -> None:
+        """Add a value, dropping the oldest one if the window is full."""
+        if self._count == self.size:
+            self._sum -= self._values[self._next]
+        else:
+            self._count += 1
+        self._values[self._next] = value
+        self._sum += value
+        self._next += 1
+        if self._next == self.size:
+            self._next = 0
+            # Re-sum once per lap, so float errors of the running sum cannot pile up
+            self._sum = sum(self._values[:self._count])
+
+        seq = self._seq
+        self._seq += 1
+        expired = seq - self.size
+        mins, maxs = self._mins, self._maxs
+        while mins and mins[0][0] <= expired:
+            mins.popleft()
+        while maxs and maxs[0][0] <= expired:
+            maxs.popleft()
+        while mins and mins[-1][1] >= value:
+            mins.pop()
+        while maxs and maxs[-1][1] <= value:
+            maxs.pop()
+        mins.append((seq, value))
+        maxs.append((seq, value))
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / self._count if self._count else None
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._mins[0][1] if self._mins else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._maxs[0][1] if self._maxs else None
+
+    @property
+    def last(self) -> Optional[float]:
+        return self._values[self._next - 1] if self._count else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the aggregates as state attributes."""
+        return {
+            "mean": round(self.mean, 3) if self._count else None,
+            "min": self.min,
+            "max": self.max,
+            "last": self.last,
+            "samples": self._count,
+        }
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class WindowPublisher:
+    """Samples tracked sensors on every poll and gates entity updates."""
+
+    def __init__(self, publish_interval: float, scan_interval: float) -> None:
+        """Initialize the publisher.
+
+        Args:
+            publish_interval: Seconds between entity updates
+            scan_interval: Poll interval in seconds; the windows hold the
+                samples of one publish interval
+        """
+        self.publish_interval = publish_interval
+        self.window_size = max(1, math.ceil(publish_interval / scan_interval))
+        # Half a scan interval of slack, so poll jitter does not skip a publication
+        self._slack = scan_interval / 2
+        self.last_publish: Optional[float] = None
+        # Sensor key -> (state getter, window)
+        self._tracked: Dict[str, Tuple[Callable[[], Any], RollingWindow]] = {}
+        self.polls = 0
+        self.publishes = 0
+
+    def track(self, key: str, getter: Callable[[], Any]) -> None:
+        """Sample a sensor's state on every poll.
+
+        Args:
+            key: Unique key of the sensor
+            getter: Returns the sensor's current state from the hub data
+        """
+        self._tracked[key] = (getter, RollingWindow(self.window_size))
+
+    def untrack(self, key: str) -> None:
+        """Stop sampling a sensor."""
+        self._tracked.pop(key, None)
+
+    def sample(self) -> None:
+        """Add the current state of every tracked sensor to its window.
+
+        Non-numeric states (unavailable values) are not sampled.
+        """
+        self.polls += 1
+        for getter, window in self._tracked.values():
+            value = getter()
+            if _is_number(value):
+                window.add(value)
+
+    def due(self, now: float) -> bool:
+        """Return True if the entities should be updated after this poll.
+
+        Args:
+            now: Monotonic time in seconds
+        """
+        if self.last_publish is not None and now - self.last_publish < self.publish_interval - self._slack:
+            return False
+        self.last_publish = now
+        self.publishes += 1
+        return True
+
+    def window(self, key: str) -> Optional[RollingWindow]:
+        """Return the window of a tracked sensor."""
+        tracked = self._tracked.get(key)
+        return None if tracked is None else tracked[1]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the settings and counters for diagnostics."""
+        return {
+            "publish_interval": self.publish_interval,
+            "window_size": self.window_size,
+            "tracked": len(self._tracked),
+            "polls": self.polls,
+            "publishes": self.publishes,
+        }
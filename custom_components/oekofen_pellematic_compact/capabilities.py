@@ -0,0 +1,122 @@
+"""Firmware capability profile derived from a single API response.
+
+Setup used to query the controller several times before the first poll:
+once to detect the firmware type, once for the charset and once more to
+pre-fetch the data, each request subject to the controller's 2.5 s request
+spacing. The capability probe derives everything from one ``?`` response:
+
+- the charset (``charset.detect_charset``), unless one is configured
+- the API suffix and old-firmware flag (metadata presence)
+- the component counts (``discover_components_from_api``)
+- the number of keys per component and a hash of the key set, enough to
+  tell whether a later payload has the same keys without storing them
+
+The profile is stored in the config entry under ``CONF_CAPABILITIES`` and
+carries ``CAPABILITY_PROFILE_VERSION``; a profile of another version is
+probed again on the next setup. The hub uses it for fast paths, e.g.
+sensors skip the unit-based scaling for old firmware when the polled
+payload is known to carry metadata.
+"""
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, Optional
+
+from .const import CONF_API_SUFFIX, CONF_CHARSET, CONF_OLD_FIRMWARE
+
+# Bump when the profile layout or its derivation changes
+CAPABILITY_PROFILE_VERSION = 2
+PROFILE_VERSION = "version"
+PROFILE_METADATA = "metadata"
+PROFILE_COMPONENTS = "components"
+PROFILE_KEY_COUNTS = "key_counts"
+PROFILE_KEY_HASH = "key_hash"
+
+# Keys that only appear in metadata entries
+_METADATA_KEYS = ("val", "unit", "factor", "format")
+
+
+def response_has_metadata(data: Dict[str, Any]) -> bool:
+    """Check if API response contains metadata (val, unit, factor).
+
+    Args:
+        data: Parsed JSON data from API
+
+    Returns:
+        True if response contains metadata, False if simple values only
+    """
+    for section_value in data.values():
+        if isinstance(section_value, dict):
+            for field_value in section_value.values():
+                if isinstance(field_value, dict) and any(key in field_value for key in _METADATA_KEYS):
+                    return True
+    return False
+
+
+def build_capability_profile(
+    data: Dict[str, Any],
+    charset: str,
+    api_suffix: str,
+    probe_suffix: str,
+    components: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Build a capability profile from one parsed API response.
+
+    Args:
+        data: Parsed API response
+        charset: Charset the hub decodes responses with, the configured one
+            if the user chose one, else the detected one
+        api_suffix: API suffix the hub polls with ('?' or '??')
+        probe_suffix: API suffix the response was fetched with
+        components: Component counts from ``discover_components_from_api``
+
+    Returns:
+        Versioned profile, JSON serializable for the config entry
+    """
+    return {
+        PROFILE_VERSION: CAPABILITY_PROFILE_VERSION,
+        CONF_CHARSET: charset,
+        CONF_API_SUFFIX: api_suffix,
+        CONF_OLD_FIRMWARE: api_suffix == "??",
+        # Only known for the suffix the response was fetched with
+        PROFILE_METADATA: probe_suffix == api_suffix and response_has_metadata(data),
+        PROFILE_COMPONENTS: dict(components),
+        PROFILE_KEY_COUNTS: {
+            component: len(section)
+            for component, section in data.items()
+            if isinstance(section, dict)
+        },
+        PROFILE_KEY_HASH: key_set_hash(data),
+    }
+
+
+def key_set_hash(data: Dict[str, Any]) -> str:
+    """Return a short hash of the component keys in an API response.
+
+    Equal for payloads with the same keys, whatever their values and order.
+    """
+    keys = sorted(
+        f"{component}.{key}"
+        for component, section in data.items()
+        if isinstance(section, dict)
+        for key in section
+    )
+    return hashlib.sha256("\n".join(keys).encode("utf-8")).hexdigest()[:16]
+
+
+def is_current_profile(profile: Optional[Dict[str, Any]]) -> bool:
+    """Return True if a stored profile has the current version."""
+    return isinstance(profile, dict) and profile.get(PROFILE_VERSION) == CAPABILITY_PROFILE_VERSION
+
+
+def polls_with_metadata(profile: Optional[Dict[str, Any]], api_suffix: str) -> bool:
+    """Return True if the profile guarantees metadata in payloads polled with ``api_suffix``.
+
+    A profile probed with another suffix (e.g. before the user switched the
+    old-firmware flag) guarantees nothing.
+    """
+    return (
+        is_current_profile(profile)
+        and profile.get(CONF_API_SUFFIX) == api_suffix
+        and bool(profile.get(PROFILE_METADATA))
+    )
@@ -0,0 +1,116 @@
+"""Charset detection for raw controller responses.
+
+The controller sends UTF-8, ISO-8859-1 or a mix of both (UTF-8 for most
+fields, ISO-8859-1 bytes in some values such as location names). The
+detector works on the raw bytes with C-level operations only:
+
+1. ``bytes.isascii`` and a strict UTF-8 decode settle the common cases: an
+   ASCII payload decodes identically in every supported charset, and a
+   payload that decodes cleanly is UTF-8.
+2. Otherwise ``bytes.translate`` removes every high-bit byte to count the
+   non-ASCII bytes, and one ``decode("utf-8", "replace")`` pass turns every
+   invalid sequence into a U+FFFD replacement character. ASCII bytes always
+   decode to themselves, so the number of non-ASCII characters is the
+   decoded length minus the ASCII byte count.
+
+If less than ``MIXED_ENCODING_THRESHOLD`` of the non-ASCII characters are
+replacements, the payload is (mostly) UTF-8, otherwise ISO-8859-1.
+
+Payloads in either of these charsets are decoded by ``decode_payload``
+span by span: as UTF-8, with only the invalid byte sequences decoded as
+Latin-1. A mixed payload thus keeps its ISO-8859-1 umlauts and degree
+signs instead of losing them to ``decode(charset, "ignore")``.
+"""
+from __future__ import annotations
+
+import codecs
+from functools import lru_cache
+from typing import NamedTuple
+
+# All bytes with the high bit set
+HIGH_BYTES = bytes(range(0x80, 0x100))
+# Share of replaced non-ASCII characters from which a payload counts as ISO-8859-1
+MIXED_ENCODING_THRESHOLD = 0.2
+# Codec error handler decoding invalid UTF-8 sequences as Latin-1
+LATIN1_FALLBACK = "oekofen_latin1_fallback"
+# Charsets the controller actually uses; both are decoded span by span
+_MIXED_CHARSETS = frozenset({"utf-8", "iso8859-1"})
+
+
+def _latin1_fallback(error: UnicodeError) -> tuple[str, int]:
+    """Decode an invalid UTF-8 span as Latin-1 and resume after it."""
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    return error.object[error.start:error.end].decode("latin-1"), error.end
+
+
+codecs.register_error(LATIN1_FALLBACK, _latin1_fallback)
+
+
+@lru_cache(maxsize=None)
+def _decodes_mixed(charset: str) -> bool:
+    """Return True if a configured charset is decoded span by span."""
+    try:
+        return codecs.lookup(charset).name in _MIXED_CHARSETS
+    except LookupError:
+        return False
+
+
+def decode_payload(raw_data: bytes, charset: str) -> str:
+    """Decode a raw API response.
+
+    UTF-8 and ISO-8859-1 (the configured or detected charset) are decoded as
+    UTF-8 with a Latin-1 fallback for invalid spans, in a single pass. Any
+    other charset a user configured explicitly is used as is.
+
+    Args:
+        raw_data: Raw response bytes from the controller
+        charset: Configured character encoding
+
+    Returns:
+        Decoded response text
+    """
+    if _decodes_mixed(charset):
+        return raw_data.decode("utf-8", LATIN1_FALLBACK)
+    return raw_data.decode(charset, "ignore")
+
+
+class CharsetDetection(NamedTuple):
+    """Result of a charset detection."""
+
+    charset: str
+    # 1.0 if the payload decodes completely, otherwise the share of
+    # non-ASCII characters that the chosen charset decodes as intended
+    confidence: float
+    # Invalid UTF-8 sequences in the payload
+    invalid: int = 0
+
+
+def detect_charset(raw_data: bytes) -> CharsetDetection:
+    """Detect the charset of a raw API response.
+
+    Args:
+        raw_data: Raw bytes from the API
+
+    Returns:
+        Detected charset ('utf-8' or 'iso-8859-1') with confidence
+    """
+    if raw_data.isascii():
+        # ASCII only - default to UTF-8 (modern standard)
+        return CharsetDetection("utf-8", 1.0)
+    try:
+        raw_data.decode("utf-8")
+        return CharsetDetection("utf-8", 1.0)
+    except UnicodeDecodeError:
+        pass
+
+    high_bytes = len(raw_data) - len(raw_data.translate(None, HIGH_BYTES))
+    decoded = raw_data.decode("utf-8", "replace")
+    non_ascii = len(decoded) - (len(raw_data) - high_bytes)
+    replacements = decoded.count("�")
+    ratio = replacements / non_ascii
+    if ratio < MIXED_ENCODING_THRESHOLD:
+        # Mixed encoding: mostly UTF-8 with some ISO-8859-1 bytes, which
+        # show as replacement characters in rare fields like location names
+        return CharsetDetection("utf-8", 1.0 - ratio, replacements)
+    return CharsetDetection("iso-8859-1", ratio, replacements)
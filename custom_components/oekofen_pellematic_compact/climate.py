@@ -307,8 +307,7 @@ class PellematicClimate(ClimateEntity):
                 temperature_int = int(round(temperature * 10))
                 self._attr_target_temperature_slow = temperature
                 _LOGGER.info("Sending setback temperature for %s: %s", self._prefix, temperature_int)
-                await self.hass.async_add_executor_job(
-                    self._hub.send_pellematic_data,
+                await self._hub.async_send_pellematic_data(
                     temperature_int,
                     self._prefix,
                     "temp_setback"
@@ -358,8 +357,7 @@ class PellematicClimate(ClimateEntity):
                     adjusted_temp_heat, temperature_int,
                 )
                 _LOGGER.info("Sending heat temperature for %s: %s", self._prefix, temperature_int)
-                await self.hass.async_add_executor_job(
-                    self._hub.send_pellematic_data,
+                await self._hub.async_send_pellematic_data(
                     temperature_int,
                     self._prefix,
                     "temp_heat"
@@ -388,24 +386,21 @@ class PellematicClimate(ClimateEntity):
         try:
             if hvac_mode == HVACMode.OFF:
                 _LOGGER.info("Sending OFF mode (3) for %s", self._prefix)
-                await self.hass.async_add_executor_job(
-                    self._hub.send_pellematic_data,
+                await self._hub.async_send_pellematic_data(
                     3,
                     self._prefix,
                     "mode_auto"
                 )
             elif hvac_mode == HVACMode.HEAT:
                 _LOGGER.info("Sending HEAT mode (2) for %s", self._prefix)
-                await self.hass.async_add_executor_job(
-                    self._hub.send_pellematic_data,
+                await self._hub.async_send_pellematic_data(
                     2, 
                     self._prefix,
                     "mode_auto"
                 )
             elif hvac_mode == HVACMode.AUTO:
                 _LOGGER.info("Sending AUTO mode (1) for %s", self._prefix)
-                await self.hass.async_add_executor_job(
-                    self._hub.send_pellematic_data,
+                await self._hub.async_send_pellematic_data(
                     1,   
                     self._prefix,
                     "mode_auto"
@@ -446,8 +441,7 @@ class PellematicClimate(ClimateEntity):
             oekomode_value = oekomode_map[preset_mode]
             
             # Send to API
-            await self.hass.async_add_executor_job(
-                self._hub.send_pellematic_data,
+            await self._hub.async_send_pellematic_data(
                 oekomode_value,
                 self._prefix,
                 "oekomode"
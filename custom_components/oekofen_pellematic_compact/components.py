@@ -0,0 +1,118 @@
+"""Index of the components in an API response, built in one pass.
+
+The top-level keys of a response are component instances (``hk1``,
+``pe2``, ``wireless1``) or single components (``system``, ``power``,
+``stirling``). ``ComponentIndex`` splits every key once into family and
+instance number; counting a family or checking for an optional component
+is a lookup afterwards.
+
+Component discovery is driven by the tables below. A new component family
+only needs an entry there, no additional scan of the response.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+from .const import (
+    CONF_CIRCULATOR,
+    CONF_NUM_OF_BUFFER_STORAGE,
+    CONF_NUM_OF_HEAT_PUMPS,
+    CONF_NUM_OF_HEATING_CIRCUIT,
+    CONF_NUM_OF_HOT_WATER,
+    CONF_NUM_OF_PELLEMATIC_HEATER,
+    CONF_NUM_OF_SMART_PV_SE,
+    CONF_NUM_OF_SMART_PV_SK,
+    CONF_NUM_OF_WIRELESS_SENSORS,
+    CONF_SMART_PV,
+    CONF_SOLAR_CIRCUIT,
+    CONF_STIRLING,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_DIGITS = "0123456789"
+
+# Counted component families and the config key of their count
+COUNTED_FAMILIES: Tuple[Tuple[str, str], ...] = (
+    ("hk", CONF_NUM_OF_HEATING_CIRCUIT),
+    ("ww", CONF_NUM_OF_HOT_WATER),
+    ("pe", CONF_NUM_OF_PELLEMATIC_HEATER),
+    ("sk", CONF_NUM_OF_SMART_PV_SK),
+    ("se", CONF_NUM_OF_SMART_PV_SE),
+    ("wp", CONF_NUM_OF_HEAT_PUMPS),
+    ("pu", CONF_NUM_OF_BUFFER_STORAGE),
+    ("wireless", CONF_NUM_OF_WIRELESS_SENSORS),
+)
+
+# Families whose presence sets an additional config flag
+FAMILY_FLAGS: Tuple[Tuple[str, str], ...] = (
+    ("sk", CONF_SOLAR_CIRCUIT),
+    ("se", CONF_SOLAR_CIRCUIT),
+)
+
+# Optional components and the config flag set if they are present
+OPTIONAL_COMPONENTS: Tuple[Tuple[str, str], ...] = (
+    ("stirling", CONF_STIRLING),
+    ("circ1", CONF_CIRCULATOR),
+    ("power", CONF_SMART_PV),
+)
+
+
+class ComponentIndex:
+    """Component families and instance numbers of one API response."""
+
+    __slots__ = ("data", "names", "instances")
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        """Index the top-level keys of an API response.
+
+        Args:
+            data: Parsed API response
+        """
+        # The indexed snapshot, to tell whether the index is still current
+        self.data = data
+        self.names: FrozenSet[str] = frozenset(data)
+        instances: Dict[str, List[int]] = {}
+        for name in self.names:
+            # Instance keys are family letters followed by the instance number
+            family = name.rstrip(_DIGITS)
+            if family != name and family.isalpha():
+                instances.setdefault(family, []).append(int(name[len(family):]))
+        for numbers in instances.values():
+            numbers.sort()
+        # Family (e.g. 'hk') -> sorted instance numbers
+        self.instances = instances
+
+    def count(self, family: str) -> int:
+        """Return the number of instances of a component family."""
+        return len(self.instances.get(family, ()))
+
+    def components(self, family: str) -> List[str]:
+        """Return the component keys of a family, ordered by instance number."""
+        return [f"{family}{number}" for number in self.instances.get(family, ())]
+
+    def __contains__(self, name: object) -> bool:
+        """Return True if the response has the component."""
+        return name in self.names
+
+    def discovered(self) -> Dict[str, Any]:
+        """Return the component counts and flags for the config entry.
+
+        Families without instances and absent optional components are left
+        out, so they never overwrite a configured value.
+        """
+        discovered: Dict[str, Any] = {}
+        for family, conf_key in COUNTED_FAMILIES:
+            count = self.count(family)
+            if count > 0:
+                discovered[conf_key] = count
+                _LOGGER.debug("Discovered %d '%s' component(s)", count, family)
+        for family, conf_key in FAMILY_FLAGS:
+            if family in self.instances:
+                discovered[conf_key] = True
+        for name, conf_key in OPTIONAL_COMPONENTS:
+            if name in self.names:
+                discovered[conf_key] = True
+                _LOGGER.debug("Discovered optional component '%s'", name)
+        return discovered
@@ -13,6 +13,10 @@ from homeassistant.const import (
     CONF_SCAN_INTERVAL,
 )
 
+from .capabilities import build_capability_profile, response_has_metadata
+from .charset import decode_payload, detect_charset
+from .dynamic_discovery import discover_all_entities
+from .entity_filter import EntityFilter, entity_preview
 from .const import (
     CONF_CHARSET,
     DEFAULT_CHARSET,
@@ -20,6 +24,33 @@ from .const import (
     DEFAULT_API_SUFFIX,
     CONF_OLD_FIRMWARE,
     DEFAULT_OLD_FIRMWARE,
+    CONF_FIXED_DELAY_POLLING,
+    DEFAULT_FIXED_DELAY_POLLING,
+    CONF_ADAPTIVE_POLLING,
+    DEFAULT_ADAPTIVE_POLLING,
+    CONF_MIN_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    CONF_TIERED_POLLING,
+    DEFAULT_TIERED_POLLING,
+    CONF_FULL_REFRESH_INTERVAL,
+    DEFAULT_FULL_REFRESH_INTERVAL,
+    CONF_DEADBAND_FILTER,
+    DEFAULT_DEADBAND_FILTER,
+    CONF_DEADBAND_MAX_SILENCE,
+    DEFAULT_DEADBAND_MAX_SILENCE,
+    CONF_PUBLISH_INTERVAL,
+    DEFAULT_PUBLISH_INTERVAL,
+    CONF_SNAPSHOT_EVENT,
+    DEFAULT_SNAPSHOT_EVENT,
+    CONF_DATA_LOG,
+    DEFAULT_DATA_LOG,
+    CONF_DATA_LOG_MAX_SIZE,
+    DEFAULT_DATA_LOG_MAX_SIZE,
+    CONF_INCLUDE_ENTITIES,
+    CONF_EXCLUDE_ENTITIES,
+    CONF_CAPABILITIES,
     DOMAIN,
     DEFAULT_HOST,
     DEFAULT_NAME,
@@ -81,6 +112,22 @@ def charset_valid(charset: str) -> bool:
         return False
 
 
+def entity_filter_valid(config: Dict[str, Any]) -> bool:
+    """Return True if the include/exclude patterns of a config compile.
+
+    Args:
+        config: Config entry data or form input
+
+    Returns:
+        True if the patterns are valid, False otherwise
+    """
+    try:
+        EntityFilter.from_config(config)
+    except ValueError:
+        return False
+    return True
+
+
 def detect_charset_from_response(raw_data: bytes) -> str:
     """Detect the most likely charset from API response data.
     
@@ -94,37 +141,7 @@ def detect_charset_from_response(raw_data: bytes) -> str:
     Returns:
         Suggested charset ('utf-8' or 'iso-8859-1')
     """
-    # Try UTF-8 first with strict decoding
-    try:
-        decoded_utf8 = raw_data.decode('utf-8')
-        # Successfully decoded as UTF-8 - this is the modern standard
-        # Check if it contains any non-ASCII characters
-        if any(ord(char) > 127 for char in decoded_utf8):
-            # Contains non-ASCII characters and decodes cleanly - it's UTF-8
-            return 'utf-8'
-        # Only ASCII characters - could be either, default to UTF-8 (modern standard)
-        return 'utf-8'
-    except UnicodeDecodeError:
-        # UTF-8 strict decode failed - could be ISO-8859-1 or mixed encoding
-        # Try UTF-8 with replace to see how many characters are problematic
-        decoded_utf8_replace = raw_data.decode('utf-8', errors='replace')
-        replacement_count = decoded_utf8_replace.count('�')
-        
-        # Count non-ASCII characters
-        non_ascii_count = sum(1 for char in decoded_utf8_replace if ord(char) > 127)
-        
-        # If replacement characters are less than 20% of non-ASCII chars,
-        # it's likely mixed encoding with mostly UTF-8 → prefer UTF-8
-        # Increased threshold from 10% to 20% to handle smaller responses
-        if non_ascii_count > 0 and replacement_count / non_ascii_count < 0.2:
-            # Mixed encoding detected: mostly UTF-8 with some ISO-8859-1 bytes
-            # Prefer UTF-8 as it handles the majority of the content correctly
-            # Individual ISO-8859-1 bytes will show as � which is acceptable
-            # for rare fields like location names
-            return 'utf-8'
-        
-        # Too many problematic characters - it's likely all ISO-8859-1
-        return 'iso-8859-1'
+    return detect_charset(raw_data).charset
 
 
 def api_response_has_metadata(data: dict) -> bool:
@@ -138,24 +155,7 @@ def api_response_has_metadata(data: dict) -> bool:
     Returns:
         True if response contains metadata, False if simple values only
     """
-    # Check a few common fields to see if they contain metadata
-    # Look for nested dictionaries with 'val', 'unit', or 'factor' keys
-    for section_key, section_value in data.items():
-        if isinstance(section_value, dict):
-            # Check fields within this section
-            for field_key, field_value in section_value.items():
-                if isinstance(field_value, dict):
-                    # Check if this looks like metadata structure
-                    if any(key in field_value for key in ['val', 'unit', 'factor', 'format']):
-                        return True
-                    # Found dict but no metadata keys - might be old format
-                elif isinstance(field_value, (str, int, float, bool)):
-                    # Found simple value - this might be old firmware
-                    # But continue checking in case it's mixed
-                    continue
-    
-    # No metadata found in any field
-    return False
+    return response_has_metadata(data)
 
 
 @callback
@@ -176,6 +176,8 @@ class OekofenPellematicCompactConfigFlow(config_entries.ConfigFlow, domain=DOMAI
         """Initialize the config flow."""
         self._charset = DEFAULT_CHARSET
         self._api_suffix = DEFAULT_API_SUFFIX
+        # Entry, new data and entity preview of a reconfigure awaiting confirmation
+        self._pending_reconfigure = None
 
     def _normalize_url(self, host: str, suffix: str = "?") -> str:
         """Normalize the URL by ensuring it ends with the correct API suffix.
@@ -323,10 +325,10 @@ class OekofenPellematicCompactConfigFlow(config_entries.ConfigFlow, domain=DOMAI
             # Detect optimal charset if requested
             if detect_charset:
                 suggested_charset = detect_charset_from_response(raw_data)
-                str_response = raw_data.decode(suggested_charset, 'ignore')
+                str_response = decode_payload(raw_data, suggested_charset)
             else:
                 suggested_charset = None
-                str_response = raw_data.decode(self._charset, 'ignore')
+                str_response = decode_payload(raw_data, self._charset)
             
             # Apply hotfix for invalid JSON
             str_response = str_response.replace("L_statetext:", 'L_statetext":')
@@ -467,6 +469,15 @@ class OekofenPellematicCompactConfigFlow(config_entries.ConfigFlow, domain=DOMAI
                             
                             # Merge user input with discovered components and create entry directly
                             final_config = {**discovered, **user_input}
+                            # Cache what the probe response tells about the firmware,
+                            # so that setup needs no further detection request
+                            final_config[CONF_CAPABILITIES] = build_capability_profile(
+                                data,
+                                user_input[CONF_CHARSET],
+                                suggested_suffix,
+                                "?" if should_auto_detect_old_firmware else suggested_suffix,
+                                discovered,
+                            )
                             
                             # Set unique ID and create entry
                             await self.async_set_unique_id(final_config[CONF_HOST])
@@ -521,6 +532,12 @@ class OekofenPellematicCompactConfigFlow(config_entries.ConfigFlow, domain=DOMAI
                 errors[CONF_CHARSET] = "invalid_charset"
             elif not host_valid(host):
                 errors[CONF_HOST] = "invalid_host_ip"
+            elif user_input.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL) > user_input.get(
+                CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+            ):
+                errors[CONF_MAX_SCAN_INTERVAL] = "invalid_interval_bounds"
+            elif not entity_filter_valid(user_input):
+                errors[CONF_EXCLUDE_ENTITIES] = "invalid_entity_filter"
             else:
                 # Clean host URL (remove any existing ? or ??)
                 clean_host = host.strip().rstrip('?')
@@ -614,12 +631,25 @@ class OekofenPellematicCompactConfigFlow(config_entries.ConfigFlow, domain=DOMAI
                         # Merge: current config + discovered components + user input
                         # User input takes precedence to preserve scan_interval, charset, old_firmware
                         updated_config = {**current_config, **discovered, **user_input}
-                        self.hass.config_entries.async_update_entry(
-                            config_entry,
-                            data=updated_config,
+                        updated_config[CONF_CAPABILITIES] = build_capability_profile(
+                            data,
+                            user_input[CONF_CHARSET],
+                            suggested_suffix,
+                            suggested_suffix if old_firmware_manually_changed else "?",
+                            discovered,
                         )
-                        await self.hass.config_entries.async_reload(config_entry.entry_id)
-                        return self.async_abort(reason="reconfiguration_successful")
+                        if any(
+                            updated_config.get(key, "") != current_config.get(key, "")
+                            for key in (CONF_INCLUDE_ENTITIES, CONF_EXCLUDE_ENTITIES)
+                        ):
+                            # Show what the new entity filter keeps before applying it
+                            preview = entity_preview(
+                                discover_all_entities(data),
+                                discover_all_entities(data, EntityFilter.from_config(updated_config)),
+                            )
+                            self._pending_reconfigure = (config_entry, updated_config, preview)
+                            return await self.async_step_reconfigure_filter()
+                        return await self._async_apply_reconfigure(config_entry, updated_config)
                         
                 except Exception as e:
                     import logging
@@ -639,6 +669,56 @@ class OekofenPellematicCompactConfigFlow(config_entries.ConfigFlow, domain=DOMAI
                 vol.Optional(CONF_SCAN_INTERVAL, default=current_config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)): int,
                 vol.Optional(CONF_CHARSET, default=current_config.get(CONF_CHARSET, DEFAULT_CHARSET)): str,
                 vol.Optional(CONF_OLD_FIRMWARE, default=current_config.get(CONF_OLD_FIRMWARE, DEFAULT_OLD_FIRMWARE)): bool,
+                vol.Optional(
+                    CONF_FIXED_DELAY_POLLING,
+                    default=current_config.get(CONF_FIXED_DELAY_POLLING, DEFAULT_FIXED_DELAY_POLLING),
+                ): bool,
+                vol.Optional(
+                    CONF_ADAPTIVE_POLLING,
+                    default=current_config.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING),
+                ): bool,
+                vol.Optional(
+                    CONF_MIN_SCAN_INTERVAL,
+                    default=current_config.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+                ): vol.All(int, vol.Range(min=3)),
+                vol.Optional(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=current_config.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+                ): vol.All(int, vol.Range(min=3)),
+                vol.Optional(
+                    CONF_TIERED_POLLING,
+                    default=current_config.get(CONF_TIERED_POLLING, DEFAULT_TIERED_POLLING),
+                ): bool,
+                vol.Optional(
+                    CONF_FULL_REFRESH_INTERVAL,
+                    default=current_config.get(CONF_FULL_REFRESH_INTERVAL, DEFAULT_FULL_REFRESH_INTERVAL),
+                ): vol.All(int, vol.Range(min=60)),
+                vol.Optional(
+                    CONF_DEADBAND_FILTER,
+                    default=current_config.get(CONF_DEADBAND_FILTER, DEFAULT_DEADBAND_FILTER),
+                ): bool,
+                vol.Optional(
+                    CONF_DEADBAND_MAX_SILENCE,
+                    default=current_config.get(CONF_DEADBAND_MAX_SILENCE, DEFAULT_DEADBAND_MAX_SILENCE),
+                ): vol.All(int, vol.Range(min=60)),
+                vol.Optional(
+                    CONF_PUBLISH_INTERVAL,
+                    default=current_config.get(CONF_PUBLISH_INTERVAL, DEFAULT_PUBLISH_INTERVAL),
+                ): vol.All(int, vol.Range(min=0)),
+                vol.Optional(
+                    CONF_SNAPSHOT_EVENT,
+                    default=current_config.get(CONF_SNAPSHOT_EVENT, DEFAULT_SNAPSHOT_EVENT),
+                ): bool,
+                vol.Optional(
+                    CONF_DATA_LOG,
+                    default=current_config.get(CONF_DATA_LOG, DEFAULT_DATA_LOG),
+                ): bool,
+                vol.Optional(
+                    CONF_DATA_LOG_MAX_SIZE,
+                    default=current_config.get(CONF_DATA_LOG_MAX_SIZE, DEFAULT_DATA_LOG_MAX_SIZE),
+                ): vol.All(int, vol.Range(min=1)),
+                vol.Optional(CONF_INCLUDE_ENTITIES, default=current_config.get(CONF_INCLUDE_ENTITIES, "")): str,
+                vol.Optional(CONF_EXCLUDE_ENTITIES, default=current_config.get(CONF_EXCLUDE_ENTITIES, "")): str,
             }
         )
 
@@ -648,3 +728,27 @@ class OekofenPellematicCompactConfigFlow(config_entries.ConfigFlow, domain=DOMAI
             errors=errors,
             description_placeholders=description_placeholders,
         )
+
+    async def async_step_reconfigure_filter(self, user_input: Dict[str, Any] | None = None):
+        """Show the entity count and memory preview of a changed entity filter."""
+        if self._pending_reconfigure is None:
+            return self.async_abort(reason="entry_not_found")
+        config_entry, updated_config, preview = self._pending_reconfigure
+        if user_input is not None:
+            self._pending_reconfigure = None
+            return await self._async_apply_reconfigure(config_entry, updated_config)
+
+        return self.async_show_form(
+            step_id="reconfigure_filter",
+            data_schema=vol.Schema({}),
+            description_placeholders={key: str(value) for key, value in preview.items()},
+        )
+
+    async def _async_apply_reconfigure(self, config_entry, updated_config: Dict[str, Any]):
+        """Save the reconfigured entry data and reload the entry."""
+        self.hass.config_entries.async_update_entry(
+            config_entry,
+            data=updated_config,
+        )
+        await self.hass.config_entries.async_reload(config_entry.entry_id)
+        return self.async_abort(reason="reconfiguration_successful")
@@ -4,6 +4,41 @@
 DOMAIN = "oekofen_pellematic_compact"
 DEFAULT_NAME = "Pellematic"
 DEFAULT_SCAN_INTERVAL = 30
+DEFAULT_FIXED_DELAY_POLLING = False
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_MIN_SCAN_INTERVAL = 10
+DEFAULT_MAX_SCAN_INTERVAL = 300
+# Minimum seconds between API calls (the controller answers faster requests with HTTP 401)
+MIN_FETCH_INTERVAL = 2.5
+# Adaptive polling: change rate of key values (scaled units per minute, e.g. °C/min)
+# above which the interval shrinks and below which it grows
+ADAPTIVE_ACTIVE_RATE = 0.5
+ADAPTIVE_QUIET_RATE = 0.1
+DEFAULT_TIERED_POLLING = False
+# Seconds between full /all fetches in tiered mode (the fast tier is fetched every poll)
+DEFAULT_FULL_REFRESH_INTERVAL = 600
+DEFAULT_DEADBAND_FILTER = False
+# Seconds after which a sensor within its deadband is published anyway
+DEFAULT_DEADBAND_MAX_SILENCE = 600
+# Seconds between entity updates; 0 publishes after every poll
+DEFAULT_PUBLISH_INTERVAL = 0
+DEFAULT_SNAPSHOT_EVENT = False
+DEFAULT_DATA_LOG = False
+# Size limit of a hub's data log files in MiB
+DEFAULT_DATA_LOG_MAX_SIZE = 100
+# Bus event with the values changed by a poll (snapshot.py)
+EVENT_SNAPSHOT = f"{DOMAIN}_snapshot"
+DEFAULT_RECORDING_MINUTES = 60
+MAX_RECORDING_MINUTES = 1440
+
+# Domain-wide poll scheduler (hass.data key, separate from the per-hub DOMAIN dict)
+DATA_POLL_SCHEDULER = f"{DOMAIN}_poll_scheduler"
+# Maximum number of hubs polling (fetch, parse, entity updates) at the same time
+MAX_CONCURRENT_POLLS = 2
+
+# Controller I/O executor (hass.data key) and its thread limit for all controllers
+DATA_IO_EXECUTOR = f"{DOMAIN}_io_executor"
+IO_MAX_WORKERS = 4
 
 # Default values for configuration
 DEFAULT_NUM_OF_HEATING_CIRCUIT = 1
@@ -23,6 +58,21 @@ CONF_STIRLING = "stirling"
 CONF_CHARSET = "charset"
 CONF_API_SUFFIX = "api_suffix"  # "?" or "??" for old firmware compatibility
 CONF_OLD_FIRMWARE = "old_firmware"  # Boolean flag for old firmware mode
+CONF_FIXED_DELAY_POLLING = "fixed_delay_polling"  # Next poll = end of last poll + interval
+CONF_ADAPTIVE_POLLING = "adaptive_polling"  # Interval follows value changes and latency
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_TIERED_POLLING = "tiered_polling"  # Fast components every poll, /all rarely
+CONF_FULL_REFRESH_INTERVAL = "full_refresh_interval"
+CONF_DEADBAND_FILTER = "deadband_filter"  # Publish measurements only on significant changes
+CONF_DEADBAND_MAX_SILENCE = "deadband_max_silence"
+CONF_PUBLISH_INTERVAL = "publish_interval"  # Entity updates slower than polls, with window aggregates
+CONF_SNAPSHOT_EVENT = "snapshot_event"  # One bus event per poll with the changed values
+CONF_DATA_LOG = "data_log"  # Columnar log of every poll (datalog.py)
+CONF_DATA_LOG_MAX_SIZE = "data_log_max_size"
+CONF_INCLUDE_ENTITIES = "include_entities"  # Entity filter patterns (entity_filter.py)
+CONF_EXCLUDE_ENTITIES = "exclude_entities"
+CONF_CAPABILITIES = "capabilities"  # Versioned firmware capability profile (capabilities.py)
 CONF_NUM_OF_HEATING_CIRCUIT = "num_of_heating_circuits"
 CONF_NUM_OF_PELLEMATIC_HEATER = "num_of_pellematic_heaters"
 CONF_NUM_OF_SMART_PV_SE = "num_of_smart_pv_se_count"
@@ -0,0 +1,429 @@
+"""Columnar log of every poll, independent of the Home Assistant recorder.
+
+Combustion tuning and fault analysis need every poll of the boiler, heating
+circuit and buffer values, which would bloat the recorder database. The data
+logger keeps them in compact files of its own instead, one per hub and day
+(``<hub>_<YYYYMMDD>.col``); the oldest files are deleted when the files of a
+hub exceed their size limit.
+
+On the event loop a poll only copies the raw numeric values of the logged
+components into an array; every ``DATALOG_BATCH_SIZE`` polls (or after
+``DATALOG_FLUSH_INTERVAL`` seconds) the batch is written by an executor job.
+
+A file starts with ``DATALOG_MAGIC`` and is followed by records of the form::
+
+    kind (1 byte) | length (uint32) | payload
+
+``RECORD_KEYS`` adds keys to the file's key dictionary, so every key name is
+stored once per file; the id of a key is its position in the dictionary::
+
+    count (uint16) | count * (factor (float64) | length (uint16) | 'component.key')
+
+``RECORD_BLOCK`` holds a batch of polls column by column, zlib compressed
+if ``FLAG_COMPRESSED`` is set::
+
+    rows (uint32) | first timestamp (float64, seconds since epoch)
+    | rows - 1 timestamp deltas (uint32, milliseconds)
+    | columns (uint16) | columns * (key id (uint16) | rows raw values (float64, NaN if missing))
+
+Values are stored raw and scaled by the factor of their key when read.
+Keys of old firmware come without a factor; with ``unit_fallback`` they are
+stored with the factor their unit implies (``scaling.fallback_factor``), so
+they read as the values the sensor entities show.
+Records are only appended, so a file cut off by a crash is read up to its
+last complete record.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .dynamic_discovery import infer_fallback_scaling
+from .scaling import fallback_factor, scale_value
+
+_LOGGER = logging.getLogger(__name__)
+
+DATALOG_MAGIC = b"OEKCOL1\n"
+DATALOG_SUFFIX = ".col"
+
+RECORD_KEYS = 1
+RECORD_BLOCK = 2
+FLAG_COMPRESSED = 0x80
+
+# Component prefixes whose values are logged: boilers, heating circuits, buffers
+DATALOG_COMPONENTS = ("pe", "hk", "pu")
+# Polls per written block
+DATALOG_BATCH_SIZE = 60
+# Seconds after which a batch is written even if it is not full
+DATALOG_FLUSH_INTERVAL = 300
+
+_HEADER = struct.Struct("<BI")
+_KEY = struct.Struct("<dH")
+_BLOCK = struct.Struct("<Id")
+_COUNT = struct.Struct("<H")
+
+_NAN = float("nan")
+
+
+def _to_le(values: array) -> bytes:
+    """Return the bytes of an array in little-endian order."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode: str, data: bytes) -> array:
+    """Return an array from little-endian bytes."""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+@dataclass
+class LoggedPoll:
+    """Raw numeric values of one poll."""
+
+    timestamp: float
+    # (component, key) of every value, in the order of ``values``
+    names: List[Tuple[str, str]]
+    values: array
+
+
+@dataclass
+class DataLogBatch:
+    """Polls collected on the event loop, written by ``DataLogger.write``."""
+
+    polls: List[LoggedPoll] = field(default_factory=list)
+    # Factor of every (component, key) first seen in this batch
+    factors: Dict[Tuple[str, str], Any] = field(default_factory=dict)
+
+
+class DataLogger:
+    """Collects the values of every poll and appends them to day files.
+
+    ``append`` and ``take_batch`` run on the event loop; ``write`` runs in an
+    executor thread and is serialized with a lock.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        max_bytes: int,
+        components: Tuple[str, ...] = DATALOG_COMPONENTS,
+        batch_size: int = DATALOG_BATCH_SIZE,
+        flush_interval: float = DATALOG_FLUSH_INTERVAL,
+        clock: Callable[[], float] = time.time,
+        unit_fallback: bool = False,
+    ) -> None:
+        """Initialize the logger.
+
+        Args:
+            directory: Directory of the log files
+            name: Hub name, the prefix of the file names
+            max_bytes: Size limit of all log files of the hub
+            components: Component prefixes whose values are logged
+            batch_size: Polls per written block
+            flush_interval: Seconds after which a batch is written anyway
+            clock: Returns the wall-clock time in seconds
+            unit_fallback: Log keys without a factor with the factor implied
+                by their unit (``PellematicHub.unit_fallback``)
+        """
+        self.directory = directory
+        self.name = name
+        self.max_bytes = max_bytes
+        self._components = tuple(components)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._clock = clock
+        self._unit_fallback = unit_fallback
+        self._prefix = re.sub(r"[^\w-]", "_", name)
+        self._file_re = re.compile(rf"^{re.escape(self._prefix)}_\d{{8}}{re.escape(DATALOG_SUFFIX)}$")
+        self._batch = DataLogBatch()
+        # Names (shared by all polls) and factors of all keys seen (event loop side)
+        self._names: Dict[str, Dict[str, Tuple[str, str]]] = {}
+        self._factors: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+        # Key dictionary of the current file (executor side)
+        self._path: Optional[str] = None
+        self._key_ids: Dict[Tuple[str, str], int] = {}
+        self.polls = 0
+        self.blocks = 0
+        self.bytes_written = 0
+        self.files_deleted = 0
+        self.failed_batches = 0
+
+    def append(self, data: Dict[str, Any]) -> Optional[DataLogBatch]:
+        """Add the numeric values of a poll to the current batch.
+
+        Args:
+            data: The hub's data after the poll
+
+        Returns:
+            The batch to write if it is due, else None
+        """
+        names: List[Tuple[str, str]] = []
+        values = array("d")
+        for component, fields in data.items():
+            if not component.startswith(self._components) or not isinstance(fields, dict):
+                continue
+            component_names = self._names.get(component)
+            if component_names is None:
+                component_names = self._names[component] = {}
+            for key, raw in fields.items():
+                value = raw.get("val") if isinstance(raw, dict) else raw
+                if value.__class__ is str:
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        continue
+                elif value.__class__ not in (int, float):
+                    continue
+                name = component_names.get(key)
+                if name is None:
+                    name = component_names[key] = (component, key)
+                    factor = raw.get("factor") if isinstance(raw, dict) else None
+                    if factor is None:
+                        factor = self._fallback_factor(component, key, raw)
+                    self._factors[name] = self._batch.factors[name] = factor
+                names.append(name)
+                values.append(value)
+        now = self._clock()
+        polls = self._batch.polls
+        polls.append(LoggedPoll(now, names, values))
+        self.polls += 1
+        if len(polls) >= self._batch_size or now - polls[0].timestamp >= self._flush_interval:
+            return self.take_batch()
+        return None
+
+    def _fallback_factor(self, component: str, key: str, raw: Any) -> Any:
+        """Return the factor of a key without one: implied by its unit, or 1."""
+        if not self._unit_fallback:
+            return 1
+        factor = fallback_factor(*infer_fallback_scaling(key, raw), component)
+        return 1 if factor is None else factor
+
+    def take_batch(self) -> Optional[DataLogBatch]:
+        """Return the collected polls to write, None if there are none."""
+        batch = self._batch
+        if not batch.polls:
+            return None
+        self._batch = DataLogBatch()
+        return batch
+
+    def write(self, batch: DataLogBatch) -> None:
+        """Append a batch to the day file of its first poll (blocking).
+
+        Errors are logged, the batch is then lost.
+        """
+        with self._lock:
+            try:
+                self._write_locked(batch)
+            except OSError as err:
+                # The key dictionary may not match the file anymore
+                self._path = None
+                self.failed_batches += 1
+                _LOGGER.error("Failed to write data log of '%s': %s", self.name, err)
+
+    def _write_locked(self, batch: DataLogBatch) -> None:
+        first = batch.polls[0].timestamp
+        day = time.strftime("%Y%m%d", time.localtime(first))
+        path = os.path.join(self.directory, f"{self._prefix}_{day}{DATALOG_SUFFIX}")
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, "ab") as file:
+            start = file.tell()
+            if start == 0:
+                self._key_ids = {}
+                file.write(DATALOG_MAGIC)
+            elif path != self._path:
+                self._key_ids = read_key_ids(path)
+            self._path = path
+
+            # Columns in the order of the file's key dictionary
+            columns: Dict[int, array] = {}
+            new_keys: List[Tuple[str, str]] = []
+            rows = len(batch.polls)
+            for row, poll in enumerate(batch.polls):
+                for name, value in zip(poll.names, poll.values):
+                    key_id = self._key_ids.get(name)
+                    if key_id is None:
+                        key_id = self._key_ids[name] = len(self._key_ids)
+                        new_keys.append(name)
+                    column = columns.get(key_id)
+                    if column is None:
+                        column = columns[key_id] = array("d", [_NAN]) * rows
+                    column[row] = value
+
+            if new_keys:
+                payload = [_COUNT.pack(len(new_keys))]
+                for name in new_keys:
+                    encoded = f"{name[0]}.{name[1]}".encode("utf-8")
+                    factor = batch.factors.get(name, self._factors.get(name, 1))
+                    try:
+                        factor = float(factor)
+                    except (TypeError, ValueError):
+                        factor = 1.0
+                    payload.append(_KEY.pack(factor, len(encoded)) + encoded)
+                _write_record(file, RECORD_KEYS, b"".join(payload))
+
+            deltas = array(
+                "I",
+                (
+                    max(0, round((current.timestamp - previous.timestamp) * 1000))
+                    for previous, current in zip(batch.polls, batch.polls[1:])
+                ),
+            )
+            payload = [_BLOCK.pack(rows, first), _to_le(deltas), _COUNT.pack(len(columns))]
+            for key_id in sorted(columns):
+                payload.append(_COUNT.pack(key_id) + _to_le(columns[key_id]))
+            _write_record(file, RECORD_BLOCK, b"".join(payload))
+            self.blocks += 1
+            self.bytes_written += file.tell() - start
+        self._enforce_limit(path)
+
+    def _enforce_limit(self, current: str) -> None:
+        """Delete the oldest files of the hub while all together exceed max_bytes."""
+        files = sorted(entry for entry in os.listdir(self.directory) if self._file_re.match(entry))
+        sizes = {entry: os.path.getsize(os.path.join(self.directory, entry)) for entry in files}
+        total = sum(sizes.values())
+        for entry in files:
+            if total <= self.max_bytes:
+                break
+            path = os.path.join(self.directory, entry)
+            if path == current:
+                continue
+            os.remove(path)
+            total -= sizes[entry]
+            self.files_deleted += 1
+            _LOGGER.debug("Deleted data log %s (size limit %d bytes)", path, self.max_bytes)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the settings and counters for diagnostics."""
+        return {
+            "max_bytes": self.max_bytes,
+            "components": list(self._components),
+            "polls": self.polls,
+            "pending": len(self._batch.polls),
+            "blocks": self.blocks,
+            "bytes_written": self.bytes_written,
+            "files_deleted": self.files_deleted,
+            "failed_batches": self.failed_batches,
+        }
+
+
+def _write_record(file: Any, kind: int, payload: bytes) -> None:
+    """Append one record, compressing blocks when it makes them smaller."""
+    if kind == RECORD_BLOCK:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < len(payload):
+            kind |= FLAG_COMPRESSED
+            payload = compressed
+    file.write(_HEADER.pack(kind, len(payload)) + payload)
+
+
+def _read_records(path: str):
+    """Yield (kind, payload) of all complete records of a log file."""
+    with open(path, "rb") as file:
+        if file.read(len(DATALOG_MAGIC)) != DATALOG_MAGIC:
+            raise ValueError(f"{path} is not a data log")
+        while True:
+            header = file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            kind, length = _HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length:
+                _LOGGER.warning("Data log %s ends with a truncated record", path)
+                return
+            if kind & FLAG_COMPRESSED:
+                try:
+                    payload = zlib.decompress(payload)
+                except zlib.error:
+                    _LOGGER.warning("Data log %s contains a corrupt record, stopping there", path)
+                    return
+            yield kind & ~FLAG_COMPRESSED, payload
+
+
+def _read_keys(payload: bytes) -> List[Tuple[str, float]]:
+    (count,) = _COUNT.unpack_from(payload)
+    offset = _COUNT.size
+    keys = []
+    for _ in range(count):
+        factor, length = _KEY.unpack_from(payload, offset)
+        offset += _KEY.size
+        keys.append((payload[offset:offset + length].decode("utf-8"), factor))
+        offset += length
+    return keys
+
+
+def read_key_ids(path: str) -> Dict[Tuple[str, str], int]:
+    """Return the key dictionary of a log file, to continue it."""
+    key_ids: Dict[Tuple[str, str], int] = {}
+    for kind, payload in _read_records(path):
+        if kind == RECORD_KEYS:
+            for name, _factor in _read_keys(payload):
+                component, key = name.split(".", 1)
+                key_ids[(component, key)] = len(key_ids)
+    return key_ids
+
+
+@dataclass
+class DataLog:
+    """Contents of a log file."""
+
+    timestamps: List[float]
+    # 'component.key' -> scaled value per timestamp (None where missing)
+    columns: Dict[str, List[Optional[float]]]
+
+
+def read_datalog(path: str) -> DataLog:
+    """Read a log file with its values scaled by their factors.
+
+    Raises:
+        ValueError: If the file is not a data log
+    """
+    keys: List[Tuple[str, float]] = []
+    timestamps: List[float] = []
+    columns: Dict[str, List[Optional[float]]] = {}
+    for kind, payload in _read_records(path):
+        if kind == RECORD_KEYS:
+            keys.extend(_read_keys(payload))
+            continue
+        if kind != RECORD_BLOCK:
+            continue
+        rows, timestamp = _BLOCK.unpack_from(payload)
+        offset = _BLOCK.size
+        deltas = _from_le("I", payload[offset:offset + 4 * (rows - 1)])
+        offset += 4 * (rows - 1)
+        block_start = len(timestamps)
+        timestamps.append(timestamp)
+        for delta in deltas:
+            timestamp += delta / 1000
+            timestamps.append(timestamp)
+        (count,) = _COUNT.unpack_from(payload, offset)
+        offset += _COUNT.size
+        for _ in range(count):
+            (key_id,) = _COUNT.unpack_from(payload, offset)
+            offset += _COUNT.size
+            values = _from_le("d", payload[offset:offset + 8 * rows])
+            offset += 8 * rows
+            name, factor = keys[key_id]
+            column = columns.setdefault(name, [])
+            column.extend([None] * (block_start - len(column)))
+            column.extend(None if math.isnan(value) else scale_value(value, factor) for value in values)
+    for column in columns.values():
+        column.extend([None] * (len(timestamps) - len(column)))
+    return DataLog(timestamps, columns)
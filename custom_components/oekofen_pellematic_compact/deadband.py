@@ -0,0 +1,140 @@
+"""Deadband filter: publish sensor states only on significant changes.
+
+Temperatures and power readings jitter by one step of the controller's
+resolution (e.g. 0.1 °C) on almost every poll, and every changed value is a
+state write and a recorder row. With the deadband filter a measurement is
+only published once it moved by at least its threshold since the last
+published value, or once the maximum silence time has passed, so a slow
+drift is never hidden for long.
+
+Thresholds are in the sensor's (scaled) unit and derived from the value's
+resolution (its ``factor``): ``DEADBAND_STEPS`` steps of it, or the number
+of steps in ``DEADBAND_STEPS_BY_CLASS`` looked up by ``(device_class,
+unit)``, then ``(device_class, None)``, then ``(None, unit)``. A sensor
+with a finer resolution thus gets a finer threshold. Counters, totals and
+energy readings (which discovery also reports as measurements) are never
+filtered, neither are non-numeric states.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+
+# Default threshold in steps of the controller's resolution (the 'factor')
+DEADBAND_STEPS = 2
+
+# (device class, unit) -> threshold in steps of the resolution; None matches any
+DEADBAND_STEPS_BY_CLASS: Dict[Tuple[Optional[str], Optional[str]], int] = {
+    # Power in whole watts jitters by far more than one step
+    (SensorDeviceClass.POWER, "W"): 20,
+    (SensorDeviceClass.PRESSURE, None): 5,
+}
+
+# Device classes whose statistics need every value
+UNFILTERED_DEVICE_CLASSES = (SensorDeviceClass.ENERGY,)
+
+# Relative tolerance, so float noise in the scaled values (70.3 - 70.1) does
+# not suppress a move of exactly the threshold
+_TOLERANCE = 1e-6
+
+
+def deadband_threshold(
+    device_class: Optional[str],
+    state_class: Optional[str],
+    unit: Optional[str],
+    factor: Any = 1,
+) -> Optional[float]:
+    """Return the deadband threshold of a sensor, or None if it is not filtered.
+
+    Args:
+        device_class: Sensor device class
+        state_class: Sensor state class; only measurements are filtered
+        unit: Unit of measurement
+        factor: Scaling factor from the API metadata (the value resolution)
+
+    Returns:
+        Threshold in the sensor's unit, or None for counters, totals, energy
+        readings and sensors without a state class
+    """
+    if state_class != SensorStateClass.MEASUREMENT or device_class in UNFILTERED_DEVICE_CLASSES:
+        return None
+    steps = DEADBAND_STEPS
+    for lookup in ((device_class, unit), (device_class, None), (None, unit)):
+        if lookup in DEADBAND_STEPS_BY_CLASS:
+            steps = DEADBAND_STEPS_BY_CLASS[lookup]
+            break
+    try:
+        step = abs(float(factor))
+    except (TypeError, ValueError):
+        step = 1.0
+    # Rounded, so that 3 steps of 0.1 are 0.3 and not 0.30000000000000004
+    return round(steps * (step or 1.0), 10)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class DeadbandFilter:
+    """Decides per sensor whether a new state is worth publishing."""
+
+    def __init__(self, max_silence: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize the filter.
+
+        Args:
+            max_silence: Seconds after which a sensor's state is published
+                even if it stayed within its threshold
+            clock: Monotonic time source in seconds
+        """
+        self.max_silence = max_silence
+        self._clock = clock
+        # Sensor key -> (last published value, time of publication)
+        self._published: Dict[str, Tuple[Any, float]] = {}
+        self.published = 0
+        # Skipped writes, and those of them that would have changed the state
+        self.suppressed = 0
+        self.suppressed_changes = 0
+
+    def should_publish(self, key: str, value: Any, threshold: float) -> bool:
+        """Return True if a sensor's new state should be written.
+
+        The first value, non-numeric values and changes between a number
+        and a non-number are always published.
+
+        Args:
+            key: Unique key of the sensor
+            value: New state
+            threshold: Deadband threshold from ``deadband_threshold``
+        """
+        now = self._clock()
+        last = self._published.get(key)
+        if (
+            last is not None
+            and _is_number(value)
+            and _is_number(last[0])
+            and now - last[1] < self.max_silence
+            and abs(value - last[0]) < threshold * (1 - _TOLERANCE)
+        ):
+            self.suppressed += 1
+            if value != last[0]:
+                self.suppressed_changes += 1
+            return False
+        self._published[key] = (value, now)
+        self.published += 1
+        return True
+
+    def forget(self, key: str) -> None:
+        """Drop a sensor's state, e.g. when its entity is removed."""
+        self._published.pop(key, None)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the settings and counters for diagnostics."""
+        return {
+            "max_silence": self.max_silence,
+            "sensors": len(self._published),
+            "published": self.published,
+            "suppressed": self.suppressed,
+            "suppressed_changes": self.suppressed_changes,
+        }
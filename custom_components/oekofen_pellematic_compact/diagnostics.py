@@ -0,0 +1,67 @@
+"""Diagnostics support for Ökofen Pellematic Compact."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_IO_EXECUTOR, DATA_POLL_SCHEDULER, DOMAIN
+
+# The host URL contains the controller's JSON password
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Args:
+        hass: Home Assistant instance
+        entry: Config entry
+
+    Returns:
+        Redacted entry data, hub state, poll scheduling and controller I/O metrics
+    """
+    name = entry.data.get("name")
+    hub_data = hass.data.get(DOMAIN, {}).get(name)
+    hub = hub_data["hub"] if hub_data else None
+    executor = hass.data.get(DATA_IO_EXECUTOR)
+    scheduler = hass.data.get(DATA_POLL_SCHEDULER)
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "hub": None
+        if hub is None
+        else {
+            "name": hub.name,
+            "scan_interval": hub._scan_interval.total_seconds(),
+            "listeners": len(hub._sensors),
+            "components": sorted(hub.data),
+            "recording": hub._recorder is not None,
+            "replaying": hub._replay is not None,
+            "adaptive_interval": None if hub._adaptive is None else hub._adaptive.as_dict(),
+            "poll_tiers": None if hub._tiers is None else hub._tiers.as_dict(),
+            "unit_fallback": hub.unit_fallback,
+            "deadband": None if hub.deadband is None else hub.deadband.as_dict(),
+            "publisher": None if hub.publisher is None else hub.publisher.as_dict(),
+            "entity_filter": None
+            if hub.entity_filter is None
+            else {"include": hub.entity_filter.include, "exclude": hub.entity_filter.exclude},
+            "snapshot": hub.snapshot.as_dict(),
+            "snapshot_event": hub.snapshot_event,
+            "datalog": None if hub.datalog is None else hub.datalog.as_dict(),
+        },
+        "poll_scheduler": None
+        if scheduler is None
+        else {
+            "offsets": scheduler.offsets,
+            "missed": scheduler.missed,
+            "last_durations": scheduler.durations,
+            "max_concurrent": scheduler.max_concurrent,
+            "peak_active": scheduler.peak_active,
+            "waited": scheduler.waited,
+        },
+        "io_executor": None if executor is None else executor.as_dict(),
+    }
@@ -1,7 +1,8 @@
 """Dynamic sensor discovery from API metadata."""
 
 import logging
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from homeassistant.const import (
     UnitOfTemperature,
     UnitOfMass,
@@ -10,11 +11,14 @@ from homeassistant.const import (
     UnitOfTime,
     UnitOfFrequency,
     PERCENTAGE,
+    EntityCategory,
 )
 from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass
 from homeassistant.components.number import NumberDeviceClass
 
+from .entity_filter import EntityFilter
+
 _LOGGER = logging.getLogger(__name__)
 
 # Component name translations for better entity names (international/English)
@@ -90,35 +94,16 @@ def extract_key_suffix(key: str) -> str:
 
 def is_binary_sensor(data: dict) -> bool:
     """Check if data represents a binary sensor."""
-    if "format" not in data:
-        return False
-    
-    format_str = data["format"]
     # Binary sensors have format like "0:Aus|1:Ein" or "0:Off|1:On"
-    # Check if it's a simple two-option format
-    if isinstance(format_str, str) and "|" in format_str:
-        parts = format_str.split("|")
-        if len(parts) == 2:
-            # Check if both parts start with 0: or 1: (or false:/true:)
-            return (parts[0].strip().startswith(("0:", "false:")) and 
-                    parts[1].strip().startswith(("1:", "true:")))
-    
-    return False
+    descriptor = format_descriptor(data.get("format"))
+    return descriptor is not None and descriptor.is_binary
 
 
 def is_select(data: dict) -> bool:
     """Check if data represents a select entity."""
-    if "format" not in data:
-        return False
-    
-    format_str = data["format"]
     # Selects have format like "0:Aus|1:Auto|2:Ein"
-    if isinstance(format_str, str) and "|" in format_str:
-        parts = format_str.split("|")
-        # More than 2 options means it's a select, not binary
-        return len(parts) > 2
-    
-    return False
+    descriptor = format_descriptor(data.get("format"))
+    return descriptor is not None and descriptor.is_select
 
 
 def is_number(data: dict) -> bool:
@@ -169,38 +154,131 @@ def is_read_only_statistic(key: str) -> bool:
     return False
 
 
+class FormatDescriptor:
+    """Parsed format string of an enum value, e.g. "0:Aus|2:Auto|10:Ein".
+
+    The same format strings repeat in every heating circuit, hot water loop
+    and buffer, so descriptors are interned per format string (see
+    ``format_descriptor``) and shared by discovery, selects and enum sensors.
+    """
+
+    __slots__ = ("options", "by_value", "by_option", "labels", "is_binary", "is_select")
+
+    def __init__(self, format_str: str) -> None:
+        """Parse a format string.
+
+        Parts without a value ("Aus|Auto|Ein") get their position as value.
+        """
+        parts = format_str.split("|") if "|" in format_str else []
+        # Options as select options, e.g. "0_aus"
+        self.options: List[str] = []
+        # API value (as string and, if numeric, as int) -> option
+        self.by_value: Dict[Any, str] = {}
+        # Option -> API value to write
+        self.by_option: Dict[str, str] = {}
+        # API value (as in by_value) -> label as the controller sends it, e.g. "Aus"
+        self.labels: Dict[Any, str] = {}
+        # Two options "0:.../1:..." (or false/true)
+        self.is_binary = len(parts) == 2 and (
+            parts[0].strip().startswith(("0:", "false:")) and parts[1].strip().startswith(("1:", "true:"))
+        )
+        # More than 2 options means it's a select, not binary
+        self.is_select = len(parts) > 2
+        for index, part in enumerate(parts):
+            if ":" in part:
+                # Convert "0:Aus" to "0_aus"
+                value, label = part.split(":", 1)
+                value = value.strip()
+                label = label.strip()
+                option = f"{value}_{label.lower().replace(' ', '_')}"
+            else:
+                value = str(index)
+                label = part.strip()
+                option = label.lower().replace(" ", "_")
+            self.options.append(option)
+            self.by_option[option] = value
+            keys = [value]
+            try:
+                keys.append(int(value))
+            except ValueError:
+                pass
+            for key in keys:
+                self.by_value[key] = option
+                self.labels[key] = label
+
+    def _lookup(self, table: Dict[Any, str], value: Any) -> Optional[str]:
+        try:
+            result = table.get(value)
+        except TypeError:
+            return None
+        if result is None and isinstance(value, float) and value.is_integer():
+            result = table.get(int(value))
+        return result
+
+    def option(self, value: Any) -> Optional[str]:
+        """Return the option of an API value, or None if the value is unknown."""
+        return self._lookup(self.by_value, value)
+
+    def text(self, value: Any) -> Optional[str]:
+        """Return the label of an API value, or None if the value is unknown."""
+        return self._lookup(self.labels, value)
+
+    def value(self, option: str) -> Optional[str]:
+        """Return the API value to write for an option, or None if it is unknown."""
+        return self.by_option.get(option)
+
+
+@lru_cache(maxsize=None)
+def _parse_format(format_str: str) -> FormatDescriptor:
+    return FormatDescriptor(format_str)
+
+
+def format_descriptor(format_str: Any) -> Optional[FormatDescriptor]:
+    """Return the shared descriptor of a format string.
+
+    Returns:
+        The interned descriptor, or None if the value is not a string
+    """
+    if not isinstance(format_str, str):
+        return None
+    return _parse_format(format_str)
+
+
 def parse_select_options(format_str: str) -> list[str]:
     """Parse select options from format string.
     
     Example: "0:Aus|1:Auto|2:Ein" -> ["0_aus", "1_auto", "2_ein"]
     """
-    if not format_str or "|" not in format_str:
-        return []
-    
-    options = []
-    for part in format_str.split("|"):
-        if ":" in part:
-            # Convert "0:Aus" to "0_aus"
-            value, label = part.split(":", 1)
-            option = f"{value.strip()}_{label.strip().lower().replace(' ', '_')}"
-            options.append(option)
-        else:
-            options.append(part.strip().lower().replace(" ", "_"))
-    
-    return options
+    return list(_parse_format(format_str or "").options)
+
+
+# Spellings of units as controllers send them. Payloads are decoded span by
+# span (see charset.decode_payload), so a Latin-1 degree sign survives; these
+# cover firmware that sends '?' instead of '°', UTF-8 shown as Latin-1, and
+# "C" without degree sign.
+UNIT_ALIASES = {
+    "?C": "°C",
+    "?c": "°C",
+    "Â°C": "°C",
+    "C": "°C",
+}
+
+
+def canonical_unit(unit: Optional[str]) -> str:
+    """Return the canonical spelling of a unit ("" if there is none)."""
+    if not unit:
+        return ""
+    return UNIT_ALIASES.get(unit, unit)
 
 
 def infer_device_class(data: dict, key: str) -> Optional[str]:
     """Infer device class from unit and key name."""
-    unit = data.get("unit", "")
+    unit = canonical_unit(data.get("unit", ""))
     text = data.get("text", "").lower()
     key_lower = key.lower()
     
-    # Fix common encoding issues where ° becomes ?
-    unit_fixed = unit.replace('?C', '°C').replace('?c', '°C') if unit else ""
-    
     # Temperature
-    if unit_fixed in ("°C", "K"):
+    if unit in ("°C", "K"):
         return SensorDeviceClass.TEMPERATURE
     
     # Energy
@@ -277,7 +355,7 @@ def infer_binary_device_class(data: dict, key: str) -> Optional[BinarySensorDevi
 
 def infer_number_device_class(data: dict, key: str) -> Optional[str]:
     """Infer number device class."""
-    unit = data.get("unit", "")
+    unit = canonical_unit(data.get("unit", ""))
     
     if unit in ("°C", "K"):
         return NumberDeviceClass.TEMPERATURE
@@ -288,10 +366,7 @@ def infer_number_device_class(data: dict, key: str) -> Optional[str]:
 def infer_state_class(data: dict) -> Optional[str]:
     """Infer state class for sensor."""
     key_lower = data.get("text", "").lower()
-    unit = data.get("unit", "")
-    
-    # Fix common encoding issues where ° becomes ?
-    unit_fixed = unit.replace('?C', '°C').replace('?c', '°C') if unit else ""
+    unit_fixed = canonical_unit(data.get("unit", ""))
     
     # Total/Counter sensors
     if any(word in key_lower for word in ["total", "gesamt", "counter", "starts", "runtime", "laufzeit"]):
@@ -309,6 +384,51 @@ def infer_state_class(data: dict) -> Optional[str]:
     return None
 
 
+# Writable keys that are primary controls rather than configuration
+PRIMARY_CONTROL_WORDS = ("mode", "heat_once")
+# Read-only keys shown as diagnostics: error and status texts
+DIAGNOSTIC_KEY_WORDS = ("error", "statetext", "usb_stick")
+# Keys whose entities are disabled by default (heating schedule time blocks)
+DISABLED_KEY_WORDS = ("timeblock",)
+# Statistics in these units feed the energy dashboard and stay primary
+PRIMARY_STATISTIC_UNITS = ("kWh", "Wh", "MWh")
+
+
+def infer_entity_category(key: str, data: dict, entity_type: str) -> Tuple[Optional[EntityCategory], bool]:
+    """Infer entity category and enabled-by-default flag for a discovered key.
+
+    Args:
+        key: API key
+        data: API data of the key (with metadata)
+        entity_type: Discovery result list, e.g. "sensors" or "numbers"
+
+    Returns:
+        Entity category (None = primary) and whether the entity is enabled
+        by default. Disabled entities are registered but never added, so
+        they cost no state writes or recorder rows until a user enables them.
+    """
+    key_lower = key.lower()
+
+    # Free-text fields (names, locations, forecast texts) and schedule time blocks
+    if "length" in data or any(word in key_lower for word in DISABLED_KEY_WORDS):
+        return EntityCategory.DIAGNOSTIC, False
+
+    # Writable settings (no L_ prefix) are configuration, except mode controls
+    if entity_type in ("selects", "numbers"):
+        if any(word in key_lower for word in PRIMARY_CONTROL_WORDS):
+            return None, True
+        return EntityCategory.CONFIG, True
+
+    if any(word in key_lower for word in DIAGNOSTIC_KEY_WORDS):
+        return EntityCategory.DIAGNOSTIC, True
+
+    # Counters and historical statistics, except energy totals
+    if is_read_only_statistic(key) and canonical_unit(data.get("unit", "")) not in PRIMARY_STATISTIC_UNITS:
+        return EntityCategory.DIAGNOSTIC, True
+
+    return None, True
+
+
 def infer_icon(data: dict, key: str) -> str:
     """Infer icon from context."""
     text = data.get("text", "").lower()
@@ -359,12 +479,7 @@ def normalize_unit(unit: str) -> str:
     if not unit:
         return None
     
-    # Fix common encoding issues where ° (degree symbol) becomes ?
-    # This happens when UTF-8 data is misinterpreted as ISO-8859-1 or similar
-    # Also normalize plain "C" to "°C" as some APIs send it without degree symbol
-    unit_fixed = unit.replace('?C', '°C').replace('?c', '°C')
-    if unit_fixed == "C":
-        unit_fixed = "°C"
+    unit_fixed = canonical_unit(unit)
     
     # Normalize zs (Zehntel-Sekunden/tenth-seconds) to s (seconds) for consistency
     # The factor field in the data handles the 0.1 conversion
@@ -373,9 +488,7 @@ def normalize_unit(unit: str) -> str:
     
     # Map common units
     unit_map = {
-        "Â°C": UnitOfTemperature.CELSIUS,
         "°C": UnitOfTemperature.CELSIUS,
-        "C": UnitOfTemperature.CELSIUS,  # Some APIs send C without degree symbol
         "K": UnitOfTemperature.KELVIN,
         "%": PERCENTAGE,
         "kWh": UnitOfEnergy.KILO_WATT_HOUR,
@@ -395,6 +508,28 @@ def normalize_unit(unit: str) -> str:
     return unit_map.get(unit_fixed, unit_fixed)
 
 
+def infer_fallback_scaling(key: str, data: Any) -> Tuple[Optional[str], Optional[str]]:
+    """Return the device class and unit a sensor for this key is discovered with.
+
+    Values without a factor are scaled by these (``scaling.fallback_scale``),
+    so consumers of the raw data scale them like the sensor entities do.
+
+    Args:
+        key: API key
+        data: API data of the key, with or without metadata
+    """
+    unit = data.get("unit") if isinstance(data, dict) else None
+    text = data.get("text") if isinstance(data, dict) else None
+    return _infer_fallback_scaling(
+        key, unit if isinstance(unit, str) else "", text if isinstance(text, str) else ""
+    )
+
+
+@lru_cache(maxsize=4096)
+def _infer_fallback_scaling(key: str, unit: str, text: str) -> Tuple[Optional[str], Optional[str]]:
+    return infer_device_class({"unit": unit, "text": text}, key), normalize_unit(unit)
+
+
 def get_component_display_name(component: str, index: int = 0) -> str:
     """Get human-readable component name.
     
@@ -465,6 +600,7 @@ def create_sensor_definition(
         "min_value": data.get("min"),
         "max_value": data.get("max"),
         "format": data.get("format"),
+        "format_descriptor": format_descriptor(data.get("format")),
     }
 
 
@@ -492,20 +628,31 @@ def create_select_definition(
 ) -> dict:
     """Create select entity definition from API data."""
     definition = create_sensor_definition(component, key, data, index, keys_need_disambiguation)
-    definition["options"] = parse_select_options(data.get("format", ""))
+    definition["options"] = (definition["format_descriptor"] or _parse_format("")).options
     
     return definition
 
 
+# Entity type in discovery results -> entity platform (filter classification)
+_ENTITY_PLATFORMS = {
+    "sensors": "sensor",
+    "binary_sensors": "binary_sensor",
+    "selects": "select",
+    "numbers": "number",
+}
+
+
 def discover_entities_from_component(
     component_key: str,
-    component_data: dict
+    component_data: dict,
+    entity_filter: Optional[EntityFilter] = None,
 ) -> dict:
     """Discover all entities from a single component.
     
     Args:
         component_key: Component identifier (e.g., "hk1", "pe1")
         component_data: API data for this component
+        entity_filter: Include/exclude filter; filtered keys get no definition
     
     Returns:
         Dictionary with lists of discovered entities by type
@@ -519,6 +666,9 @@ def discover_entities_from_component(
     
     if not isinstance(component_data, dict):
         return entities
+
+    if entity_filter is not None and entity_filter.skips_component(component_key):
+        return entities
     
     # Extract numeric index from component key (e.g., 1 from "hk1")
     index = 0
@@ -569,16 +719,11 @@ def discover_entities_from_component(
             # Simple format - wrap in dict
             data = {"val": data}
         
-        # Determine entity type and create definition
+        # Determine entity type (and definition factory) from the API conventions
+        create_definition = create_sensor_definition
         if key.startswith("L_"):
             # Read-only sensor (API convention: L_ prefix = read-only)
-            if is_binary_sensor(data):
-                definition = create_sensor_definition(component_key, key, data, index, keys_need_disambiguation)
-                definition["device_class"] = infer_binary_device_class(data, key)
-                entities["binary_sensors"].append(definition)
-            else:
-                definition = create_sensor_definition(component_key, key, data, index, keys_need_disambiguation)
-                entities["sensors"].append(definition)
+            entity_type = "binary_sensors" if is_binary_sensor(data) else "sensors"
         elif is_read_only_statistic(key):
             # Even without L_ prefix, this is a read-only statistic/counter
             # (e.g., storage_fill_yesterday, runtime_total, starts_count)
@@ -586,39 +731,45 @@ def discover_entities_from_component(
                 "Key '%s.%s' identified as read-only statistic, creating sensor instead of number",
                 component_key, key
             )
-            definition = create_sensor_definition(component_key, key, data, index, keys_need_disambiguation)
-            entities["sensors"].append(definition)
-        else:
+            entity_type = "sensors"
+        elif is_select(data) or is_binary_sensor(data):
             # Writable entity (no L_ prefix and not a statistic = writable per API spec)
-            if is_select(data):
-                definition = create_select_definition(component_key, key, data, index, keys_need_disambiguation)
-                entities["selects"].append(definition)
-            elif is_binary_sensor(data):
-                # Writable binary option (e.g., night_mode with "0:Off|1:On")
-                # Treat as select with 2 options instead of binary_sensor
-                definition = create_select_definition(component_key, key, data, index, keys_need_disambiguation)
-                entities["selects"].append(definition)
-            elif is_number(data):
-                definition = create_number_definition(component_key, key, data, index, keys_need_disambiguation)
-                entities["numbers"].append(definition)
-            else:
-                # Fallback: treat as read-only sensor
-                # (e.g., text fields with 'length' property, or other unsupported writable types)
-                _LOGGER.debug(
-                    "Writable key '%s.%s' not recognized as select/number, treating as read-only sensor",
-                    component_key, key
-                )
-                definition = create_sensor_definition(component_key, key, data, index, keys_need_disambiguation)
-                entities["sensors"].append(definition)
+            # A writable binary option (e.g., night_mode with "0:Off|1:On")
+            # is treated as select with 2 options instead of binary_sensor
+            entity_type = "selects"
+            create_definition = create_select_definition
+        elif is_number(data):
+            entity_type = "numbers"
+            create_definition = create_number_definition
+        else:
+            # Fallback: treat as read-only sensor
+            # (e.g., text fields with 'length' property, or other unsupported writable types)
+            _LOGGER.debug(
+                "Writable key '%s.%s' not recognized as select/number, treating as read-only sensor",
+                component_key, key
+            )
+            entity_type = "sensors"
+
+        if entity_filter is not None and not entity_filter.allows(
+            component_key, key, _ENTITY_PLATFORMS[entity_type], is_read_only_statistic(key)
+        ):
+            continue
+
+        definition = create_definition(component_key, key, data, index, keys_need_disambiguation)
+        if entity_type == "binary_sensors":
+            definition["device_class"] = infer_binary_device_class(data, key)
+        definition["entity_category"], definition["enabled_default"] = infer_entity_category(key, data, entity_type)
+        entities[entity_type].append(definition)
     
     return entities
 
 
-def discover_all_entities(api_data: dict) -> dict:
+def discover_all_entities(api_data: dict, entity_filter: Optional[EntityFilter] = None) -> dict:
     """Discover all entities from complete API response.
     
     Args:
         api_data: Complete API response
+        entity_filter: Include/exclude filter applied before any definition is built
     
     Returns:
         Dictionary with all discovered entities organized by type
@@ -634,7 +785,7 @@ def discover_all_entities(api_data: dict) -> dict:
         if component_key == "error":
             continue
         
-        entities = discover_entities_from_component(component_key, component_data)
+        entities = discover_entities_from_component(component_key, component_data, entity_filter)
         
         # Merge into all_entities
         for entity_type in all_entities:
@@ -0,0 +1,154 @@
+"""Include/exclude filter for discovered entities.
+
+A well-equipped plant discovers hundreds of entities, and every one of them
+costs memory, a hub callback on every poll, a state machine entry and
+recorder rows. The filter is applied inside ``discover_all_entities``, so
+filtered keys never get an entity definition or an entity object.
+
+Patterns are separated by commas or new lines:
+
+- ``pe1.L_*``: glob over ``component.key`` (case-sensitive, like the API)
+- ``hk2`` or ``wireless*``: every key of the matching components
+- ``@statistic``: a classification, one of ``CLASSIFICATIONS``; statistics
+  are the keys matched by ``is_read_only_statistic``
+
+With include patterns only matching entities are created; exclude patterns
+always win.
+"""
+from __future__ import annotations
+
+import fnmatch
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+from .const import CONF_EXCLUDE_ENTITIES, CONF_INCLUDE_ENTITIES
+
+# Entity platforms plus 'statistic' (read-only statistics and counters)
+CLASSIFICATIONS = ("sensor", "binary_sensor", "select", "number", "statistic")
+
+# Rough memory per entity: about 1.2 KiB for the definition and entity object,
+# 3.5 KiB for its state and registry entry (tracemalloc, greenmode fixture)
+ENTITY_MEMORY_ESTIMATE = 5 * 1024
+
+_ENTITY_TYPES = ("sensors", "binary_sensors", "selects", "numbers")
+
+
+def parse_patterns(text: Optional[str]) -> List[str]:
+    """Split a comma- or line-separated pattern list, dropping empty entries."""
+    if not text:
+        return []
+    return [pattern.strip() for pattern in re.split(r"[,\n]", text) if pattern.strip()]
+
+
+class _Rules:
+    """Compiled patterns of one side (include or exclude) of the filter."""
+
+    __slots__ = ("regex", "components", "classes")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        globs: List[str] = []
+        component_globs: List[str] = []
+        classes = set()
+        for pattern in patterns:
+            if pattern.startswith("@"):
+                if pattern[1:] not in CLASSIFICATIONS:
+                    raise ValueError(f"Unknown entity classification '{pattern}'")
+                classes.add(pattern[1:])
+            elif "." in pattern:
+                globs.append(pattern)
+            else:
+                component_globs.append(pattern)
+                globs.append(f"{pattern}.*")
+        # All globs as one expression, matched against 'component.key'
+        self.regex = re.compile("|".join(fnmatch.translate(glob) for glob in globs)) if globs else None
+        self.components = (
+            re.compile("|".join(fnmatch.translate(glob) for glob in component_globs)) if component_globs else None
+        )
+        self.classes: FrozenSet[str] = frozenset(classes)
+
+    def matches(self, name: str, platform: str, statistic: bool) -> bool:
+        return (
+            (self.regex is not None and self.regex.match(name) is not None)
+            or platform in self.classes
+            or (statistic and "statistic" in self.classes)
+        )
+
+
+class EntityFilter:
+    """Decides per discovered key whether an entity is created."""
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = ()) -> None:
+        """Compile the filter.
+
+        Args:
+            include: Patterns of the entities to create; empty creates all
+            exclude: Patterns of the entities to skip
+
+        Raises:
+            ValueError: If a pattern names an unknown classification
+        """
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self._include = _Rules(self.include) if self.include else None
+        self._exclude = _Rules(self.exclude)
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> Optional["EntityFilter"]:
+        """Return the filter configured in a config entry, or None if there is none.
+
+        Raises:
+            ValueError: If a pattern names an unknown classification
+        """
+        include = parse_patterns(config.get(CONF_INCLUDE_ENTITIES))
+        exclude = parse_patterns(config.get(CONF_EXCLUDE_ENTITIES))
+        if not include and not exclude:
+            return None
+        return cls(include, exclude)
+
+    def skips_component(self, component: str) -> bool:
+        """Return True if every key of a component is excluded."""
+        components = self._exclude.components
+        return components is not None and components.match(component) is not None
+
+    def allows(self, component: str, key: str, platform: str, statistic: bool = False) -> bool:
+        """Return True if the entity of a key should be created.
+
+        Args:
+            component: Component key, e.g. 'pe1'
+            key: API key, e.g. 'L_temp_act'
+            platform: Entity platform the key was classified as
+            statistic: True if the key is a read-only statistic
+        """
+        name = f"{component}.{key}"
+        if self._include is not None and not self._include.matches(name, platform, statistic):
+            return False
+        return not self._exclude.matches(name, platform, statistic)
+
+
+def count_entities(discovered: Dict[str, List[Dict[str, Any]]]) -> int:
+    """Return the number of entity definitions in a discovery result."""
+    return sum(len(discovered.get(entity_type, ())) for entity_type in _ENTITY_TYPES)
+
+
+def entity_preview(unfiltered: Dict[str, List[Dict[str, Any]]], filtered: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Return entity counts and memory estimates for the filter preview.
+
+    Args:
+        unfiltered: Discovery result without the filter
+        filtered: Discovery result with the filter
+
+    Returns:
+        Placeholders for the preview form
+    """
+    total = count_entities(unfiltered)
+    kept = count_entities(filtered)
+    return {
+        "entities_total": total,
+        "entities_kept": kept,
+        "memory_total": f"{total * ENTITY_MEMORY_ESTIMATE / 1024:.0f} KiB",
+        "memory_kept": f"{kept * ENTITY_MEMORY_ESTIMATE / 1024:.0f} KiB",
+        "breakdown": ", ".join(
+            f"{len(filtered[entity_type])}/{len(unfiltered[entity_type])} {entity_type}"
+            for entity_type in _ENTITY_TYPES
+        ),
+    }
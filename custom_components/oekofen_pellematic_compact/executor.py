@@ -0,0 +1,173 @@
+"""Bounded executor for blocking controller I/O.
+
+Fetches, writes and API detection use urllib with timeouts of 3 to 10
+seconds. On Home Assistant's shared default executor a hanging controller
+would hold threads other integrations need, so the integration runs this
+I/O on its own small thread pool instead:
+
+- at most ``IO_MAX_WORKERS`` threads for all controllers together
+- at most one job per controller at a time (the controllers do not handle
+  parallel requests well anyway); further jobs wait in line, also behind
+  a job whose caller was cancelled while its request still runs
+- queue and run times are tracked per controller for the diagnostics
+
+The executor is created on first use and shut down when the last config
+entry is unloaded.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_IO_EXECUTOR, IO_MAX_WORKERS
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class ControllerIOStats:
+    """Queue and run time metrics of one controller's I/O jobs."""
+
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    max_queued: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    total_run_seconds: float = 0.0
+    max_run_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics as a dict."""
+        return asdict(self)
+
+
+class ControllerExecutor:
+    """Thread pool running controller I/O with one job per controller at a time."""
+
+    def __init__(self, max_workers: int = IO_MAX_WORKERS) -> None:
+        """Initialize the executor.
+
+        Args:
+            max_workers: Maximum number of threads for all controllers
+        """
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="oekofen_io")
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.stats: Dict[str, ControllerIOStats] = {}
+        self.closed = False
+
+    async def async_run(self, key: str, func: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking function for a controller.
+
+        Args:
+            key: Controller the job talks to (the hub name); jobs with the
+                same key never run concurrently
+            func: Blocking function
+            *args: Arguments for ``func``
+
+        Returns:
+            Result of ``func``
+
+        Raises:
+            RuntimeError: If the executor has been shut down
+            Exception: Whatever ``func`` raises
+        """
+        if self.closed:
+            raise RuntimeError("Controller executor has been shut down")
+
+        stats = self.stats.setdefault(key, ControllerIOStats())
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        enqueued = time.perf_counter()
+        started: Optional[float] = None
+
+        def job() -> _T:
+            nonlocal started
+            started = time.perf_counter()
+            return func(*args)
+
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        try:
+            await lock.acquire()
+        finally:
+            # Acquired, or cancelled while waiting for the controller's previous job
+            stats.queued -= 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool, job)
+        except BaseException:
+            lock.release()
+            raise
+        stats.running += 1
+
+        def done(finished: asyncio.Future) -> None:
+            """Record the job's metrics and let the controller's next job start."""
+            stats.running -= 1
+            if finished.cancelled() or finished.exception() is not None:
+                stats.failed += 1
+            else:
+                stats.completed += 1
+            if started is not None:
+                run_seconds = time.perf_counter() - started
+                stats.total_wait_seconds += started - enqueued
+                stats.max_wait_seconds = max(stats.max_wait_seconds, started - enqueued)
+                stats.total_run_seconds += run_seconds
+                stats.max_run_seconds = max(stats.max_run_seconds, run_seconds)
+            lock.release()
+
+        # The lock is released when the thread has finished, not when the caller
+        # stops waiting: a cancelled caller must not let the next request start
+        # while the controller still handles this one
+        future.add_done_callback(done)
+        return await asyncio.shield(future)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return executor settings and per-controller metrics."""
+        return {
+            "max_workers": self.max_workers,
+            "closed": self.closed,
+            "controllers": {key: stats.as_dict() for key, stats in self.stats.items()},
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting jobs and cancel pending ones.
+
+        Args:
+            wait: Block until all threads have exited. On unload the executor
+                does not wait: a request to a hanging controller keeps its
+                thread until the request times out.
+        """
+        self.closed = True
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+@callback
+def async_get_controller_executor(hass: HomeAssistant) -> ControllerExecutor:
+    """Return the integration's controller executor, creating it on first use."""
+    executor = hass.data.get(DATA_IO_EXECUTOR)
+    if executor is None or executor.closed:
+        executor = hass.data[DATA_IO_EXECUTOR] = ControllerExecutor()
+    return executor
+
+
+@callback
+def async_shutdown_controller_executor(hass: HomeAssistant) -> None:
+    """Shut the controller executor down (after the last entry was unloaded)."""
+    executor = hass.data.pop(DATA_IO_EXECUTOR, None)
+    if executor is not None:
+        _LOGGER.debug("Shutting down controller executor: %s", executor.as_dict())
+        executor.shutdown()
+
+
+async def async_run_controller_io(hass: HomeAssistant, key: str, func: Callable[..., _T], *args: Any) -> _T:
+    """Run blocking controller I/O on the integration's executor."""
+    return await async_get_controller_executor(hass).async_run(key, func, *args)
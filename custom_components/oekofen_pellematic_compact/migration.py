@@ -2,11 +2,18 @@
 
 This module handles one-time migration of entity IDs from older versions
 to preserve user automations and dashboards.
+
+The registry is walked once: ``analyze_entities`` matches every entity ID
+against all old naming patterns (compiled into one alternation) and the
+translated-word indicators, and plans the lowercase renames against the
+registry's entity ID index. The planned renames are applied afterwards in
+one batch.
 """
 
 import logging
 import re
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Container, Dict, Iterable, List, NamedTuple, Optional, Tuple
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
 
@@ -19,6 +26,23 @@ MIGRATION_MARKER = "migrated_entity_ids"
 ENTITY_WARNING_SHOWN_KEY = "entity_id_warning_shown"
 MIGRATION_NOTIFICATION_SHOWN_KEY = "migration_notification_shown"
 
+# German words that shouldn't be in entity IDs
+GERMAN_INDICATORS = (
+    "kesseltemperatur", "temperatur", "raumtemperatur",
+    "außentemperatur", "betriebsart", "warmwasser",
+)
+# French words that are NOT also common English words
+FRENCH_INDICATORS = (
+    "température", "chauffage",
+)
+TRANSLATED_INDICATORS = GERMAN_INDICATORS + FRENCH_INDICATORS
+# Indicators not containing another one ("raumtemperatur" contains "temperatur"):
+# an entity ID contains an indicator if and only if it contains one of these
+_TRANSLATED_PREFILTER = tuple(
+    word for word in TRANSLATED_INDICATORS
+    if not any(other != word and other in word for other in TRANSLATED_INDICATORS)
+)
+
 
 def _generate_old_entity_id_patterns() -> List[Tuple[str, str, str]]:
     """Generate patterns for old entity IDs that might need migration.
@@ -52,6 +76,185 @@ def _generate_old_entity_id_patterns() -> List[Tuple[str, str, str]]:
     return patterns
 
 
+@lru_cache(maxsize=None)
+def _old_entity_id_matcher() -> "re.Pattern[str]":
+    """Return all old entity ID patterns compiled into one alternation.
+
+    Every pattern starts with its platform (``^sensor\\.``), so matching
+    the entity ID alone also checks the platform.
+    """
+    return re.compile(
+        "|".join(f"(?:{pattern})" for _platform, pattern, _prefix in _generate_old_entity_id_patterns())
+    )
+
+
+def _translated_word(entity_id_lower: str) -> Optional[str]:
+    """Return the first translated-word indicator in an entity ID, if any."""
+    for word in _TRANSLATED_PREFILTER:
+        if word in entity_id_lower:
+            # Report the first word in list order, as warnings always did
+            return next(word for word in TRANSLATED_INDICATORS if word in entity_id_lower)
+    return None
+
+
+class EntityAnalysis(NamedTuple):
+    """Result of one pass over the entities of a config entry."""
+
+    # Entity IDs matching an old naming pattern, kept for compatibility
+    preserved: List[str]
+    # (entity_id, lowercase entity_id) renames to apply
+    renames: List[Tuple[str, str]]
+    # (entity_id, lowercase entity_id) renames skipped because the target exists
+    collisions: List[Tuple[str, str]]
+    # Warnings about translated text in entity IDs
+    warnings: List[str]
+
+    @property
+    def migrated(self) -> int:
+        """Return the number of preserved and renamed entity IDs."""
+        return len(self.preserved) + len(self.renames)
+
+
+def analyze_entities(entity_ids: Iterable[str], existing_ids: Optional[Container[str]]) -> EntityAnalysis:
+    """Plan the entity ID migration and collect warnings in one pass.
+
+    Args:
+        entity_ids: Entity IDs of the config entry
+        existing_ids: All entity IDs in the registry (for collision checks),
+            None to only collect warnings
+
+    Returns:
+        Preserved IDs, planned renames, skipped renames and warnings
+    """
+    old_pattern = _old_entity_id_matcher().match
+    preserved: List[str] = []
+    renames: List[Tuple[str, str]] = []
+    collisions: List[Tuple[str, str]] = []
+    warnings: List[str] = []
+    # Targets of renames planned in this pass
+    planned = set()
+
+    for entity_id in entity_ids:
+        entity_id_lower = entity_id.lower()
+
+        word = _translated_word(entity_id_lower)
+        if word is not None:
+            warnings.append(
+                f"Entity {entity_id} contains translated text ('{word}'). "
+                f"This may cause issues if the system language changes."
+            )
+
+        if existing_ids is None:
+            continue
+        # Old naming-convention patterns (e.g., heater_1_ -> pe1_)
+        if old_pattern(entity_id):
+            preserved.append(entity_id)
+        # Mixed-case entity IDs (Phase 1 scenario)
+        elif entity_id != entity_id_lower:
+            if entity_id_lower in planned or entity_id_lower in existing_ids:
+                collisions.append((entity_id, entity_id_lower))
+            else:
+                planned.add(entity_id_lower)
+                renames.append((entity_id, entity_id_lower))
+
+    return EntityAnalysis(preserved, renames, collisions, warnings)
+
+
+def _apply_migration(entity_reg: er.EntityRegistry, analysis: EntityAnalysis) -> int:
+    """Apply a planned migration to the entity registry.
+
+    Returns:
+        Number of entities migrated
+    """
+    for entity_id in analysis.preserved:
+        # The entity_id will be preserved, but we log the change
+        _LOGGER.info(
+            "Preserving entity_id '%s' for compatibility (matches old pattern)",
+            entity_id
+        )
+    for entity_id, target_id in analysis.collisions:
+        _LOGGER.warning(
+            "Cannot rename %s to %s: target already exists, skipping",
+            entity_id,
+            target_id,
+        )
+
+    migrated_count = len(analysis.preserved)
+    # The registry saves with a delay, so the renames are written together
+    for entity_id, target_id in analysis.renames:
+        try:
+            # Safe to rename — only update new_entity_id, never unique_id
+            entity_reg.async_update_entity(entity_id, new_entity_id=target_id)
+        except ValueError as e:
+            _LOGGER.warning("Cannot rename %s to %s: %s", entity_id, target_id, e)
+            continue
+        _LOGGER.info(
+            "Renamed entity %s → %s (unique_id preserved)",
+            entity_id,
+            target_id,
+        )
+        migrated_count += 1
+    return migrated_count
+
+
+async def async_migrate_and_check_entities(
+    hass: HomeAssistant,
+    entry_id: str,
+    hub_name: str,
+    migrate: bool = True,
+    check: bool = True,
+) -> Tuple[int, List[str]]:
+    """Run the entity ID migration and the translated-text check in one registry pass.
+
+    A failing migration is logged and does not prevent the check.
+
+    Args:
+        hass: Home Assistant instance
+        entry_id: Config entry ID
+        hub_name: Name of the hub (integration instance)
+        migrate: Run the entity ID migration
+        check: Warn about translated text in entity IDs
+
+    Returns:
+        Tuple of (number of entities migrated, warning messages)
+    """
+    if migrate and hass.data.get("oekofen_pellematic_compact", {}).get(hub_name, {}).get(MIGRATION_MARKER, False):
+        _LOGGER.debug("Entity ID migration already completed for %s", hub_name)
+        migrate = False
+    if not migrate and not check:
+        return 0, []
+
+    entity_reg = er.async_get(hass)
+    entities = er.async_entries_for_config_entry(entity_reg, entry_id)
+    analysis = analyze_entities(
+        (entity.entity_id for entity in entities),
+        # The registry's entity ID index
+        entity_reg.entities if migrate else None,
+    )
+
+    # Each step has its own error path, so a failed migration still reports the check's warnings
+    migrated_count = 0
+    if migrate:
+        _LOGGER.info(
+            "Starting entity ID migration for %s (%d entities found)",
+            hub_name,
+            len(entities)
+        )
+        try:
+            migrated_count = _apply_migration(entity_reg, analysis)
+            await _async_finish_migration(hass, hub_name, migrated_count)
+        except Exception as e:
+            _LOGGER.warning("Entity ID migration failed (non-critical): %s", e)
+
+    warnings = analysis.warnings if check else []
+    if warnings:
+        try:
+            await _async_notify_entity_warnings(hass, hub_name, warnings)
+        except Exception as e:
+            _LOGGER.debug("Entity ID check failed (non-critical): %s", e)
+    return migrated_count, warnings
+
+
 async def async_migrate_entity_ids(
     hass: HomeAssistant,
     entry_id: str,
@@ -72,76 +275,14 @@ async def async_migrate_entity_ids(
     Returns:
         Number of entities migrated
     """
-    # Check if migration was already done
-    data = hass.data.get("oekofen_pellematic_compact", {})
-    hub_data = data.get(hub_name, {})
-    
-    if hub_data.get(MIGRATION_MARKER, False):
-        _LOGGER.debug("Entity ID migration already completed for %s", hub_name)
-        return 0
-    
-    entity_reg = er.async_get(hass)
-    migrated_count = 0
-    
-    # Get all entities for this config entry
-    entities = er.async_entries_for_config_entry(entity_reg, entry_id)
-    
-    _LOGGER.info(
-        "Starting entity ID migration for %s (%d entities found)",
-        hub_name,
-        len(entities)
+    migrated_count, _warnings = await async_migrate_and_check_entities(
+        hass, entry_id, hub_name, migrate=True, check=False
     )
-    
-    patterns = _generate_old_entity_id_patterns()
-    
-    for entity in entities:
-        entity_id = entity.entity_id
-        platform = entity.domain
-        matched_old_pattern = False
-
-        # Check each old naming-convention pattern (e.g., heater_1_ -> pe1_)
-        for pattern_platform, old_pattern, new_prefix in patterns:
-            if platform != pattern_platform:
-                continue
-
-            match = re.match(old_pattern, entity_id)
-            if not match:
-                continue
-
-            # Found a match - this entity needs migration
-            # The entity_id will be preserved, but we log the change
-            _LOGGER.info(
-                "Preserving entity_id '%s' for compatibility (matches old pattern)",
-                entity_id
-            )
-            migrated_count += 1
-            matched_old_pattern = True
-            break
-
-        # Second pass: detect mixed-case entity IDs (Phase 1 scenario)
-        # Only runs when no old naming-convention pattern matched
-        if not matched_old_pattern and entity_id != entity_id.lower():
-            target_id = entity_id.lower()
-
-            # Duplicate detection: skip rename if lowercase target already exists
-            existing = entity_reg.async_get(target_id)
-            if existing is not None:
-                _LOGGER.warning(
-                    "Cannot rename %s to %s: target already exists, skipping",
-                    entity_id,
-                    target_id,
-                )
-                continue
+    return migrated_count
 
-            # Safe to rename — only update new_entity_id, never unique_id
-            entity_reg.async_update_entity(entity_id, new_entity_id=target_id)
-            _LOGGER.info(
-                "Renamed entity %s → %s (unique_id preserved)",
-                entity_id,
-                target_id,
-            )
-            migrated_count += 1
-    
+
+async def _async_finish_migration(hass: HomeAssistant, hub_name: str, migrated_count: int) -> None:
+    """Mark the migration as complete and notify the user about migrated entities."""
     # Mark migration as complete
     if hub_name not in hass.data.get("oekofen_pellematic_compact", {}):
         hass.data.setdefault("oekofen_pellematic_compact", {})[hub_name] = {}
@@ -182,8 +323,6 @@ async def async_migrate_entity_ids(
             _LOGGER.debug("Could not create migration notification: %s", e)
     else:
         _LOGGER.debug("No old-format entity IDs found for %s", hub_name)
-    
-    return migrated_count
 
 
 async def async_check_and_warn_entity_changes(
@@ -193,8 +332,8 @@ async def async_check_and_warn_entity_changes(
 ) -> List[str]:
     """Check for potential entity ID changes and warn the user.
     
-    This function compares the current entity registry with expected entity IDs
-    based on the API data and warns about discrepancies.
+    This function checks the entity IDs in the registry for translated
+    text and warns about them.
     
     Args:
         hass: Home Assistant instance
@@ -204,63 +343,32 @@ async def async_check_and_warn_entity_changes(
     Returns:
         List of warning messages
     """
-    warnings = []
-    entity_reg = er.async_get(hass)
-    entities = er.async_entries_for_config_entry(entity_reg, entry_id)
-    
-    # Group entities by platform
-    entities_by_platform: Dict[str, List] = {}
-    for entity in entities:
-        platform = entity.domain
-        entities_by_platform.setdefault(platform, []).append(entity)
-    
-    # Check for entities with non-standard object_ids
-    for platform, platform_entities in entities_by_platform.items():
-        for entity in platform_entities:
-            # Check if entity_id contains translated words (common issue)
-            entity_id_lower = entity.entity_id.lower()
-            
-            # German words that shouldn't be in entity IDs
-            german_indicators = [
-                "kesseltemperatur", "temperatur", "raumtemperatur",
-                "außentemperatur", "betriebsart", "warmwasser"
-            ]
-            
-            # French words that are NOT also common English words
-            french_indicators = [
-                "température", "chauffage"
-            ]
-            
-            for word in german_indicators + french_indicators:
-                if word in entity_id_lower:
-                    warnings.append(
-                        f"Entity {entity.entity_id} contains translated text ('{word}'). "
-                        f"This may cause issues if the system language changes."
-                    )
-                    break
-    
-    # If there are warnings, create a notification
-    if warnings and len(warnings) > 0:
-        # Limit to first 5 warnings to avoid overwhelming notification
-        warning_text = "\n".join(f"- {w}" for w in warnings[:5])
-        if len(warnings) > 5:
-            warning_text += f"\n\n...and {len(warnings) - 5} more warnings (check logs for details)"
-        
-        try:
-            await hass.services.async_call(
-                "persistent_notification",
-                "create",
-                {
-                    "message": f"**Ökofen Pellematic: Entity ID Warning**\n\n"
-                               f"Some entity IDs contain translated text which may cause issues:\n\n"
-                               f"{warning_text}\n\n"
-                               f"These entities will continue working, but consider renaming them to use standardized IDs.\n\n"
-                               f"See the [Migration Guide](https://github.com/dominikamann/oekofen-pellematic-compact/blob/main/MIGRATION_GUIDE.md) for more information.",
-                    "title": "Ökofen Pellematic Entity Warning",
-                    "notification_id": f"oekofen_entity_warning_{hub_name}",
-                },
-            )
-        except Exception as e:
-            _LOGGER.debug("Could not create entity warning notification: %s", e)
-    
+    _migrated, warnings = await async_migrate_and_check_entities(
+        hass, entry_id, hub_name, migrate=False, check=True
+    )
     return warnings
+
+
+async def _async_notify_entity_warnings(hass: HomeAssistant, hub_name: str, warnings: List[str]) -> None:
+    """Create a notification about entity IDs with translated text."""
+    # Limit to first 5 warnings to avoid overwhelming notification
+    warning_text = "\n".join(f"- {w}" for w in warnings[:5])
+    if len(warnings) > 5:
+        warning_text += f"\n\n...and {len(warnings) - 5} more warnings (check logs for details)"
+    
+    try:
+        await hass.services.async_call(
+            "persistent_notification",
+            "create",
+            {
+                "message": f"**Ökofen Pellematic: Entity ID Warning**\n\n"
+                           f"Some entity IDs contain translated text which may cause issues:\n\n"
+                           f"{warning_text}\n\n"
+                           f"These entities will continue working, but consider renaming them to use standardized IDs.\n\n"
+                           f"See the [Migration Guide](https://github.com/dominikamann/oekofen-pellematic-compact/blob/main/MIGRATION_GUIDE.md) for more information.",
+                "title": "Ökofen Pellematic Entity Warning",
+                "notification_id": f"oekofen_entity_warning_{hub_name}",
+            },
+        )
+    except Exception as e:
+        _LOGGER.debug("Could not create entity warning notification: %s", e)
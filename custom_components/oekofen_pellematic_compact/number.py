@@ -13,6 +13,7 @@ from .const import (
     get_api_value,
 )
 from .dynamic_discovery import discover_all_entities
+from .scaling import scale_value, unscale_value
 
 from homeassistant.const import (
     CONF_NAME,
@@ -46,7 +47,7 @@ async def async_setup_entry(
     def create_number_entities(data: Dict[str, Any]) -> list:
         """Factory function to create number entities from discovery data."""
         entities = []
-        discovered = discover_all_entities(data)
+        discovered = discover_all_entities(data, hub.entity_filter)
         
         _LOGGER.info("Dynamically discovered %d number entities", len(discovered['numbers']))
         
@@ -108,10 +109,12 @@ class PellematicNumber(NumberEntity):
         # Apply the same factor used for display values so HA enforces the correct range.
         raw_min = number_definition.get('min_value')
         raw_max = number_definition.get('max_value')
-        self._attr_native_min_value = float(raw_min) * self._factor if raw_min is not None else 0.0
-        self._attr_native_max_value = float(raw_max) * self._factor if raw_max is not None else 100.0
+        self._attr_native_min_value = scale_value(raw_min, self._factor) if raw_min is not None else 0.0
+        self._attr_native_max_value = scale_value(raw_max, self._factor) if raw_max is not None else 100.0
         self._attr_native_step = number_definition.get('step', 0.5)
         self._attr_native_value = None
+        self._attr_entity_category = number_definition.get('entity_category')
+        self._attr_entity_registry_enabled_default = number_definition.get('enabled_default', True)
         
         _LOGGER.debug(
             "Adding dynamic PellematicNumber: %s, %s, min=%s, max=%s, step=%s, factor=%s",
@@ -153,7 +156,7 @@ class PellematicNumber(NumberEntity):
 
             # Apply factor to convert display value to API value
             # Example: User sets 58.0°C, factor is 0.1, send 580 to API
-            send_value = int(value / self._factor) if self._factor != 1 else int(value)
+            send_value = unscale_value(value, self._factor) if self._factor != 1 else int(value)
             
             _LOGGER.debug(
                 "Setting %s: display_value=%s, factor=%s, api_value=%s",
@@ -161,8 +164,7 @@ class PellematicNumber(NumberEntity):
             )
             
             # Send the new value to the API
-            await self.hass.async_add_executor_job(
-                self._hub.send_pellematic_data,
+            await self._hub.async_send_pellematic_data(
                 send_value,
                 self._prefix,
                 self._key
@@ -185,20 +187,10 @@ class PellematicNumber(NumberEntity):
             raw_data = self._hub.data[self._prefix][self._key.replace("#2", "")]
             api_value = get_api_value(raw_data)
             
-            # Convert API value to float first (handles both string and numeric types)
-            numeric_value = float(api_value) if not isinstance(api_value, (int, float)) else api_value
-            
-            # Apply factor to convert API value to display value
-            # Example: API sends 580, factor is 0.1, display 58.0°C
-            if self._factor != 1:
-                display_value = float(numeric_value) * self._factor
-            else:
-                display_value = numeric_value
-            
-            # Return as int if it's a whole number, otherwise as float
-            if isinstance(display_value, float) and display_value.is_integer():
-                return int(display_value)
-            return display_value
+            # Apply factor to convert API value to display value, rounded to
+            # the factor's precision and as int if it's a whole number
+            # Example: API sends 580, factor is 0.1, display 58
+            return scale_value(api_value, self._factor)
         except Exception as e:
             _LOGGER.debug("Error updating value for %s: %s", self.entity_id, e)
             return None
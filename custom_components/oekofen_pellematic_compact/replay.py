@@ -0,0 +1,321 @@
+"""Recording and replay of controller traffic.
+
+A recording is an append-only binary file. It starts with ``RECORDING_MAGIC``
+and is followed by records of the form::
+
+    kind (1 byte) | timestamp (float64, seconds since epoch) | length (uint32) | payload
+
+``kind`` is one of ``RECORD_RESPONSE`` (raw response bytes of a fetch),
+``RECORD_ERROR`` (message of a failed fetch) or ``RECORD_WRITE`` (URL sent
+by ``send_data``). Recordings are meant to be shared, so the controller
+password is replaced by ``REDACTED`` in write URLs and error messages. ``FLAG_COMPRESSED`` is set when the payload is zlib
+compressed. ``FLAG_DELTA`` additionally marks a response compressed with
+the previous response of the same file as preset dictionary; consecutive
+polls differ in a few values only, so this shrinks a response to a few
+hundred bytes. Records are only appended, so a file cut off by a crash or
+power loss is read up to its last complete record.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORDING_MAGIC = b"OEKREC1\n"
+RECORDING_SUFFIX = ".rec"
+
+RECORD_RESPONSE = 1
+RECORD_ERROR = 2
+RECORD_WRITE = 3
+FLAG_COMPRESSED = 0x80
+FLAG_DELTA = 0x40
+_FLAGS = FLAG_COMPRESSED | FLAG_DELTA
+
+# Stands in for the controller password in recorded URLs and messages
+REDACTED = "REDACTED"
+
+_HEADER = struct.Struct("<BdI")
+# Payloads below this size are stored as they are
+_COMPRESS_MIN_BYTES = 256
+
+
+def controller_password(url: str) -> Optional[str]:
+    """Return the password segment of a controller URL (``http://host:port/<password>/all``)."""
+    segments = urlsplit(url).path.split("/")
+    if len(segments) > 2 and segments[1]:
+        return segments[1]
+    return None
+
+
+def redact_url(url: str) -> str:
+    """Return a controller URL with its password segment replaced by ``REDACTED``."""
+    parts = urlsplit(url)
+    segments = parts.path.split("/")
+    if len(segments) > 2 and segments[1]:
+        segments[1] = REDACTED
+    return urlunsplit(parts._replace(path="/".join(segments)))
+
+
+class RecordingFormatError(Exception):
+    """Raised when a file is not a traffic recording."""
+
+
+class ReplayedFetchError(Exception):
+    """A fetch that failed while the traffic was recorded."""
+
+
+class ReplayFinished(Exception):
+    """Raised when all recorded responses have been replayed."""
+
+
+@dataclass
+class TrafficRecord:
+    """A single record of a recording."""
+
+    kind: int
+    timestamp: float
+    payload: bytes
+
+
+def _write_record(
+    file: BinaryIO,
+    kind: int,
+    timestamp: float,
+    payload: bytes,
+    previous: Optional[bytes] = None,
+) -> None:
+    """Append one record to an open recording.
+
+    Args:
+        file: Recording opened for appending
+        kind: Record kind
+        timestamp: Record time in seconds since epoch
+        payload: Uncompressed payload
+        previous: Previous response written to this file, used as dictionary
+    """
+    if len(payload) >= _COMPRESS_MIN_BYTES:
+        if previous:
+            compressor = zlib.compressobj(6, zdict=previous)
+            flags = FLAG_COMPRESSED | FLAG_DELTA
+        else:
+            compressor = zlib.compressobj(6)
+            flags = FLAG_COMPRESSED
+        compressed = compressor.compress(payload) + compressor.flush()
+        if len(compressed) < len(payload):
+            kind |= flags
+            payload = compressed
+    file.write(_HEADER.pack(kind, timestamp, len(payload)) + payload)
+
+
+def read_records(path: str) -> Iterator[TrafficRecord]:
+    """Read all complete records of a recording.
+
+    Args:
+        path: Recording file
+
+    Yields:
+        Records in the order they were written
+
+    Raises:
+        RecordingFormatError: If the file does not start with the recording magic
+    """
+    with open(path, "rb") as file:
+        if file.read(len(RECORDING_MAGIC)) != RECORDING_MAGIC:
+            raise RecordingFormatError(f"{path} is not a traffic recording")
+        previous = None
+        while True:
+            header = file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            kind, timestamp, length = _HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length:
+                _LOGGER.warning("Recording %s ends with a truncated record", path)
+                return
+            if kind & FLAG_COMPRESSED:
+                try:
+                    if kind & FLAG_DELTA:
+                        decompressor = zlib.decompressobj(zdict=previous or b"")
+                    else:
+                        decompressor = zlib.decompressobj()
+                    payload = decompressor.decompress(payload) + decompressor.flush()
+                except zlib.error:
+                    _LOGGER.warning("Recording %s contains a corrupt record, stopping there", path)
+                    return
+            kind &= ~_FLAGS
+            if kind == RECORD_RESPONSE:
+                previous = payload
+            yield TrafficRecord(kind, timestamp, payload)
+
+
+def write_recording(path: str, records: Iterable[TrafficRecord]) -> int:
+    """Write records with their own timestamps to a new recording.
+
+    Used to build recordings from simulated or edited traffic.
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    previous = None
+    with open(path, "wb") as file:
+        file.write(RECORDING_MAGIC)
+        for record in records:
+            _write_record(file, record.kind, record.timestamp, record.payload, previous)
+            if record.kind == RECORD_RESPONSE:
+                previous = record.payload
+            count += 1
+    return count
+
+
+class TrafficRecorder:
+    """Appends controller traffic to a recording file.
+
+    Methods are called from executor threads (fetches and writes run there),
+    so appends are serialized with a lock.
+    """
+
+    def __init__(self, path: str, password: Optional[str] = None) -> None:
+        """Open (or continue) a recording.
+
+        Args:
+            path: Recording file
+            password: Controller password, redacted from error messages
+        """
+        self.path = path
+        self._password = password
+        self.records = 0
+        self._lock = threading.Lock()
+        # Continued recordings start without a dictionary
+        self._previous: Optional[bytes] = None
+        self._file: Optional[BinaryIO] = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(RECORDING_MAGIC)
+            self._file.flush()
+
+    def _record(self, kind: int, payload: bytes) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            _write_record(self._file, kind, time.time(), payload, self._previous)
+            if kind == RECORD_RESPONSE:
+                self._previous = payload
+            self._file.flush()
+            self.records += 1
+
+    def record_response(self, raw_data: bytes) -> None:
+        """Record the raw bytes of a successful fetch."""
+        self._record(RECORD_RESPONSE, raw_data)
+
+    def record_error(self, error: Exception) -> None:
+        """Record a failed fetch."""
+        message = str(error)
+        if self._password:
+            message = message.replace(self._password, REDACTED)
+        self._record(RECORD_ERROR, message.encode("utf-8", "replace"))
+
+    def record_write(self, url: str) -> None:
+        """Record a write URL, without the controller password."""
+        self._record(RECORD_WRITE, redact_url(url).encode("utf-8"))
+
+    @property
+    def closed(self) -> bool:
+        """Return True once the recording is closed."""
+        return self._file is None
+
+    def close(self) -> None:
+        """Close the recording."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class TrafficReplay:
+    """Serves recorded responses in place of the controller.
+
+    The hub calls ``next_response()`` instead of fetching from the network and
+    hands writes to ``writes`` instead of sending them.
+    """
+
+    def __init__(self, records: List[TrafficRecord]) -> None:
+        """Initialize the replay from records."""
+        self.fetches = [record for record in records if record.kind in (RECORD_RESPONSE, RECORD_ERROR)]
+        self.recorded_writes = [record.payload.decode("utf-8") for record in records if record.kind == RECORD_WRITE]
+        self.writes: List[str] = []
+        self.position = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> "TrafficReplay":
+        """Load a recording file."""
+        return cls(list(read_records(path)))
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of fetches not replayed yet."""
+        return len(self.fetches) - self.position
+
+    @property
+    def duration(self) -> float:
+        """Return the recorded time span in seconds."""
+        if not self.fetches:
+            return 0.0
+        return self.fetches[-1].timestamp - self.fetches[0].timestamp
+
+    def next_response(self) -> bytes:
+        """Return the raw bytes of the next recorded fetch.
+
+        Raises:
+            ReplayedFetchError: If the recorded fetch failed
+            ReplayFinished: If every fetch has been replayed
+        """
+        if self.position >= len(self.fetches):
+            raise ReplayFinished("All recorded responses have been replayed")
+        record = self.fetches[self.position]
+        self.position += 1
+        if record.kind == RECORD_ERROR:
+            raise ReplayedFetchError(record.payload.decode("utf-8", "replace"))
+        return record.payload
+
+
+async def async_replay(hub: Any, replay: TrafficReplay, speed: Optional[float] = None) -> int:
+    """Replay a recording through a hub's regular refresh path.
+
+    Every recorded fetch triggers ``hub.async_refresh_api_data()``, so parsing
+    and the entity callbacks run exactly as during polling.
+
+    Args:
+        hub: PellematicHub to feed
+        replay: Recorded traffic
+        speed: Playback speed factor (e.g. 60 plays an hour in a minute);
+            None replays as fast as possible
+
+    Returns:
+        Number of fetches replayed
+    """
+    hub.start_replay(replay)
+    try:
+        previous = None
+        replayed = 0
+        while replay.remaining:
+            timestamp = replay.fetches[replay.position].timestamp
+            if speed and previous is not None and timestamp > previous:
+                await asyncio.sleep((timestamp - previous) / speed)
+            previous = timestamp
+            position = replay.position
+            await hub.async_refresh_api_data()
+            if replay.position == position:
+                # Without listeners the hub skips the fetch; drop the response
+                replay.position += 1
+            replayed += 1
+        return replayed
+    finally:
+        hub.stop_replay()
@@ -0,0 +1,113 @@
+"""Canonical scaling of raw API values by their ``factor``.
+
+The controller sends integers and a factor (``"val": 219, "factor": 0.1``).
+``219 * 0.1`` is ``21.900000000000002`` in floating point, and the same
+temperature can come out with different float noise depending on the raw
+value, so the state string changes although the value did not. Scaled
+values are therefore rounded to the precision the factor implies (one
+decimal for 0.1, two for 0.01, none for 1), plus the decimals of the raw
+value if it is not whole, and returned as int when whole.
+
+Old firmware sends plain values without a factor. Their scaling follows
+from the unit (``fallback_factor``), so sensors, snapshots and the data
+log scale them the same way.
+"""
+from __future__ import annotations
+
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Optional, Union
+
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import UnitOfEnergy, UnitOfPower, UnitOfVolumeFlowRate
+
+
+@lru_cache(maxsize=64)
+def factor_precision(factor: Any) -> int:
+    """Return the number of decimals implied by a factor.
+
+    Args:
+        factor: Scaling factor from the API metadata (number or string)
+
+    Returns:
+        Decimals of the factor, e.g. 1 for 0.1, 2 for 0.25, 0 for 1 or 10;
+        0 if the factor is not a number
+    """
+    try:
+        exponent = Decimal(str(float(factor))).normalize().as_tuple().exponent
+    except (TypeError, ValueError, InvalidOperation):
+        return 0
+    return -exponent if isinstance(exponent, int) and exponent < 0 else 0
+
+
+def _decimals(number: float) -> int:
+    """Return the number of decimals in the shortest representation of a float."""
+    exponent = Decimal(repr(number)).as_tuple().exponent
+    return -exponent if isinstance(exponent, int) and exponent < 0 else 0
+
+
+def scale_value(value: Any, factor: Any) -> Union[int, float]:
+    """Return a raw API value multiplied by its factor, rounded canonically.
+
+    Args:
+        value: Raw value (number or numeric string)
+        factor: Scaling factor from the API metadata (number or string)
+
+    Returns:
+        The scaled value, as int if it is whole
+
+    Raises:
+        ValueError, TypeError: If value or factor is not numeric
+    """
+    number = float(value)
+    precision = factor_precision(factor)
+    if not number.is_integer():
+        precision += _decimals(number)
+    result = round(number * float(factor), precision)
+    return int(result) if result.is_integer() else result
+
+
+def unscale_value(value: float, factor: Any) -> int:
+    """Return the raw API integer for a scaled value (the inverse of ``scale_value``).
+
+    Rounds instead of truncating: ``21.9 / 0.1`` is ``218.99999999999997``.
+    """
+    return int(round(value / float(factor)))
+
+
+def fallback_factor(device_class: Optional[str], unit: Optional[str], component: str) -> Optional[float]:
+    """Return the factor implied by the unit of a value that comes without one.
+
+    Old firmware sends temperatures and kW in tenths, solar energy (``se*``)
+    in tenths and other energy in ten-thousandths of a kWh, and flow rates
+    per second.
+
+    Args:
+        device_class: Device class inferred for the value
+        unit: Normalized unit of the value
+        component: Component name, e.g. ``se1``
+
+    Returns:
+        The factor, or None if the value is not scaled
+    """
+    if device_class == SensorDeviceClass.TEMPERATURE or unit == UnitOfPower.KILO_WATT:
+        return 0.1
+    if unit == UnitOfVolumeFlowRate.LITERS_PER_MINUTE:
+        return 60
+    if unit == UnitOfEnergy.KILO_WATT_HOUR:
+        return 0.1 if component.lower().startswith("se") else 0.0001
+    return None
+
+
+def fallback_scale(value: Any, device_class: Optional[str], unit: Optional[str], component: str) -> Any:
+    """Return a value without factor scaled by its ``fallback_factor``.
+
+    Values that are not scaled or not numeric are returned unchanged.
+    """
+    factor = fallback_factor(device_class, unit, component)
+    if factor is None:
+        return value
+    try:
+        return scale_value(int(value), factor)
+    except (ValueError, TypeError):
+        return value
@@ -0,0 +1,246 @@
+"""Domain-wide poll scheduler for all Pellematic hubs.
+
+Every hub registers its poll with the scheduler instead of starting its own
+interval timer. The scheduler
+
+- spreads the hubs' polls across the interval: with n hubs, hub i polls at
+  ``i / n`` of its interval after a common anchor, so several controllers
+  never poll in the same second
+- caps the number of polls (fetch, parse and entity fan-out) running at the
+  same time across all hubs
+- never queues a hub's polls: a tick that fires while the hub's previous
+  poll is still running (slow controller, rate-limit wait, timeout) is
+  skipped and counted as a missed deadline, the running poll delivers the
+  data instead
+- optionally polls with a fixed delay (next poll = end of the last poll +
+  interval) instead of a fixed rate, so a degraded controller gets a pause
+  between requests rather than a continuous request stream
+
+Each hub still enforces its controller's 2.5 s minimum request spacing in
+``PellematicHub.fetch_pellematic_data``; the scheduler only decides when polls
+start.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+
+from .const import DATA_POLL_SCHEDULER, MAX_CONCURRENT_POLLS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class ScheduledPoll:
+    """A hub's poll registered with the scheduler."""
+
+    name: str
+    interval: timedelta
+    action: Callable[[Optional[datetime]], Awaitable[Any]]
+    fixed_delay: bool = False
+    offset: float = 0.0
+    unsub: Optional[Callable[[], None]] = None
+    running: bool = False
+    missed: int = 0
+    last_duration: Optional[float] = None
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the pending start or the running interval timer."""
+        if self.unsub is not None:
+            self.unsub()
+            self.unsub = None
+
+
+class PollScheduler:
+    """Phase-offsets hub polls and limits how many run concurrently."""
+
+    def __init__(self, hass: HomeAssistant, max_concurrent: int = MAX_CONCURRENT_POLLS) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            hass: Home Assistant instance
+            max_concurrent: Maximum number of polls running at the same time
+        """
+        self._hass = hass
+        self._anchor = time.monotonic()
+        self._polls: Dict[str, ScheduledPoll] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self.peak_active = 0
+        self.waited = 0
+
+    @property
+    def offsets(self) -> Dict[str, float]:
+        """Return the phase offset of every registered poll in seconds."""
+        return {name: poll.offset for name, poll in self._polls.items()}
+
+    @property
+    def missed(self) -> Dict[str, int]:
+        """Return the number of skipped ticks (missed deadlines) per poll."""
+        return {name: poll.missed for name, poll in self._polls.items()}
+
+    @property
+    def durations(self) -> Dict[str, Optional[float]]:
+        """Return the duration of every poll's last run in seconds."""
+        return {name: poll.last_duration for name, poll in self._polls.items()}
+
+    @callback
+    def async_register(
+        self,
+        name: str,
+        interval: timedelta,
+        action: Callable[[Optional[datetime]], Awaitable[Any]],
+        fixed_delay: bool = False,
+    ) -> Callable[[], None]:
+        """Register a hub's poll.
+
+        Args:
+            name: Hub name (unique per config entry)
+            interval: Poll interval
+            action: Coroutine function called for every poll
+            fixed_delay: Start the next poll one interval after the last one
+                ended instead of on the fixed interval grid
+
+        Returns:
+            Callback that unregisters the poll
+        """
+        previous = self._polls.pop(name, None)
+        if previous is not None:
+            previous.async_cancel()
+        poll = ScheduledPoll(name, interval, action, fixed_delay)
+        self._polls[name] = poll
+        self._async_rebalance()
+
+        @callback
+        def unregister() -> None:
+            if self._polls.get(name) is poll:
+                del self._polls[name]
+                poll.async_cancel()
+                self._async_rebalance()
+
+        return unregister
+
+    @callback
+    def async_set_interval(self, name: str, interval: timedelta) -> None:
+        """Change a registered poll's interval.
+
+        Fixed-delay polls use the new interval from their next run on; polls on
+        the fixed grid are rebalanced.
+        """
+        poll = self._polls.get(name)
+        if poll is None or poll.interval == interval:
+            return
+        poll.interval = interval
+        if not poll.fixed_delay:
+            self._async_rebalance()
+
+    async def async_poll_now(self, name: str) -> bool:
+        """Run a registered poll immediately, within the concurrency cap.
+
+        If the poll is already running, no second one is started.
+
+        Returns:
+            False if no poll is registered under this name
+        """
+        poll = self._polls.get(name)
+        if poll is None:
+            return False
+        await self._async_run(poll)
+        return True
+
+    @callback
+    def _async_rebalance(self) -> None:
+        """Spread all polls evenly across their intervals and reschedule them."""
+        count = len(self._polls)
+        now = time.monotonic()
+        for index, poll in enumerate(self._polls.values()):
+            period = poll.interval.total_seconds()
+            poll.offset = period * index / count
+            poll.async_cancel()
+            # Next point in time on this poll's grid: anchor + offset + k * period
+            delay = period - (now - self._anchor - poll.offset) % period
+            poll.unsub = async_call_later(self._hass, delay, self._start_job(poll))
+        _LOGGER.debug("Poll offsets: %s", self.offsets)
+
+    def _start_job(self, poll: ScheduledPoll) -> Callable[[datetime], Awaitable[None]]:
+        async def start(now: datetime) -> None:
+            """Start the interval timer at the poll's phase and run the first poll."""
+            if poll.fixed_delay:
+                poll.unsub = None
+                try:
+                    await self._async_run(poll, now)
+                finally:
+                    # A failed poll must not end the chain of fixed-delay polls
+                    self._async_schedule_next(poll)
+                return
+            poll.unsub = async_track_time_interval(self._hass, self._run_job(poll), poll.interval)
+            await self._async_run(poll, now)
+
+        return start
+
+    def _run_job(self, poll: ScheduledPoll) -> Callable[[datetime], Awaitable[None]]:
+        async def run(now: datetime) -> None:
+            await self._async_run(poll, now)
+
+        return run
+
+    def _delay_job(self, poll: ScheduledPoll) -> Callable[[datetime], Awaitable[None]]:
+        async def run(now: datetime) -> None:
+            poll.unsub = None
+            try:
+                await self._async_run(poll, now)
+            finally:
+                self._async_schedule_next(poll)
+
+        return run
+
+    @callback
+    def _async_schedule_next(self, poll: ScheduledPoll) -> None:
+        """Schedule a fixed-delay poll one interval after its last run ended."""
+        # Not if the poll was unregistered or rescheduled while it ran
+        if self._polls.get(poll.name) is poll and poll.unsub is None:
+            poll.unsub = async_call_later(self._hass, poll.interval, self._delay_job(poll))
+
+    async def _async_run(self, poll: ScheduledPoll, now: Optional[datetime] = None) -> None:
+        """Run a poll once a concurrency slot is free, unless it is still running."""
+        if poll.running:
+            poll.missed += 1
+            _LOGGER.debug(
+                "Poll of '%s' still running after %s, skipping tick (%d missed)",
+                poll.name, poll.interval, poll.missed
+            )
+            return
+        poll.running = True
+        try:
+            if self._semaphore.locked():
+                self.waited += 1
+                _LOGGER.debug("Poll of '%s' waits for one of %d slots", poll.name, self.max_concurrent)
+            async with self._semaphore:
+                self.active += 1
+                self.peak_active = max(self.peak_active, self.active)
+                started = time.monotonic()
+                try:
+                    await poll.action(now)
+                finally:
+                    poll.last_duration = time.monotonic() - started
+                    self.active -= 1
+        finally:
+            poll.running = False
+
+
+@callback
+def async_get_poll_scheduler(hass: HomeAssistant) -> PollScheduler:
+    """Return the domain's poll scheduler, creating it on first use."""
+    scheduler = hass.data.get(DATA_POLL_SCHEDULER)
+    if scheduler is None:
+        scheduler = hass.data[DATA_POLL_SCHEDULER] = PollScheduler(hass)
+    return scheduler
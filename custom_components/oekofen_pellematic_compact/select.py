@@ -11,7 +11,7 @@ from .const import (
     ATTR_MANUFACTURER,
     ATTR_MODEL,
 )
-from .dynamic_discovery import discover_all_entities
+from .dynamic_discovery import discover_all_entities, format_descriptor
 
 from homeassistant.const import (
     CONF_NAME,
@@ -44,7 +44,7 @@ async def async_setup_entry(
     def create_select_entities(data: Dict[str, Any]) -> list:
         """Factory function to create select entities from discovery data."""
         entities = []
-        discovered = discover_all_entities(data)
+        discovered = discover_all_entities(data, hub.entity_filter)
         
         _LOGGER.info("Dynamically discovered %d select entities", len(discovered['selects']))
         
@@ -97,9 +97,14 @@ class PellematicSelect(SelectEntity):
         # Use component_key for entity_id instead of long human-readable name
         self._attr_object_id = f"{self._prefix}_{self._key}".lower()
         self._attr_current_option = None
-        self._attr_options = select_definition['options']
+        self._options = select_definition.get('format_descriptor') or format_descriptor(select_definition.get('format') or "")
+        self._attr_options = self._options.options
+        # API values not in the format string, logged once each
+        self._unknown_values = set()
         self._device_info = device_info
         self._attr_translation_key = None
+        self._attr_entity_category = select_definition.get('entity_category')
+        self._attr_entity_registry_enabled_default = select_definition.get('enabled_default', True)
         
         _LOGGER.debug(
             "Adding dynamic PellematicSelect: %s, %s, options: %s",
@@ -128,7 +133,8 @@ class PellematicSelect(SelectEntity):
             # An unrecognised value can configure a register (e.g. sensor_on/off)
             # to reference a physical sensor that does not exist, creating an
             # unacknowledgeable fault that requires a full factory reset to clear.
-            if option not in self._attr_options:
+            option_value = self._options.value(option)
+            if option_value is None:
                 _LOGGER.error(
                     "Blocked write for %s: option '%s' is not in the valid option "
                     "list %s. Write rejected to protect boiler controller state.",
@@ -136,14 +142,8 @@ class PellematicSelect(SelectEntity):
                 )
                 return
 
-            # Options are stored as "<index>_<label>" (e.g. "0_ecs", "10_buffer").
-            # Extract only the numeric index prefix to send to the API.
-            # Using option[:1] was wrong for multi-digit indices (>= 10).
-            option_value = option.split("_", 1)[0]
-
             # Send the new option value to the API
-            await self.hass.async_add_executor_job(
-                self._hub.send_pellematic_data,
+            await self._hub.async_send_pellematic_data(
                 option_value,
                 self._prefix,
                 self._key
@@ -162,12 +162,18 @@ class PellematicSelect(SelectEntity):
             raise
 
     def _update_current_option(self):
-        try:
-            raw_data = self._hub.data[self._prefix][self._key.replace("#2", "")]
-            current_value = raw_data["val"]
-            return self._attr_options[int(current_value)]
-        except:
+        raw_data = self._hub.data.get(self._prefix, {}).get(self._key.replace("#2", ""))
+        if not isinstance(raw_data, dict) or "val" not in raw_data:
             return None
+        current_value = raw_data["val"]
+        option = self._options.option(current_value)
+        if option is None and repr(current_value) not in self._unknown_values:
+            self._unknown_values.add(repr(current_value))
+            _LOGGER.warning(
+                "Value %r of %s is not in its option list %s",
+                current_value, self.entity_id, self._attr_options,
+            )
+        return option
 
     @callback
     def _update_state(self):
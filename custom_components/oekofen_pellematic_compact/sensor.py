@@ -14,6 +14,8 @@ from .const import (
     ATTR_MODEL,
     get_api_value,
 )
+from .deadband import deadband_threshold
+from .scaling import factor_precision, fallback_factor, fallback_scale, scale_value
 from .dynamic_discovery import discover_all_entities
 
 from homeassistant.const import (
@@ -97,7 +99,7 @@ async def async_setup_entry(
     def create_sensor_entities(data: Dict[str, Any]) -> list:
         """Factory function to create sensor entities from discovery data."""
         entities = []
-        discovered = discover_all_entities(data)
+        discovered = discover_all_entities(data, hub.entity_filter)
         
         _LOGGER.info("Dynamically discovered %d sensors, %d binary sensors", 
                      len(discovered['sensors']), len(discovered['binary_sensors']))
@@ -191,6 +193,8 @@ class PellematicBinarySensor(BinarySensorEntity):
 
         # Set device class from definition (None is fine — HA will show a generic on/off)
         self._attr_device_class = sensor_definition.get('device_class') or None
+        self._attr_entity_category = sensor_definition.get('entity_category')
+        self._attr_entity_registry_enabled_default = sensor_definition.get('enabled_default', True)
 
         _LOGGER.debug(
             "Adding dynamic PellematicBinarySensor: %s, %s",
@@ -269,6 +273,10 @@ class PellematicSensor(SensorEntity):
         self._icon = sensor_definition.get('icon')
         self._device_info = device_info
         self._state = None
+        self._attr_entity_category = sensor_definition.get('entity_category')
+        self._attr_entity_registry_enabled_default = sensor_definition.get('enabled_default', True)
+        # False if the capability profile guarantees a factor for scaled values
+        self._unit_fallback = getattr(hub, "unit_fallback", True)
         
         # Set device class from definition
         device_class = sensor_definition.get('device_class')
@@ -306,6 +314,34 @@ class PellematicSensor(SensorEntity):
             'l_az_cool', 'l_cop',
         ):
             self._attr_state_class = SensorStateClass.MEASUREMENT
+
+        # Display precision from the factor; without metadata the factor
+        # defaults to 1 and says nothing about the unit-fallback scaling
+        factor = sensor_definition.get('factor', 1)
+        if self._unit_of_measurement and (factor != 1 or not self._unit_fallback):
+            self._attr_suggested_display_precision = factor_precision(factor)
+
+        # Rolling window of the hub's publisher, for measurements while added
+        self._window = None
+
+        # Shared descriptor of enum values ("0:-|1:SG Ready 1|..."), for the text attribute
+        descriptor = sensor_definition.get('format_descriptor')
+        self._format = descriptor if descriptor is not None and descriptor.options else None
+
+        # Deadband filter of the hub (opt-in) and this sensor's threshold
+        self._deadband = getattr(hub, "deadband", None)
+        self._deadband_threshold = None
+        if self._deadband is not None:
+            resolution = factor
+            if factor == 1 and self._unit_fallback:
+                # Values without a factor get the unit-based scaling of _compute_state
+                resolution = fallback_factor(device_class, self._unit_of_measurement, self._prefix) or factor
+            self._deadband_threshold = deadband_threshold(
+                device_class,
+                getattr(self, "_attr_state_class", None),
+                self._unit_of_measurement,
+                resolution,
+            )
         
         _LOGGER.debug(
             "Adding dynamic PellematicSensor: %s, %s, %s, %s",
@@ -314,13 +350,26 @@ class PellematicSensor(SensorEntity):
 
     async def async_added_to_hass(self):
         """Register callbacks."""
+        publisher = getattr(self._hub, "publisher", None)
+        if publisher is not None and getattr(self, "_attr_state_class", None) == SensorStateClass.MEASUREMENT:
+            publisher.track(self._attr_unique_id, self._compute_state)
+            self._window = publisher.window(self._attr_unique_id)
         self._hub.async_add_pellematic_sensor(self._api_data_updated)
 
     async def async_will_remove_from_hass(self) -> None:
         self._hub.async_remove_pellematic_sensor(self._api_data_updated)
+        if self._window is not None:
+            self._hub.publisher.untrack(self._attr_unique_id)
+            self._window = None
+        if self._deadband is not None:
+            self._deadband.forget(self._attr_unique_id)
 
     @callback
     def _api_data_updated(self):
+        if self._deadband_threshold is not None and not self._deadband.should_publish(
+            self._attr_unique_id, self._compute_state(), self._deadband_threshold
+        ):
+            return
         self.async_write_ha_state()
 
     def _compute_state(self):
@@ -353,27 +402,18 @@ class PellematicSensor(SensorEntity):
         factor = raw_data.get("factor") if isinstance(raw_data, dict) else None
         if factor is not None:
             try:
-                result = float(current_value) * float(factor)
-                return int(result) if result.is_integer() else result
+                return scale_value(current_value, factor)
             except (ValueError, TypeError):
                 pass
             return current_value
 
-        # Unit-based fallback scaling for old firmware that has no 'factor'.
-        try:
-            if getattr(self, "_attr_device_class", None) == SensorDeviceClass.TEMPERATURE:
-                return int(current_value) / 10
-            if self._unit_of_measurement == UnitOfVolumeFlowRate.LITERS_PER_MINUTE:
-                return int(current_value) * 60
-            if self._unit_of_measurement == UnitOfPower.KILO_WATT:
-                return int(current_value) / 10
-            if self._unit_of_measurement == UnitOfEnergy.KILO_WATT_HOUR:
-                divisor = 10 if self._prefix.lower().startswith("se") else 10000
-                return int(current_value) / divisor
-        except (ValueError, TypeError):
-            pass
+        if not self._unit_fallback:
+            return current_value
 
-        return current_value
+        # Unit-based fallback scaling for old firmware that has no 'factor'.
+        return fallback_scale(
+            current_value, getattr(self, "_attr_device_class", None), self._unit_of_measurement, self._prefix
+        )
 
     @callback
     def _update_state(self):
@@ -401,7 +441,12 @@ class PellematicSensor(SensorEntity):
 
     @property
     def extra_state_attributes(self):
-        return None
+        """Return the text of an enum value or the window aggregates, if any."""
+        if self._format is not None:
+            return {"text": self._format.text(self._compute_state())}
+        if self._window is None or not len(self._window):
+            return None
+        return self._window.as_dict()
 
     @property
     def should_poll(self) -> bool:
@@ -0,0 +1,155 @@
+"""Versioned snapshot of a hub's data for dashboards and external consumers.
+
+A custom dashboard or a Node-RED flow that shows a boiler overview would
+otherwise read hundreds of entity states. The snapshot holds every value of
+the hub's data in one compact payload instead, grouped by component, scaled
+by its factor (see ``scaling.scale_value``) and without the metadata.
+Values of old firmware, which come without a factor, are scaled by their
+unit like the sensor entities scale them (``scaling.fallback_scale``).
+
+Snapshots are built lazily: only when a consumer asks and the hub's data
+changed since the last request, or after every poll if the hub fires
+snapshot events (the changed values of the poll). Every built snapshot that differs from its
+predecessor gets the next generation number. Each key remembers the
+generation it last changed in, so a consumer that passes the generation it
+has seen gets only the keys that changed since.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .const import get_api_value
+from .dynamic_discovery import infer_fallback_scaling
+from .scaling import fallback_scale, scale_value
+
+# Components of the payload that hold no values
+_SKIPPED_COMPONENTS = ("error",)
+
+
+def normalize_value(field: Any, component: str = "", key: str = "", unit_fallback: bool = False) -> Any:
+    """Return the value of an API field, scaled by its factor if it is numeric.
+
+    Args:
+        field: API field, with or without metadata
+        component: Component of the field, e.g. ``pe1``
+        key: Key of the field, e.g. ``L_temp_act``
+        unit_fallback: Scale numeric values without a factor by their unit,
+            as the hub's sensors do (``PellematicHub.unit_fallback``)
+    """
+    value = get_api_value(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    factor = field.get("factor") if isinstance(field, dict) else None
+    if factor is None:
+        if unit_fallback:
+            return fallback_scale(value, *infer_fallback_scaling(key, field), component)
+        return value
+    try:
+        return scale_value(value, factor)
+    except (ValueError, TypeError):
+        return value
+
+
+def normalize_data(data: Dict[str, Any], unit_fallback: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Return the values of a hub payload, grouped by component.
+
+    Args:
+        data: Parsed API response
+        unit_fallback: Scale numeric values without a factor by their unit
+
+    Returns:
+        Component -> key -> normalized value
+    """
+    components: Dict[str, Dict[str, Any]] = {}
+    for component, fields in data.items():
+        if component in _SKIPPED_COMPONENTS or not isinstance(fields, dict):
+            continue
+        components[component] = {
+            key: normalize_value(field, component, key, unit_fallback) for key, field in fields.items()
+        }
+    return components
+
+
+class SnapshotStore:
+    """Generations of a hub's normalized data and the keys changed in each."""
+
+    def __init__(self, unit_fallback: bool = False) -> None:
+        """Initialize the store.
+
+        Args:
+            unit_fallback: Scale numeric values without a factor by their unit
+        """
+        self.unit_fallback = unit_fallback
+        self.generation = 0
+        self._data: Optional[Dict[str, Any]] = None
+        self._values: Dict[str, Dict[str, Any]] = {}
+        # (component, key) -> generation the value last changed in
+        self._changed: Dict[Tuple[str, str], int] = {}
+        # Generation in which keys last disappeared; older deltas get a full snapshot
+        self._removed = 0
+
+    def update(self, data: Dict[str, Any]) -> List[Tuple[str, str, Any]]:
+        """Build the snapshot of new hub data and advance the generation if it changed.
+
+        Args:
+            data: The hub's current data
+
+        Returns:
+            The (component, key, value) triples that changed; removed keys
+            have the value None. Empty if the data is the same object as in
+            the last update or no value changed.
+        """
+        if data is self._data:
+            return []
+        self._data = data
+        values = normalize_data(data, self.unit_fallback)
+        generation = self.generation + 1
+        changes: List[Tuple[str, str, Any]] = []
+        previous = self._values
+        for component, fields in values.items():
+            old_fields = previous.get(component, {})
+            for key, value in fields.items():
+                if key not in old_fields or old_fields[key] != value:
+                    self._changed[(component, key)] = generation
+                    changes.append((component, key, value))
+        removed = [
+            (component, key)
+            for component, fields in previous.items()
+            for key in fields
+            if key not in values.get(component, ())
+        ]
+        for component, key in removed:
+            del self._changed[(component, key)]
+            changes.append((component, key, None))
+        if removed:
+            self._removed = generation
+        self._values = values
+        if changes:
+            self.generation = generation
+        return changes
+
+    def get(self, data: Dict[str, Any], since_generation: Optional[int] = None) -> Dict[str, Any]:
+        """Return the snapshot of the hub's current data.
+
+        Args:
+            data: The hub's current data
+            since_generation: Generation the consumer has seen; only keys
+                changed after it are returned. A full snapshot is returned
+                if keys were removed since, or if the generation is unknown.
+
+        Returns:
+            ``generation``, ``full`` (False for a delta) and ``components``
+            (component -> key -> value)
+        """
+        self.update(data)
+        if since_generation is None or since_generation > self.generation or since_generation < self._removed:
+            return {"generation": self.generation, "full": True, "components": self._values}
+        components: Dict[str, Dict[str, Any]] = {}
+        for (component, key), generation in self._changed.items():
+            if generation > since_generation:
+                components.setdefault(component, {})[key] = self._values[component][key]
+        return {"generation": self.generation, "full": False, "components": components}
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the current generation and size for diagnostics."""
+        return {"generation": self.generation, "keys": len(self._changed)}
@@ -0,0 +1,143 @@
+"""Tiered polling: fast components every poll, the full payload rarely.
+
+Boiler combustion (``pe*``) and heating circuit flow temperatures (``hk*``)
+change within seconds, while solar yields, weather, forecast and the
+``_yesterday``/``_total`` statistics change hourly or daily. With tiered
+polling the hub
+
+- fetches the fast-tier components through the controller's component
+  endpoints (``/<password>/pe1``) on every poll, merging them into the
+  last full payload
+- fetches ``/all`` (every component, including the slow tier) only once
+  per full refresh interval, and whenever no full payload is available yet
+
+The controller serves one component per request (there is no endpoint for
+a list of components) and needs ``MIN_FETCH_INTERVAL`` between requests,
+so the fast tier costs one request per component, held apart by the
+request spacing. It is therefore only fetched on its own if
+
+- its requests fit into the current (possibly adaptive) poll interval, and
+- they take less time than the last full fetch, measured without the
+  rate-limit waits before the first request
+
+Otherwise every poll fetches ``/all``. A component response that does not
+contain its component switches tiered polling off for the hub.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .const import MIN_FETCH_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Components fetched on every poll
+FAST_TIER: Tuple[re.Pattern, ...] = (re.compile(r"pe\d+$"), re.compile(r"hk\d+$"))
+
+
+def fast_components(data: Dict[str, Any]) -> List[str]:
+    """Return the fast-tier components present in an API response."""
+    return [component for component in data if any(pattern.match(component) for pattern in FAST_TIER)]
+
+
+def component_url(host: str, component: str) -> str:
+    """Return the endpoint of a single component (or ``component_key=value`` write).
+
+    Args:
+        host: API URL ending in ``/all`` (with or without suffix)
+        component: Component name, e.g. ``pe1``
+    """
+    # Remove '/all' or '/all?' from the end of the host URL
+    base_url = host.replace('/all?', '/').replace('/all', '/')
+    return f"{base_url}{component}"
+
+
+class PollTiers:
+    """Decides per poll whether to fetch ``/all`` or the fast-tier components."""
+
+    def __init__(self, full_refresh_interval: float) -> None:
+        """Initialize the tier plan.
+
+        Args:
+            full_refresh_interval: Seconds between full ``/all`` fetches
+        """
+        self.full_refresh_interval = full_refresh_interval
+        self.last_full_fetch: Optional[float] = None
+        # Request time in seconds of the last full fetch and, on average, of one component
+        self.full_fetch_duration: Optional[float] = None
+        self.component_fetch_duration: Optional[float] = None
+        self.full_fetches = 0
+        self.component_fetches = 0
+        self.unsupported = False
+
+    def plan(
+        self, data: Dict[str, Any], now: float, interval: float, spacing: float = MIN_FETCH_INTERVAL
+    ) -> Optional[List[str]]:
+        """Return the components to fetch, or None for a full fetch.
+
+        Args:
+            data: Current (merged) API data
+            now: Monotonic time in seconds
+            interval: Current poll interval in seconds
+            spacing: Minimum seconds between two requests to the controller
+        """
+        if (
+            self.unsupported
+            or not data
+            or self.last_full_fetch is None
+            or now - self.last_full_fetch >= self.full_refresh_interval
+        ):
+            return None
+        components = fast_components(data)
+        if not components or len(components) * spacing >= interval:
+            # Nothing to split off, or the component requests would not fit into the interval
+            return None
+        if self.full_fetch_duration is None or self.component_cost(len(components), spacing) >= self.full_fetch_duration:
+            return None
+        return components
+
+    def component_cost(self, count: int, spacing: float = MIN_FETCH_INTERVAL) -> float:
+        """Return the estimated seconds that fetching ``count`` components takes.
+
+        Until a component was fetched, only the spacing between the requests
+        is counted.
+        """
+        return (count - 1) * spacing + count * (self.component_fetch_duration or 0.0)
+
+    def record_full_fetch(self, now: float, duration: Optional[float] = None) -> None:
+        """Note a successful full fetch.
+
+        Args:
+            now: Monotonic time in seconds
+            duration: Request time in seconds, if measured
+        """
+        self.last_full_fetch = now
+        self.full_fetches += 1
+        if duration is not None:
+            self.full_fetch_duration = duration
+
+    def record_component_fetch(self, count: int, duration: float) -> None:
+        """Note a successful fetch of ``count`` components with a total request time."""
+        self.component_fetches += count
+        self.component_fetch_duration = duration / count
+
+    def reject(self, component: str) -> None:
+        """Switch tiered polling off after a response without its component."""
+        _LOGGER.warning(
+            "Response of the '%s' endpoint does not contain the component; polling /all only", component
+        )
+        self.unsupported = True
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the tier settings and request counters for diagnostics."""
+        return {
+            "fast_tier": [pattern.pattern for pattern in FAST_TIER],
+            "full_refresh_interval": self.full_refresh_interval,
+            "full_fetches": self.full_fetches,
+            "component_fetches": self.component_fetches,
+            "full_fetch_duration": self.full_fetch_duration,
+            "component_fetch_duration": self.component_fetch_duration,
+            "unsupported": self.unsupported,
+        }
@@ -0,0 +1,8 @@
+"""Performance benchmarks for the Ökofen Pellematic integration.
+
+Run a suite from the repository root, e.g.::
+
+    python -m tests.benchmarks.bench_fixtures --output bench_output.json
+
+See ``harness.py`` for the result format and baseline comparison.
+"""
@@ -0,0 +1,106 @@
+"""Charset detection benchmark: byte-level detector vs. the previous implementation.
+
+Times ``charset.detect_charset`` and ``legacy_detect_charset`` (the
+character-by-character detection that setup, migration and the config flow
+used before) on every fixture and on a synthetic 10k-key payload, encoded as
+UTF-8, ISO-8859-1 and mixed (UTF-8 with ISO-8859-1 bytes in some values).
+
+Usage::
+
+    python -m tests.benchmarks.bench_charset [--output FILE] [--update-baseline]
+"""
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from custom_components.oekofen_pellematic_compact import parse_api_response
+from custom_components.oekofen_pellematic_compact.charset import detect_charset
+
+from . import harness
+from .payload_generator import generate_payload_for_keys
+
+SUITE = "charset"
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
+BASELINE_PATH = Path(__file__).parent / "baselines" / "charset.json"
+
+
+def legacy_detect_charset(raw_data: bytes) -> str:
+    """Detect the charset the way the integration did before (reference)."""
+    try:
+        raw_data.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        decoded_utf8_replace = raw_data.decode('utf-8', errors='replace')
+        replacement_count = decoded_utf8_replace.count('�')
+        non_ascii_count = sum(1 for char in decoded_utf8_replace if ord(char) > 127)
+        if non_ascii_count > 0 and replacement_count / non_ascii_count < 0.2:
+            return 'utf-8'
+        return 'iso-8859-1'
+
+
+def encodings(text: str) -> Dict[str, bytes]:
+    """Return a payload text as UTF-8, ISO-8859-1 and mixed bytes.
+
+    The mixed variant encodes every 16th string value as ISO-8859-1.
+    """
+    parts = text.split('"')
+    mixed = b'"'.join(
+        part.encode("iso-8859-1", "replace") if index % 32 == 1 else part.encode("utf-8")
+        for index, part in enumerate(parts)
+    )
+    return {
+        "utf8": text.encode("utf-8"),
+        "iso": text.encode("iso-8859-1", "replace"),
+        "mixed": mixed,
+    }
+
+
+def payloads() -> Dict[str, bytes]:
+    """Return the benchmark payloads by name."""
+    result: Dict[str, bytes] = {}
+    for path in sorted(FIXTURES_DIR.glob("*.json")):
+        text = json.dumps(parse_api_response(path.read_bytes(), "utf-8"), ensure_ascii=False)
+        for encoding, raw in encodings(text).items():
+            result[f"{path.name}/{encoding}"] = raw
+    payload, _counts = generate_payload_for_keys(10_000, seed=10_000)
+    for encoding, raw in encodings(json.dumps(payload, ensure_ascii=False)).items():
+        result[f"synthetic_10k/{encoding}"] = raw
+    return result
+
+
+def build_cases() -> Iterator[harness.BenchmarkCase]:
+    """Yield (name, callable, extra) cases for both detectors on every payload."""
+    for name, raw in payloads().items():
+        extra = {"bytes": len(raw), "charset": detect_charset(raw).charset}
+        yield f"{name}/detect_charset", lambda raw=raw: detect_charset(raw), extra
+        yield f"{name}/legacy", lambda raw=raw: legacy_detect_charset(raw), extra
+
+
+def speedups(results: List[harness.BenchmarkResult]) -> Dict[str, float]:
+    """Return legacy time / detector time per payload."""
+    by_name = {result.name: result.seconds for result in results}
+    return {
+        name.rsplit("/", 1)[0]: by_name[name.rsplit("/", 1)[0] + "/legacy"] / seconds
+        for name, seconds in by_name.items()
+        if name.endswith("/detect_charset")
+    }
+
+
+def report(results: List[harness.BenchmarkResult]) -> None:
+    """Print the speedup over the previous implementation per payload."""
+    print()
+    print("Speedup of detect_charset over the previous implementation:")
+    for name, factor in speedups(results).items():
+        print(f"  {name:48s} {factor:7.1f}x")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite from the command line."""
+    return harness.main(SUITE, build_cases, BASELINE_PATH, argv, report=report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
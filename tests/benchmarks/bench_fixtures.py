@@ -0,0 +1,99 @@
+"""Benchmarks over every stored controller payload in tests/fixtures.
+
+For each fixture this times the stages a poll goes through:
+
+- ``decode``: bytes to text (``decode_api_response``)
+- ``repair``: JSON repair (``repair_api_json``)
+- ``json_loads``: parsing the repaired text
+- ``discover_all_entities``: entity discovery
+- ``discover_components_from_api``: component counting
+- ``construct_entities``: building every platform entity
+- ``poll_fan_out``: one ``async_refresh_api_data`` dispatch to all entities
+
+Usage::
+
+    python -m tests.benchmarks.bench_fixtures [--output FILE] [--update-baseline]
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from custom_components.oekofen_pellematic_compact import (
+    decode_api_response,
+    discover_components_from_api,
+    repair_api_json,
+)
+from custom_components.oekofen_pellematic_compact.config_flow import detect_charset_from_response
+from custom_components.oekofen_pellematic_compact.dynamic_discovery import discover_all_entities
+
+from . import harness
+from .ha_stubs import (
+    StateWriter,
+    StubHass,
+    async_add_entities_to_hub,
+    attach_writer,
+    build_entities,
+    create_hub,
+)
+
+SUITE = "fixtures"
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
+BASELINE_PATH = Path(__file__).parent / "baselines" / "fixtures.json"
+
+
+def fixture_paths() -> List[Path]:
+    """Return every fixture payload, sorted by name."""
+    return sorted(FIXTURES_DIR.glob("*.json"))
+
+
+def build_cases(loop: Optional[asyncio.AbstractEventLoop] = None) -> Iterator[harness.BenchmarkCase]:
+    """Yield (name, callable) pairs for every fixture and stage."""
+    if loop is None:
+        loop = asyncio.new_event_loop()
+
+    for path in fixture_paths():
+        name = path.name
+        raw = path.read_bytes()
+        charset = detect_charset_from_response(raw)
+        text = decode_api_response(raw, charset)
+        repaired = repair_api_json(text)
+        data = json.loads(repaired, strict=False)
+        discovered = discover_all_entities(data)
+
+        hass = StubHass()
+        hub = create_hub(hass, data, charset=charset)
+        entities = build_entities(hub, data, discovered)
+        attach_writer(entities, StateWriter())
+        loop.run_until_complete(async_add_entities_to_hub(hass, entities))
+
+        async def fetch_noop() -> bool:
+            return True
+
+        hub.fetch_pellematic_data = fetch_noop
+
+        yield f"{name}/decode", lambda raw=raw, charset=charset: decode_api_response(raw, charset)
+        yield f"{name}/repair", lambda text=text: repair_api_json(text)
+        yield f"{name}/json_loads", lambda repaired=repaired: json.loads(repaired, strict=False)
+        yield f"{name}/discover_all_entities", lambda data=data: discover_all_entities(data)
+        yield f"{name}/discover_components_from_api", lambda data=data: discover_components_from_api(data)
+        yield (
+            f"{name}/construct_entities",
+            lambda hub=hub, data=data, discovered=discovered: build_entities(hub, data, discovered),
+        )
+        yield (
+            f"{name}/poll_fan_out",
+            lambda hub=hub: loop.run_until_complete(hub.async_refresh_api_data()),
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite from the command line."""
+    return harness.main(SUITE, build_cases, BASELINE_PATH, argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
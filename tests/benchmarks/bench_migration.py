@@ -0,0 +1,189 @@
+"""Entity migration benchmark: one-pass engine vs. the previous implementation.
+
+Times ``migration.analyze_entities`` plus applying the planned renames
+against ``legacy_migrate_and_check`` (the per-entity loop over every old
+pattern with ``re.match`` and a registry lookup per mixed-case entity,
+followed by a second registry walk for the translated-text warnings) on
+synthetic registries of 1k and 10k entities.
+
+Usage::
+
+    python -m tests.benchmarks.bench_migration [--output FILE] [--update-baseline]
+"""
+from __future__ import annotations
+
+import logging
+import random
+import re
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from custom_components.oekofen_pellematic_compact.migration import (
+    _LOGGER,
+    _apply_migration,
+    _generate_old_entity_id_patterns,
+    analyze_entities,
+)
+
+from . import harness
+
+SUITE = "migration"
+BASELINE_PATH = Path(__file__).parent / "baselines" / "migration.json"
+SIZES = (1_000, 10_000)
+
+
+class StubRegistry:
+    """Entity registry with the lookups the migration uses.
+
+    Renames are recorded, not applied, so every benchmark iteration sees
+    the same registry.
+    """
+
+    def __init__(self, entity_ids: List[str]) -> None:
+        self.entities: Dict[str, SimpleNamespace] = {
+            entity_id: SimpleNamespace(entity_id=entity_id, domain=entity_id.split(".", 1)[0])
+            for entity_id in entity_ids
+        }
+        self.updates: List[Tuple[str, str]] = []
+
+    def async_get(self, entity_id: str) -> Optional[SimpleNamespace]:
+        return self.entities.get(entity_id)
+
+    def async_update_entity(self, entity_id: str, new_entity_id: str) -> None:
+        self.updates.append((entity_id, new_entity_id))
+
+
+def synthetic_entity_ids(count: int, seed: int = 40) -> List[str]:
+    """Return entity IDs of a large registry.
+
+    Mostly new-style IDs, with old-pattern, mixed-case, translated and
+    colliding mixed-case IDs mixed in.
+    """
+    rng = random.Random(seed)
+    entity_ids = []
+    for index in range(count):
+        kind = rng.random()
+        if kind < 0.05:
+            entity_ids.append(f"sensor.plant{index}_heating_circuit_{index % 6 + 1}_temperature")
+        elif kind < 0.08:
+            entity_ids.append(f"climate.plant{index}_heating_circuit_{index % 6 + 1}_climate")
+        elif kind < 0.15:
+            entity_ids.append(f"sensor.plant{index}_pe1_L_temp_act")
+        elif kind < 0.17:
+            entity_ids.append(f"sensor.plant{index}_pe1_l_temp_act")
+            entity_ids.append(f"sensor.plant{index}_pe1_L_Temp_act")
+        elif kind < 0.20:
+            entity_ids.append(f"sensor.plant{index}_kessel_{index}_raumtemperatur")
+        else:
+            entity_ids.append(f"sensor.plant{index}_hk{index % 6 + 1}_l_flowtemp_act")
+    return entity_ids
+
+
+def legacy_migrate_and_check(entity_reg: StubRegistry, entities: List[SimpleNamespace]) -> Tuple[int, List[str]]:
+    """Migrate and check entities the way the integration did before (reference)."""
+    migrated_count = 0
+    patterns = _generate_old_entity_id_patterns()
+    for entity in entities:
+        entity_id = entity.entity_id
+        platform = entity.domain
+        matched_old_pattern = False
+        for pattern_platform, old_pattern, new_prefix in patterns:
+            if platform != pattern_platform:
+                continue
+            match = re.match(old_pattern, entity_id)
+            if not match:
+                continue
+            _LOGGER.info(
+                "Preserving entity_id '%s' for compatibility (matches old pattern)",
+                entity_id
+            )
+            migrated_count += 1
+            matched_old_pattern = True
+            break
+        if not matched_old_pattern and entity_id != entity_id.lower():
+            target_id = entity_id.lower()
+            existing = entity_reg.async_get(target_id)
+            if existing is not None:
+                _LOGGER.warning(
+                    "Cannot rename %s to %s: target already exists, skipping",
+                    entity_id,
+                    target_id,
+                )
+                continue
+            entity_reg.async_update_entity(entity_id, new_entity_id=target_id)
+            _LOGGER.info(
+                "Renamed entity %s → %s (unique_id preserved)",
+                entity_id,
+                target_id,
+            )
+            migrated_count += 1
+
+    warnings = []
+    entities_by_platform: Dict[str, List] = {}
+    for entity in entities:
+        entities_by_platform.setdefault(entity.domain, []).append(entity)
+    for platform, platform_entities in entities_by_platform.items():
+        for entity in platform_entities:
+            entity_id_lower = entity.entity_id.lower()
+            german_indicators = [
+                "kesseltemperatur", "temperatur", "raumtemperatur",
+                "außentemperatur", "betriebsart", "warmwasser"
+            ]
+            french_indicators = [
+                "température", "chauffage"
+            ]
+            for word in german_indicators + french_indicators:
+                if word in entity_id_lower:
+                    warnings.append(
+                        f"Entity {entity.entity_id} contains translated text ('{word}'). "
+                        f"This may cause issues if the system language changes."
+                    )
+                    break
+    return migrated_count, warnings
+
+
+def migrate_and_check(entity_reg: StubRegistry, entities: List[SimpleNamespace]) -> Tuple[int, List[str]]:
+    """Migrate and check entities with the one-pass engine."""
+    analysis = analyze_entities((entity.entity_id for entity in entities), entity_reg.entities)
+    return _apply_migration(entity_reg, analysis), analysis.warnings
+
+
+def build_cases() -> Iterator[harness.BenchmarkCase]:
+    """Yield (name, callable, extra) cases for both implementations per registry size."""
+    for size in SIZES:
+        entity_reg = StubRegistry(synthetic_entity_ids(size))
+        entities = list(entity_reg.entities.values())
+        extra = {"entities": len(entities)}
+        yield f"registry_{size}/engine", lambda r=entity_reg, e=entities: migrate_and_check(r, e), extra
+        yield f"registry_{size}/legacy", lambda r=entity_reg, e=entities: legacy_migrate_and_check(r, e), extra
+
+
+def speedups(results: List[harness.BenchmarkResult]) -> Dict[str, float]:
+    """Return legacy time / engine time per registry size."""
+    by_name = {result.name: result.seconds for result in results}
+    return {
+        name.rsplit("/", 1)[0]: by_name[name.rsplit("/", 1)[0] + "/legacy"] / seconds
+        for name, seconds in by_name.items()
+        if name.endswith("/engine")
+    }
+
+
+def report(results: List[harness.BenchmarkResult]) -> None:
+    """Print the speedup over the previous implementation per registry size."""
+    print()
+    print("Speedup of the migration engine over the previous implementation:")
+    for name, factor in speedups(results).items():
+        print(f"  {name:24s} {factor:7.1f}x")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite from the command line."""
+    # Both implementations log every skipped rename
+    logging.disable(logging.WARNING)
+    return harness.main(SUITE, build_cases, BASELINE_PATH, argv, report=report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
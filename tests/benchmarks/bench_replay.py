@@ -0,0 +1,269 @@
+"""Replay benchmark: a simulated (or recorded) day of polling in seconds.
+
+Without ``--recording`` a day of plant behavior is simulated from a fixture
+and written as a traffic recording first: burner on/off cycles driving boiler
+and flow temperatures, an outdoor temperature following the time of day,
+counters that only grow and occasional mode changes. The recording is then
+replayed through the hub's refresh path with every entity attached, and the
+report shows
+
+- state writes and how many of them actually changed an entity's state
+  (the share of redundant writes a diff engine could drop)
+- CPU time in total and per poll
+- with ``--deadband``, the writes the deadband filter suppressed (its
+  silence time is measured in wall time, so it rarely expires during a
+  fast replay)
+- the replay speed-up relative to the recorded time span
+
+Usage::
+
+    python -m tests.benchmarks.bench_replay [--hours 24] [--interval 30] [--deadband]
+    python -m tests.benchmarks.bench_replay --recording my_plant.rec [--speed 600]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from custom_components.oekofen_pellematic_compact import parse_api_response
+from custom_components.oekofen_pellematic_compact.const import DEFAULT_DEADBAND_MAX_SILENCE
+from custom_components.oekofen_pellematic_compact.deadband import DeadbandFilter
+from custom_components.oekofen_pellematic_compact.replay import (
+    RECORD_RESPONSE,
+    TrafficRecord,
+    TrafficReplay,
+    async_replay,
+    write_recording,
+)
+
+from tests.conftest import load_fixture
+
+from .ha_stubs import (
+    StateWriter,
+    StubHass,
+    async_add_entities_to_hub,
+    attach_writer,
+    build_entities,
+    create_hub,
+)
+
+DEFAULT_FIXTURE = "api_response_greenmode.json"
+DEFAULT_HOURS = 24.0
+DEFAULT_INTERVAL = 30
+# Burner cycle of the simulated boiler in seconds
+BURNER_ON_SECONDS = 40 * 60
+BURNER_OFF_SECONDS = 50 * 60
+# Chance per poll that a mode/option value changes
+OPTION_CHANGE_RATE = 0.002
+COUNTER_UNITS = ("kWh", "h", "kg", "t")
+
+
+@dataclass
+class ReplayReport:
+    """Result of a replay benchmark run."""
+
+    fetches: int
+    recorded_seconds: float
+    wall_seconds: float
+    cpu_seconds: float
+    entities: int
+    state_writes: int
+    state_changes: int
+    suppressed_writes: int = 0
+
+    @property
+    def cpu_per_poll(self) -> float:
+        """Return the CPU time per replayed poll in seconds."""
+        return self.cpu_seconds / self.fetches if self.fetches else 0.0
+
+    @property
+    def redundant_writes(self) -> float:
+        """Return the share of state writes that did not change the state."""
+        if not self.state_writes:
+            return 0.0
+        return 1 - self.state_changes / self.state_writes
+
+    @property
+    def speedup(self) -> float:
+        """Return how many times faster than real time the replay ran."""
+        return self.recorded_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the JSON representation of this report."""
+        result = asdict(self)
+        result.update(
+            cpu_per_poll=self.cpu_per_poll,
+            redundant_writes=self.redundant_writes,
+            speedup=self.speedup,
+        )
+        return result
+
+
+def _numeric_fields(payload: Dict[str, Any]) -> Iterator[tuple]:
+    """Yield (component, key, field) for every numeric metadata field."""
+    for component, values in payload.items():
+        if not isinstance(values, dict):
+            continue
+        for key, field in values.items():
+            if isinstance(field, dict) and "val" in field:
+                try:
+                    float(field["val"])
+                except (TypeError, ValueError):
+                    continue
+                yield component, key, field
+
+
+def simulate_day(
+    fixture: str = DEFAULT_FIXTURE,
+    hours: float = DEFAULT_HOURS,
+    interval: int = DEFAULT_INTERVAL,
+    seed: int = 0,
+    start: float = 1_700_000_000.0,
+) -> Iterator[TrafficRecord]:
+    """Simulate the controller responses of a plant.
+
+    Args:
+        fixture: Fixture used as the plant's key set and starting values
+        hours: Simulated time span
+        interval: Poll interval in seconds
+        seed: Random seed
+        start: Timestamp of the first poll
+
+    Yields:
+        Response records in poll order
+    """
+    rng = random.Random(seed)
+    payload = copy.deepcopy(load_fixture(fixture))
+    fields = list(_numeric_fields(payload))
+    initial = {(component, key): float(field["val"]) for component, key, field in fields}
+    phases = {(component, key): rng.uniform(0, 2 * math.pi) for component, key, _ in fields}
+    cycle = BURNER_ON_SECONDS + BURNER_OFF_SECONDS
+
+    for step in range(int(hours * 3600 / interval)):
+        elapsed = step * interval
+        burner_on = elapsed % cycle < BURNER_ON_SECONDS
+        day_phase = 2 * math.pi * elapsed / 86400
+
+        for component, key, field in fields:
+            base = initial[(component, key)]
+            factor = field.get("factor") or 1
+            format_str = field.get("format")
+            if isinstance(format_str, str) and "|" in format_str:
+                if rng.random() < OPTION_CHANGE_RATE:
+                    field["val"] = rng.choice(format_str.split("|")).split(":", 1)[0]
+                continue
+
+            unit = field.get("unit")
+            if component.startswith("pe") and key in ("L_state", "L_modulation"):
+                value = (base or 1) if burner_on else 0
+            elif unit in COUNTER_UNITS:
+                value = base + (elapsed // 3600 if burner_on or unit != "h" else 0)
+            elif unit == "°C":
+                if key == "L_ambient":
+                    swing = 6 * math.sin(day_phase - math.pi / 2)
+                elif component.startswith(("pe", "hk")) and "act" in key:
+                    swing = 8 if burner_on else -4
+                else:
+                    swing = 1.5 * math.sin(day_phase * 4 + phases[(component, key)])
+                value = base + round(swing / factor)
+            else:
+                continue
+
+            field["val"] = str(int(value)) if isinstance(field["val"], str) else int(value)
+
+        yield TrafficRecord(
+            RECORD_RESPONSE,
+            start + elapsed,
+            json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+        )
+
+
+async def async_run_replay(
+    replay: TrafficReplay,
+    charset: str = "utf-8",
+    speed: Optional[float] = None,
+    deadband: Optional[DeadbandFilter] = None,
+) -> ReplayReport:
+    """Replay a recording through a hub with every entity attached."""
+    first = next(record for record in replay.fetches if record.kind == RECORD_RESPONSE)
+    hass = StubHass()
+    hub = create_hub(hass, charset=charset, deadband=deadband)
+    entities = build_entities(hub, parse_api_response(first.payload, charset))
+    writer = StateWriter()
+    attach_writer(entities, writer)
+    await async_add_entities_to_hub(hass, entities)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    fetches = await async_replay(hub, replay, speed=speed)
+    cpu_seconds = time.process_time() - cpu_start
+    wall_seconds = time.perf_counter() - wall_start
+
+    return ReplayReport(
+        fetches=fetches,
+        recorded_seconds=replay.duration,
+        wall_seconds=wall_seconds,
+        cpu_seconds=cpu_seconds,
+        entities=len(entities),
+        state_writes=writer.writes,
+        state_changes=writer.changes,
+        suppressed_writes=0 if deadband is None else deadband.suppressed,
+    )
+
+
+def print_report(report: ReplayReport) -> None:
+    """Print a replay report."""
+    print(f"replayed polls:         {report.fetches}")
+    print(f"recorded span:          {report.recorded_seconds / 3600:.1f} h")
+    print(f"wall time:              {report.wall_seconds:.2f} s ({report.speedup:.0f}x real time)")
+    print(f"CPU time:               {report.cpu_seconds:.2f} s ({report.cpu_per_poll * 1e3:.2f} ms per poll)")
+    print(f"entities:               {report.entities}")
+    print(f"state writes:           {report.state_writes}")
+    print(f"state changes:          {report.state_changes}")
+    print(f"redundant writes:       {report.redundant_writes:.1%}")
+    if report.suppressed_writes:
+        print(f"deadband suppressed:    {report.suppressed_writes}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the replay benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Replay controller traffic through the hub.")
+    parser.add_argument("--recording", type=Path, help="Recording to replay (default: simulate a day)")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="Fixture used for the simulation")
+    parser.add_argument("--hours", type=float, default=DEFAULT_HOURS, help="Simulated hours")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL, help="Simulated poll interval")
+    parser.add_argument("--charset", default="utf-8", help="Charset of the recorded responses")
+    parser.add_argument("--speed", type=float, help="Playback speed factor (default: as fast as possible)")
+    parser.add_argument("--output", type=Path, help="Write the report to this JSON file")
+    parser.add_argument("--deadband", action="store_true", help="Replay with the deadband filter enabled")
+    args = parser.parse_args(argv)
+
+    if args.recording:
+        replay = TrafficReplay.from_file(str(args.recording))
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / "simulated.rec")
+            write_recording(path, simulate_day(args.fixture, args.hours, args.interval))
+            print(f"Simulated recording: {Path(path).stat().st_size / 1024:.0f} KiB")
+            replay = TrafficReplay.from_file(path)
+
+    deadband = DeadbandFilter(DEFAULT_DEADBAND_MAX_SILENCE) if args.deadband else None
+    report = asyncio.run(async_run_replay(replay, args.charset, args.speed, deadband))
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report.as_dict(), indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
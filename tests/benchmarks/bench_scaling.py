@@ -0,0 +1,113 @@
+"""Scaling benchmarks on synthetic large-plant payloads.
+
+Generates payloads of roughly 1k, 5k and 10k keys with
+``payload_generator.generate_payload_for_keys`` and times parsing, entity
+discovery, component discovery and one poll fan-out at each size. The
+report prints the cost per key relative to the smallest size; a factor
+well above 1.0 shows where the cost stops growing linearly.
+
+Usage::
+
+    python -m tests.benchmarks.bench_scaling [--output FILE] [--update-baseline]
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from custom_components.oekofen_pellematic_compact import (
+    discover_components_from_api,
+    parse_api_response,
+)
+from custom_components.oekofen_pellematic_compact.dynamic_discovery import discover_all_entities
+
+from . import harness
+from .ha_stubs import (
+    StateWriter,
+    StubHass,
+    async_add_entities_to_hub,
+    attach_writer,
+    build_entities,
+    create_hub,
+)
+from .payload_generator import count_keys, generate_payload_for_keys
+
+SUITE = "scaling"
+SIZES = (1_000, 5_000, 10_000)
+STAGES = ("parse", "discover_all_entities", "discover_components_from_api", "poll_fan_out")
+BASELINE_PATH = Path(__file__).parent / "baselines" / "scaling.json"
+
+
+def build_cases(
+    sizes: Sequence[int] = SIZES,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> Iterator[harness.BenchmarkCase]:
+    """Yield (name, callable, extra) cases for every payload size and stage."""
+    if loop is None:
+        loop = asyncio.new_event_loop()
+
+    for size in sizes:
+        payload, counts = generate_payload_for_keys(size, seed=size)
+        raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        keys = count_keys(payload)
+        extra = {"keys": keys, "components": {family: n for family, n in counts.items() if n}}
+
+        hass = StubHass()
+        hub = create_hub(hass, payload, charset="utf-8")
+        entities = build_entities(hub, payload)
+        attach_writer(entities, StateWriter())
+        loop.run_until_complete(async_add_entities_to_hub(hass, entities))
+
+        async def fetch_noop() -> bool:
+            return True
+
+        hub.fetch_pellematic_data = fetch_noop
+        entity_extra = dict(extra, entities=len(entities))
+
+        yield f"{size}/parse", lambda raw=raw: parse_api_response(raw, "utf-8"), extra
+        yield f"{size}/discover_all_entities", lambda data=payload: discover_all_entities(data), extra
+        yield (
+            f"{size}/discover_components_from_api",
+            lambda data=payload: discover_components_from_api(data),
+            extra,
+        )
+        yield (
+            f"{size}/poll_fan_out",
+            lambda hub=hub: loop.run_until_complete(hub.async_refresh_api_data()),
+            entity_extra,
+        )
+
+
+def per_key_growth(results: List[harness.BenchmarkResult]) -> Dict[str, Dict[int, float]]:
+    """Return, per stage, the cost per key at each size relative to the smallest size."""
+    per_key: Dict[str, Dict[int, float]] = {}
+    for result in results:
+        size, stage = result.name.split("/", 1)
+        per_key.setdefault(stage, {})[int(size)] = result.seconds / result.extra["keys"]
+
+    growth = {}
+    for stage, by_size in per_key.items():
+        smallest = by_size[min(by_size)]
+        growth[stage] = {size: cost / smallest for size, cost in sorted(by_size.items())}
+    return growth
+
+
+def report(results: List[harness.BenchmarkResult]) -> None:
+    """Print per-key cost growth for every stage."""
+    print()
+    print("Per-key cost relative to the smallest payload (1.00 = linear):")
+    for stage, by_size in per_key_growth(results).items():
+        factors = "  ".join(f"{size:>6}: {factor:5.2f}" for size, factor in by_size.items())
+        print(f"  {stage:32s} {factors}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite from the command line."""
+    return harness.main(SUITE, build_cases, BASELINE_PATH, argv, report=report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
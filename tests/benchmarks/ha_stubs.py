@@ -0,0 +1,167 @@
+"""Lightweight Home Assistant stand-ins for benchmarks and harnesses.
+
+These stubs replace only what the hub and the entities touch while polling:
+the executor, interval timers and ``async_write_ha_state``. Writing a state
+reads the entity's ``state`` and ``extra_state_attributes`` like Home
+Assistant does, so the cost of computing states is part of the measurement.
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest.mock import patch
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact import scheduler
+from custom_components.oekofen_pellematic_compact.climate import PellematicClimate
+from custom_components.oekofen_pellematic_compact.dynamic_discovery import discover_all_entities
+from custom_components.oekofen_pellematic_compact.number import PellematicNumber
+from custom_components.oekofen_pellematic_compact.select import PellematicSelect
+from custom_components.oekofen_pellematic_compact.sensor import (
+    PellematicBinarySensor,
+    PellematicSensor,
+)
+
+HUB_NAME = "Pellematic"
+DEVICE_INFO: Dict[str, Any] = {}
+
+
+class StubTimer:
+    """An interval timer registered through async_track_time_interval."""
+
+    def __init__(self, hass: "StubHass", action: Callable, interval: Any, one_shot: bool = False) -> None:
+        self._hass = hass
+        self.action = action
+        self.interval = interval
+        self.one_shot = one_shot
+        self.cancelled = False
+
+    async def fire(self, now: Any = None) -> None:
+        """Run the timer's action like Home Assistant does when it is due."""
+        if self.one_shot and self in self._hass.timers:
+            self._hass.timers.remove(self)
+        result = self.action(now)
+        if asyncio.iscoroutine(result):
+            await result
+
+    def cancel(self) -> None:
+        """Cancel the timer (the unsubscribe callback handed to callers)."""
+        self.cancelled = True
+        if self in self._hass.timers:
+            self._hass.timers.remove(self)
+
+
+class StubHass:
+    """Minimal HomeAssistant replacement."""
+
+    def __init__(self) -> None:
+        self.data: Dict[str, Any] = {}
+        self.timers: List[StubTimer] = []
+
+    async def async_add_executor_job(self, target: Callable, *args: Any) -> Any:
+        """Run a blocking job in the default executor."""
+        return await asyncio.get_running_loop().run_in_executor(None, target, *args)
+
+    def track_time_interval(self, hass: Any, action: Callable, interval: Any) -> Callable[[], None]:
+        """Stand-in for homeassistant.helpers.event.async_track_time_interval."""
+        timer = StubTimer(self, action, interval)
+        self.timers.append(timer)
+        return timer.cancel
+
+    def call_later(self, hass: Any, delay: float, action: Callable) -> Callable[[], None]:
+        """Stand-in for homeassistant.helpers.event.async_call_later.
+
+        The timer's ``interval`` is the delay; it is never fired on its own.
+        """
+        timer = StubTimer(self, action, delay, one_shot=True)
+        self.timers.append(timer)
+        return timer.cancel
+
+
+@contextmanager
+def patch_time_tracking(hass: StubHass) -> Iterator[StubHass]:
+    """Route the integration's timers (including the poll scheduler's) to the stub hass."""
+    with patch.object(pellematic, "async_track_time_interval", hass.track_time_interval), patch.object(
+        scheduler, "async_track_time_interval", hass.track_time_interval
+    ), patch.object(scheduler, "async_call_later", hass.call_later):
+        yield hass
+
+
+class StateWriter:
+    """Records the states written by entities."""
+
+    def __init__(self) -> None:
+        self.writes = 0
+        self.changes = 0
+        self.states: Dict[int, Any] = {}
+
+    def write(self, entity: Any) -> None:
+        """Emulate async_write_ha_state by reading the entity's state."""
+        state = entity.state
+        attributes = entity.extra_state_attributes
+        self.writes += 1
+        key = id(entity)
+        snapshot = (state, attributes)
+        if self.states.get(key, _MISSING) != snapshot:
+            self.changes += 1
+            self.states[key] = snapshot
+
+
+_MISSING = object()
+
+
+def attach_writer(entities: List[Any], writer: StateWriter) -> None:
+    """Replace async_write_ha_state on every entity with the state writer."""
+    for entity in entities:
+        entity.async_write_ha_state = lambda entity=entity: writer.write(entity)
+
+
+def build_entities(
+    hub: Any,
+    data: Dict[str, Any],
+    discovered: Optional[Dict[str, Any]] = None,
+) -> List[Any]:
+    """Construct every entity the platforms would create for a payload."""
+    if discovered is None:
+        discovered = discover_all_entities(data)
+
+    entities: List[Any] = []
+    for definition in discovered["sensors"]:
+        entities.append(PellematicSensor(HUB_NAME, hub, DEVICE_INFO, definition))
+    for definition in discovered["binary_sensors"]:
+        entities.append(PellematicBinarySensor(HUB_NAME, hub, DEVICE_INFO, definition))
+    for definition in discovered["selects"]:
+        entities.append(PellematicSelect(HUB_NAME, hub, DEVICE_INFO, definition))
+    for definition in discovered["numbers"]:
+        entities.append(PellematicNumber(HUB_NAME, hub, DEVICE_INFO, definition))
+    for component in data:
+        if component.startswith("hk") and component[2:].isdigit():
+            entities.append(
+                PellematicClimate(HUB_NAME, hub, DEVICE_INFO, component, int(component[2:]))
+            )
+    return entities
+
+
+def create_hub(hass: StubHass, data: Optional[Dict[str, Any]] = None, **kwargs: Any) -> "pellematic.PellematicHub":
+    """Create a hub whose data is already populated."""
+    kwargs.setdefault("scan_interval", 30)
+    kwargs.setdefault("host", "http://127.0.0.1:4321/pellematic/all")
+    hub = pellematic.PellematicHub(hass, HUB_NAME, **kwargs)
+    if data is not None:
+        hub.data = data
+    return hub
+
+
+async def async_add_entities_to_hub(hass: StubHass, entities: List[Any]) -> None:
+    """Run async_added_to_hass for every entity so they subscribe to the hub."""
+    with patch_time_tracking(hass):
+        for entity in entities:
+            await entity.async_added_to_hass()
+
+
+async def async_remove_entities_from_hub(hass: StubHass, entities: List[Any]) -> None:
+    """Run async_will_remove_from_hass for every entity."""
+    with patch_time_tracking(hass):
+        for entity in entities:
+            await entity.async_will_remove_from_hass()
@@ -0,0 +1,311 @@
+"""Timing, result serialization and baseline comparison for benchmarks.
+
+Every suite produces a JSON document of the form::
+
+    {
+      "suite": "fixtures",
+      "python": "3.11.7",
+      "platform": "Linux-...",
+      "calibration_seconds": 0.0012,
+      "results": {
+        "api_response_basic.json/json_loads": {
+          "seconds": 1.2e-05,
+          "normalized": 0.01,
+          "iterations": 512
+        }
+      }
+    }
+
+``seconds`` is the best observed time per call. ``normalized`` divides it by
+the time of a fixed calibration workload measured in the same run, so that
+results recorded on one machine can be compared against a baseline recorded
+on another. Regressions are detected on the normalized value.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+DEFAULT_REPEAT = 7
+DEFAULT_MIN_TIME = 0.01
+# A benchmark is flagged when it is this many times slower than its baseline
+DEFAULT_THRESHOLD = 2.0
+# Measurements below this per-call time are dominated by timer noise and are
+# never reported as regressions
+NOISE_FLOOR_SECONDS = 5e-6
+
+# (name, callable) or (name, callable, extra fields stored with the result)
+BenchmarkCase = Union[Tuple[str, Callable[[], Any]], Tuple[str, Callable[[], Any], Dict[str, Any]]]
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing result of a single benchmark case."""
+
+    name: str
+    seconds: float
+    normalized: float
+    iterations: int
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the JSON representation of this result."""
+        result = {
+            "seconds": self.seconds,
+            "normalized": self.normalized,
+            "iterations": self.iterations,
+        }
+        result.update(self.extra)
+        return result
+
+
+@dataclass
+class Regression:
+    """A benchmark that got slower than its baseline allows."""
+
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """Return how many times slower the current run is."""
+        return self.current / self.baseline
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.ratio:.2f}x slower than baseline"
+
+
+def _calibration_workload() -> None:
+    """Fixed mix of dict, string and JSON work similar to the integration's hot paths."""
+    data = {f"key_{i}": {"val": str(i), "unit": "°C", "factor": "0.1"} for i in range(200)}
+    text = json.dumps(data)
+    parsed = json.loads(text)
+    total = 0.0
+    for key, value in parsed.items():
+        if key.startswith("key_") and value["unit"] == "°C":
+            total += float(value["val"]) * float(value["factor"])
+
+
+def time_call(
+    func: Callable[[], Any],
+    repeat: int = DEFAULT_REPEAT,
+    min_time: float = DEFAULT_MIN_TIME,
+) -> Tuple[float, int]:
+    """Time a callable.
+
+    The number of calls per measurement is doubled until one measurement
+    takes at least ``min_time``, then ``repeat`` measurements are taken.
+
+    Args:
+        func: Callable to time
+        repeat: Number of measurements
+        min_time: Minimum duration of a single measurement in seconds
+
+    Returns:
+        Tuple of (best seconds per call, calls per measurement)
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time or number >= 1 << 20:
+                break
+            number *= 2
+
+        best = elapsed
+        for _ in range(repeat - 1):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return best / number, number
+
+
+def calibrate(repeat: int = DEFAULT_REPEAT, min_time: float = DEFAULT_MIN_TIME) -> float:
+    """Return the per-call time of the calibration workload on this machine."""
+    seconds, _ = time_call(_calibration_workload, repeat=repeat, min_time=min_time)
+    return seconds
+
+
+def run_cases(
+    cases: Iterable[BenchmarkCase],
+    repeat: int = DEFAULT_REPEAT,
+    min_time: float = DEFAULT_MIN_TIME,
+    name_filter: Optional[str] = None,
+    calibration: Optional[float] = None,
+) -> Tuple[float, List[BenchmarkResult]]:
+    """Run benchmark cases.
+
+    Args:
+        cases: Iterable of (name, callable[, extra]) tuples
+        repeat: Number of measurements per case
+        min_time: Minimum duration of a single measurement in seconds
+        name_filter: Only run cases whose name contains this substring
+        calibration: Calibration time to normalize against (measured if None)
+
+    Returns:
+        Tuple of (calibration seconds, list of results)
+    """
+    if calibration is None:
+        calibration = calibrate(repeat=repeat, min_time=min_time)
+
+    results = []
+    for case in cases:
+        name, func = case[0], case[1]
+        extra = case[2] if len(case) > 2 else {}
+        if name_filter and name_filter not in name:
+            continue
+        seconds, iterations = time_call(func, repeat=repeat, min_time=min_time)
+        results.append(
+            BenchmarkResult(
+                name=name,
+                seconds=seconds,
+                normalized=seconds / calibration,
+                iterations=iterations,
+                extra=dict(extra),
+            )
+        )
+    return calibration, results
+
+
+def results_to_document(
+    suite: str,
+    calibration: float,
+    results: Iterable[BenchmarkResult],
+) -> Dict[str, Any]:
+    """Build the machine-readable result document for a suite run."""
+    return {
+        "suite": suite,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "calibration_seconds": calibration,
+        "results": {result.name: result.as_dict() for result in results},
+    }
+
+
+def write_document(path: Path, document: Dict[str, Any]) -> None:
+    """Write a result document as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_document(path: Path) -> Dict[str, Any]:
+    """Load a result document (e.g. a stored baseline)."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_to_baseline(
+    document: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Regression]:
+    """Compare a result document against a baseline document.
+
+    Cases that are missing from either document are ignored so that adding
+    or removing fixtures does not break the comparison.
+
+    Args:
+        document: Current result document
+        baseline: Baseline result document
+        threshold: Maximum allowed ratio of current to baseline normalized time
+
+    Returns:
+        List of regressions, slowest first
+    """
+    regressions = []
+    baseline_results = baseline.get("results", {})
+    for name, current in document.get("results", {}).items():
+        reference = baseline_results.get(name)
+        if reference is None:
+            continue
+        if current["seconds"] < NOISE_FLOOR_SECONDS:
+            continue
+        if reference["normalized"] <= 0:
+            continue
+        if current["normalized"] > reference["normalized"] * threshold:
+            regressions.append(
+                Regression(name, reference["normalized"], current["normalized"])
+            )
+    regressions.sort(key=lambda regression: regression.ratio, reverse=True)
+    return regressions
+
+
+def main(
+    suite: str,
+    build_cases: Callable[[], Iterable[BenchmarkCase]],
+    default_baseline: Path,
+    argv: Optional[List[str]] = None,
+    report: Optional[Callable[[List[BenchmarkResult]], None]] = None,
+) -> int:
+    """Command line entry point shared by all suites.
+
+    Args:
+        suite: Suite name stored in the result document
+        build_cases: Callable returning the suite's cases
+        default_baseline: Baseline file used unless --baseline is given
+        argv: Command line arguments (defaults to sys.argv)
+        report: Optional callable printing a suite-specific summary
+
+    Returns:
+        Process exit code (1 if regressions were found)
+    """
+    parser = argparse.ArgumentParser(description=f"Run the '{suite}' benchmark suite.")
+    parser.add_argument("--output", type=Path, help="Write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, default=default_baseline, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown ratio")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Measurements per case")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="Minimum seconds per measurement")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    args = parser.parse_args(argv)
+
+    calibration, results = run_cases(
+        build_cases(),
+        repeat=args.repeat,
+        min_time=args.min_time,
+        name_filter=args.filter,
+    )
+    document = results_to_document(suite, calibration, results)
+
+    for result in results:
+        print(f"{result.name:70s} {result.seconds * 1e6:12.1f} us  ({result.iterations} calls)")
+    if report is not None:
+        report(results)
+
+    if args.output:
+        write_document(args.output, document)
+
+    if args.update_baseline:
+        write_document(args.baseline, document)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline or not Path(args.baseline).exists():
+        print("No baseline found, skipping regression check")
+        return 0
+
+    regressions = compare_to_baseline(document, load_document(args.baseline), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
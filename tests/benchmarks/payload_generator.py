@@ -0,0 +1,224 @@
+"""Synthetic controller payloads for large plants.
+
+Component key sets are copied from the richest instance of each component
+family found in tests/fixtures (e.g. the ``pe1`` with the most keys), so the
+generated payloads look like real firmware output. Values are randomized
+within the metadata's bounds and format options; a configurable share of
+numeric values is replaced by the controller's sentinel values, and string
+values (schedules, state texts, names) are kept.
+
+Example::
+
+    payload = generate_payload({"hk": 12, "pu": 3, "pe": 4, "wireless": 24}, seed=1)
+    payload = generate_payload_for_keys(10_000, seed=1)
+"""
+from __future__ import annotations
+
+import copy
+import random
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from tests.conftest import load_fixture
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
+
+# Components that exist once per controller
+SINGLETON_FAMILIES = ("system", "weather", "forecast", "power")
+# Numbered component families, in the order they appear in real payloads
+NUMBERED_FAMILIES = ("hk", "thirdparty", "pu", "ww", "sk", "se", "circ", "wp", "wp_data", "pe", "wireless")
+
+# Relative component counts of a large plant, used to reach a target key count
+LARGE_PLANT_MIX = {
+    "hk": 6,
+    "pu": 3,
+    "ww": 2,
+    "pe": 3,
+    "sk": 2,
+    "se": 2,
+    "circ": 1,
+    "wireless": 12,
+}
+
+SENTINEL_VALUES = (32767, 32765, -32768)
+
+# No fixture contains wireless sensors; this template follows the key names
+# the integration special-cases (L_wireless_name, L_wireless_id).
+WIRELESS_TEMPLATE: Dict[str, Any] = {
+    "wireless_info": "wireless sensor data",
+    "L_wireless_name": {"val": "Raumfühler", "text": "Name"},
+    "L_wireless_id": {"val": "0x1A2B3C", "text": "ID"},
+    "L_temp": {"val": 215, "unit": "°C", "factor": 0.1, "min": -32768, "max": 32767, "text": "Temperatur"},
+    "L_humidity": {"val": 48, "unit": "%", "factor": 1, "min": 0, "max": 100, "text": "Luftfeuchte"},
+    "L_battery": {"val": 87, "unit": "%", "factor": 1, "min": 0, "max": 100, "text": "Batterie"},
+    "L_signal": {"val": 3, "format": "0:Kein|1:Schwach|2:Mittel|3:Gut", "text": "Signal"},
+}
+
+
+def _family(component: str) -> Optional[str]:
+    """Return the family of a component key ("hk1" -> "hk", "system" -> "system")."""
+    if component in SINGLETON_FAMILIES:
+        return component
+    base = component.rstrip("0123456789")
+    if base != component and base in NUMBERED_FAMILIES:
+        return base
+    return None
+
+
+def _has_metadata(component_data: Any) -> bool:
+    """Return True if a component uses the metadata format."""
+    return isinstance(component_data, dict) and any(
+        isinstance(value, dict) and "val" in value for value in component_data.values()
+    )
+
+
+@lru_cache(maxsize=1)
+def component_templates() -> Dict[str, Dict[str, Any]]:
+    """Return the richest metadata instance of every family across all fixtures."""
+    templates: Dict[str, Dict[str, Any]] = {"wireless": WIRELESS_TEMPLATE}
+    for path in sorted(FIXTURES_DIR.glob("*.json")):
+        payload = load_fixture(path.name)
+        for component, component_data in payload.items():
+            family = _family(component)
+            if family is None or not _has_metadata(component_data):
+                continue
+            if len(component_data) > len(templates.get(family, {})):
+                templates[family] = component_data
+    return templates
+
+
+def _format_values(format_str: str) -> list:
+    """Return the raw values of a 'value:label|...' format string."""
+    values = []
+    for part in format_str.split("|"):
+        value = part.split(":", 1)[0].strip()
+        try:
+            values.append(int(value))
+        except ValueError:
+            values.append(value)
+    return values
+
+
+def _randomize_field(field: Any, rng: random.Random, sentinel_rate: float) -> Any:
+    """Return a copy of a metadata field with a plausible random value."""
+    if not isinstance(field, dict) or "val" not in field:
+        return copy.deepcopy(field)
+
+    result = dict(field)
+    value = field["val"]
+    format_str = field.get("format")
+
+    if isinstance(format_str, str) and "|" in format_str:
+        result["val"] = rng.choice(_format_values(format_str))
+        return result
+
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return result
+    try:
+        number = int(float(value))
+    except (TypeError, ValueError):
+        # Strings such as schedules ("07:00-10:00") or names stay as they are
+        return result
+
+    low = field.get("min")
+    high = field.get("max")
+    wide_range = isinstance(low, (int, float)) and isinstance(high, (int, float)) and high - low > 1000
+    if wide_range and rng.random() < sentinel_rate:
+        new_value = rng.choice(SENTINEL_VALUES)
+    else:
+        spread = max(5, abs(number) // 10)
+        new_value = number + rng.randint(-spread, spread)
+        if isinstance(low, (int, float)) and isinstance(high, (int, float)):
+            new_value = max(int(low), min(int(high), new_value))
+        elif number >= 0:
+            new_value = max(0, new_value)
+
+    result["val"] = str(new_value) if isinstance(value, str) else new_value
+    return result
+
+
+def generate_component(
+    family: str,
+    rng: random.Random,
+    sentinel_rate: float = 0.02,
+) -> Dict[str, Any]:
+    """Generate one component of a family with randomized values."""
+    template = component_templates()[family]
+    return {key: _randomize_field(field, rng, sentinel_rate) for key, field in template.items()}
+
+
+def generate_payload(
+    counts: Dict[str, int],
+    seed: int = 0,
+    sentinel_rate: float = 0.02,
+    with_metadata: bool = True,
+) -> Dict[str, Any]:
+    """Generate a controller payload with the given component counts.
+
+    Args:
+        counts: Number of instances per numbered family, e.g. {"hk": 8, "pe": 2}
+        seed: Random seed; equal seeds produce equal payloads
+        sentinel_rate: Share of wide-range numeric values replaced by sentinels
+        with_metadata: False returns the old-firmware plain-value format
+
+    Returns:
+        Payload dict as returned by the controller's JSON API
+    """
+    unknown = set(counts) - set(NUMBERED_FAMILIES)
+    if unknown:
+        raise ValueError(f"Unknown component families: {sorted(unknown)}")
+
+    rng = random.Random(seed)
+    templates = component_templates()
+    payload: Dict[str, Any] = {}
+    for family in SINGLETON_FAMILIES:
+        if family in templates:
+            payload[family] = generate_component(family, rng, sentinel_rate)
+    for family in NUMBERED_FAMILIES:
+        for index in range(1, counts.get(family, 0) + 1):
+            payload[f"{family}{index}"] = generate_component(family, rng, sentinel_rate)
+    payload["error"] = {}
+
+    if not with_metadata:
+        payload = {
+            component: {
+                key: field.get("val") if isinstance(field, dict) and "val" in field else field
+                for key, field in component_data.items()
+            }
+            for component, component_data in payload.items()
+        }
+    return payload
+
+
+def count_keys(payload: Dict[str, Any]) -> int:
+    """Return the number of value keys in a payload."""
+    return sum(len(values) for values in payload.values() if isinstance(values, dict))
+
+
+def generate_payload_for_keys(
+    target_keys: int,
+    seed: int = 0,
+    mix: Optional[Dict[str, int]] = None,
+    sentinel_rate: float = 0.02,
+) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """Generate a payload with at least ``target_keys`` keys.
+
+    Component counts grow in the proportions of ``mix`` (a large plant by
+    default) until the key count is reached.
+
+    Returns:
+        Tuple of (payload, component counts used)
+    """
+    mix = mix or LARGE_PLANT_MIX
+    templates = component_templates()
+    keys = sum(len(templates[family]) for family in SINGLETON_FAMILIES if family in templates)
+    counts = {family: 0 for family in mix}
+    while keys < target_keys:
+        for family, weight in mix.items():
+            for _ in range(weight):
+                if keys >= target_keys:
+                    break
+                counts[family] += 1
+                keys += len(templates[family])
+    return generate_payload(counts, seed=seed, sentinel_rate=sentinel_rate), counts
@@ -0,0 +1,334 @@
+"""Soak harness for memory growth and callback leaks.
+
+Runs many setup/poll/unload cycles of the integration against the local
+mock controller:
+
+- every cycle sets the entry up through the real platform ``async_setup_entry``
+  functions, runs the hub's scheduled poll ``polls_per_cycle`` times and
+  unloads the entry through the real ``async_unload_entry``
+- a controller outage is injected halfway through the polls of every cycle
+- every ``outage_setup_every`` cycles the entry is set up while the controller
+  is down, so the platforms install their retry timers; the outage then ends
+  and the retry timers are fired until the entities appear
+- every ``offline_reload_every`` cycles the controller stays down for the
+  whole cycle and the entry is unloaded while the retry timers are pending
+  (a reload while the controller is offline)
+- every ``rediscover_every`` cycles components are rediscovered before the
+  reload, like the ``rediscover_components`` service does
+
+After every unload the harness collects garbage and records the heap retained
+by the integration (tracemalloc), the callbacks still registered on the
+unloaded hub, the timers still scheduled and the hubs still alive. The run fails if any
+hub keeps callbacks or timers after its unload, if unloaded hubs stay alive,
+or if the retained heap grows by more than ``max_growth_bytes`` after warmup.
+
+Usage::
+
+    python -m tests.benchmarks.soak [--cycles 20] [--polls 200]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import logging
+import sys
+import tracemalloc
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact import climate, number, select, sensor
+from custom_components.oekofen_pellematic_compact.const import DATA_IO_EXECUTOR, DOMAIN
+from custom_components.oekofen_pellematic_compact.scheduler import async_get_poll_scheduler
+
+from tests.mock_controller import OUTAGE_ERROR, MockController
+
+from .ha_stubs import HUB_NAME, StateWriter, StubHass, attach_writer, patch_time_tracking
+
+PLATFORM_MODULES = {
+    "sensor": sensor,
+    "select": select,
+    "number": number,
+    "climate": climate,
+}
+
+# Only allocations made by these files count as retained heap; the harness,
+# the mock controller and the event loop allocate on their own
+TRACED_FILES = (
+    "*/custom_components/oekofen_pellematic_compact/*",
+    "*/tests/benchmarks/ha_stubs.py",
+)
+
+
+@dataclass
+class SoakConfig:
+    """Parameters of a soak run."""
+
+    fixture: str = "api_response_basic.json"
+    cycles: int = 20
+    polls_per_cycle: int = 200
+    outage_setup_every: int = 4
+    offline_reload_every: int = 6
+    rediscover_every: int = 5
+    warmup_cycles: int = 2
+    max_growth_bytes: int = 256 * 1024
+
+
+@dataclass
+class SoakSample:
+    """State recorded after one cycle's unload."""
+
+    cycle: int
+    retained_bytes: int
+    entities: int
+    leftover_callbacks: int
+    leftover_timers: int
+    live_hubs: int
+
+
+@dataclass
+class SoakReport:
+    """Result of a soak run."""
+
+    config: SoakConfig
+    samples: List[SoakSample] = field(default_factory=list)
+    polls: int = 0
+    failed_polls: int = 0
+    retries: int = 0
+    top_growth: List[str] = field(default_factory=list)
+
+    @property
+    def heap_growth(self) -> int:
+        """Return the retained heap growth after warmup in bytes."""
+        steady = self.samples[self.config.warmup_cycles:]
+        if len(steady) < 2:
+            return 0
+        return steady[-1].retained_bytes - min(sample.retained_bytes for sample in steady)
+
+    @property
+    def problems(self) -> List[str]:
+        """Return a description of every leak found."""
+        problems = []
+        for sample in self.samples:
+            if sample.leftover_callbacks:
+                problems.append(f"cycle {sample.cycle}: {sample.leftover_callbacks} callbacks left on the hub")
+            if sample.leftover_timers:
+                problems.append(f"cycle {sample.cycle}: {sample.leftover_timers} timers left after unload")
+            if sample.live_hubs:
+                problems.append(f"cycle {sample.cycle}: {sample.live_hubs} unloaded hubs still alive")
+        if self.heap_growth > self.config.max_growth_bytes:
+            problems.append(
+                f"retained heap grew by {self.heap_growth} bytes after warmup "
+                f"(limit {self.config.max_growth_bytes})"
+            )
+        return problems
+
+    @property
+    def ok(self) -> bool:
+        """Return True if no leak was found."""
+        return not self.problems
+
+
+class StubConfigEntries:
+    """The part of hass.config_entries that async_unload_entry uses."""
+
+    def __init__(self) -> None:
+        self.platform_entities: Dict[str, List[Any]] = {}
+
+    async def async_forward_entry_unload(self, entry: Any, platform: str) -> bool:
+        """Remove a platform's entities like Home Assistant does on unload."""
+        for entity in self.platform_entities.pop(platform, []):
+            await entity.async_will_remove_from_hass()
+        return True
+
+
+class SoakRunner:
+    """Drives the setup/poll/unload cycles of one soak run."""
+
+    def __init__(self, config: SoakConfig, controller: MockController) -> None:
+        self.config = config
+        self.controller = controller
+        self.hass = StubHass()
+        self.hass.data[DOMAIN] = {}
+        self.hass.config_entries = StubConfigEntries()
+        self.writer = StateWriter()
+        self.report = SoakReport(config)
+        self.entry = SimpleNamespace(
+            entry_id="soak",
+            data={"name": HUB_NAME, **pellematic.discover_components_from_api(controller.payload)},
+        )
+        self._hubs: "weakref.WeakSet[pellematic.PellematicHub]" = weakref.WeakSet()
+        self._pending: List[Any] = []
+
+    def _add_entities_callback(self, platform: str) -> Any:
+        def add_entities(entities: List[Any]) -> None:
+            attach_writer(entities, self.writer)
+            self.hass.config_entries.platform_entities.setdefault(platform, []).extend(entities)
+            self._pending.extend(entities)
+
+        return add_entities
+
+    async def _add_pending_entities(self) -> None:
+        pending, self._pending = self._pending, []
+        for entity in pending:
+            await entity.async_added_to_hass()
+
+    async def setup(self) -> pellematic.PellematicHub:
+        """Set the entry up the way async_setup_entry and the platforms do."""
+        hub = pellematic.PellematicHub(self.hass, HUB_NAME, self.controller.url, 30, "utf-8", "?")
+        hub._min_fetch_interval = 0
+        self._hubs.add(hub)
+        await hub.fetch_pellematic_data()
+        self.hass.data[DOMAIN][HUB_NAME] = {"hub": hub}
+        for platform, module in PLATFORM_MODULES.items():
+            await module.async_setup_entry(self.hass, self.entry, self._add_entities_callback(platform))
+        await self._add_pending_entities()
+        return hub
+
+    async def run_retries(self, max_rounds: int = 10) -> None:
+        """Fire platform retry timers until they cancel themselves."""
+        for _ in range(max_rounds):
+            retry_timers = [timer for timer in self.hass.timers if timer.action.__name__ == "retry_setup"]
+            if not retry_timers:
+                return
+            for timer in retry_timers:
+                self.report.retries += 1
+                await timer.action(datetime.now())
+            await self._add_pending_entities()
+
+    async def poll(self, hub: pellematic.PellematicHub) -> None:
+        """Run the hub's scheduled poll once."""
+        if await async_get_poll_scheduler(self.hass).async_poll_now(hub.name):
+            self.report.polls += 1
+        else:
+            self.report.failed_polls += 1
+
+    async def run_cycle(self, cycle: int) -> None:
+        """Run one setup/poll/unload cycle."""
+        config = self.config
+        controller = self.controller
+
+        offline = bool(config.offline_reload_every) and cycle % config.offline_reload_every == config.offline_reload_every - 1
+        outage_setup = offline or (bool(config.outage_setup_every) and cycle % config.outage_setup_every == 0)
+        controller.faults.outage = OUTAGE_ERROR if outage_setup else None
+        hub = await self.setup()
+        if not offline:
+            controller.faults.outage = None
+            await self.run_retries()
+
+            outage_start = config.polls_per_cycle // 2
+            outage_end = outage_start + max(1, config.polls_per_cycle // 10)
+            for poll in range(config.polls_per_cycle):
+                controller.faults.outage = OUTAGE_ERROR if outage_start <= poll < outage_end else None
+                await self.poll(hub)
+        controller.faults.outage = None
+        controller.requests.clear()
+
+        if not offline and config.rediscover_every and cycle % config.rediscover_every == 0:
+            await hub.fetch_pellematic_data()
+            self.entry.data.update(hub.get_discovered_components())
+
+        entities = sum(len(entities) for entities in self.hass.config_entries.platform_entities.values())
+        executor = self.hass.data.get(DATA_IO_EXECUTOR)
+        await pellematic.async_unload_entry(self.hass, self.entry)
+        if executor is not None:
+            # A worker that just failed a fetch still references the exception
+            # (and through its traceback the hub) until the thread moves on
+            executor.shutdown(wait=True)
+        leftover_callbacks = len(hub._sensors)
+        del hub
+        self.writer.states.clear()
+        gc.collect()
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, pattern) for pattern in TRACED_FILES]
+        )
+        if cycle == config.warmup_cycles:
+            self._warm_snapshot = snapshot
+        elif cycle == config.cycles - 1 and hasattr(self, "_warm_snapshot"):
+            self.report.top_growth = [str(stat) for stat in snapshot.compare_to(self._warm_snapshot, "lineno")[:5]]
+
+        self.report.samples.append(
+            SoakSample(
+                cycle=cycle,
+                retained_bytes=sum(stat.size for stat in snapshot.statistics("filename")),
+                entities=entities,
+                leftover_callbacks=leftover_callbacks,
+                leftover_timers=len(self.hass.timers),
+                live_hubs=len(self._hubs),
+            )
+        )
+
+    async def run(self) -> SoakReport:
+        """Run all cycles."""
+        with patch_time_tracking(self.hass):
+            for cycle in range(self.config.cycles):
+                await self.run_cycle(cycle)
+        return self.report
+
+
+async def async_run_soak(config: Optional[SoakConfig] = None) -> SoakReport:
+    """Run a soak test against a freshly started mock controller."""
+    config = config or SoakConfig()
+    # Outages log an error per failed poll, and captured log records (e.g. by
+    # pytest) would keep the hubs they mention alive
+    logger = logging.getLogger(pellematic.__name__)
+    log_level = logger.level
+    logger.setLevel(logging.CRITICAL)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        with MockController(config.fixture, min_interval=0) as controller:
+            return await SoakRunner(config, controller).run()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+        logger.setLevel(log_level)
+
+
+def print_report(report: SoakReport) -> None:
+    """Print a soak report."""
+    print(f"{'cycle':>5} {'entities':>8} {'retained':>10} {'callbacks':>9} {'timers':>6} {'hubs':>4}")
+    for sample in report.samples:
+        print(
+            f"{sample.cycle:>5} {sample.entities:>8} {sample.retained_bytes:>10} "
+            f"{sample.leftover_callbacks:>9} {sample.leftover_timers:>6} {sample.live_hubs:>4}"
+        )
+    print(f"polls: {report.polls}, missed: {report.failed_polls}, setup retries: {report.retries}")
+    print(f"retained heap growth after warmup: {report.heap_growth} bytes")
+    if report.top_growth:
+        print("largest growth since warmup:")
+        for line in report.top_growth:
+            print(f"  {line}")
+    for problem in report.problems:
+        print(f"LEAK {problem}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the soak harness from the command line."""
+    defaults = SoakConfig()
+    parser = argparse.ArgumentParser(description="Soak test the integration for leaks.")
+    parser.add_argument("--fixture", default=defaults.fixture)
+    parser.add_argument("--cycles", type=int, default=defaults.cycles, help="Setup/unload cycles")
+    parser.add_argument("--polls", type=int, default=defaults.polls_per_cycle, help="Polls per cycle")
+    parser.add_argument("--max-growth", type=int, default=defaults.max_growth_bytes, help="Allowed heap growth in bytes")
+    args = parser.parse_args(argv)
+
+    config = SoakConfig(
+        fixture=args.fixture,
+        cycles=args.cycles,
+        polls_per_cycle=args.polls,
+        max_growth_bytes=args.max_growth,
+    )
+    report = asyncio.run(async_run_soak(config))
+    print_report(report)
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
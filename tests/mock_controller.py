@@ -0,0 +1,330 @@
+"""Local stand-in for an Ökofen Pellematic controller's JSON API.
+
+Serves a fixture payload over HTTP the way the controller does:
+
+- ``/<password>/all?``   full payload with metadata (val, unit, factor, ...)
+- ``/<password>/all??``  full payload with plain values (old firmware format)
+- ``/<password>/<component>?`` a single component, e.g. ``/pw/pe1?``
+- ``/<password>/<component>_<key>=<value>`` writes a value
+
+Requests closer together than ``min_interval`` are rejected with HTTP 401 and
+the controller's "Wait at least 2500ms during requests" body. Faults can be
+injected at runtime through ``controller.faults``.
+
+Use it from tests::
+
+    with MockController("api_response_basic.json") as controller:
+        data = fetch_data(controller.url, "utf-8", "?")
+
+or standalone::
+
+    python -m tests.mock_controller --fixture api_response_basic.json --port 4321
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from tests.conftest import load_fixture
+
+DEFAULT_PASSWORD = "pellematic"
+RATE_LIMIT_SECONDS = 2.5
+RATE_LIMIT_BODY = "Wait at least 2500ms during requests"
+
+OUTAGE_REFUSE = "refuse"  # close the connection without a response
+OUTAGE_ERROR = "error"  # respond with HTTP 503
+OUTAGE_HANG = "hang"  # accept the request and never answer in time
+
+
+@dataclass
+class MockControllerFaults:
+    """Faults injected into responses. All defaults mean "behave normally"."""
+
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    # Cut the response body to this fraction of its length (0.0 - 1.0)
+    truncate: Optional[float] = None
+    # Reproduce known controller JSON defects (4.02 L_statetext bug, raw newlines)
+    malformed: bool = False
+    # "utf-8", "iso-8859-1" or "mixed" (listed components sent as ISO-8859-1)
+    charset: str = "utf-8"
+    mixed_components: Set[str] = field(default_factory=lambda: {"system"})
+    outage: Optional[str] = None
+    hang_seconds: float = 30.0
+
+
+@dataclass
+class RequestRecord:
+    """A request received by the mock controller."""
+
+    timestamp: float
+    path: str
+    status: int
+
+
+def flatten_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip metadata, returning the plain-value format of old firmware."""
+    flat = {}
+    for component, values in payload.items():
+        if isinstance(values, dict):
+            flat[component] = {
+                key: value.get("val") if isinstance(value, dict) and "val" in value else value
+                for key, value in values.items()
+            }
+        else:
+            flat[component] = values
+    return flat
+
+
+class MockController:
+    """Threaded HTTP server emulating the controller API."""
+
+    def __init__(
+        self,
+        payload: Any = "api_response_basic.json",
+        password: str = DEFAULT_PASSWORD,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        min_interval: float = RATE_LIMIT_SECONDS,
+        faults: Optional[MockControllerFaults] = None,
+    ) -> None:
+        """Initialize the controller.
+
+        Args:
+            payload: Fixture file name or an already parsed payload dict
+            password: Password path segment
+            host: Address to bind
+            port: Port to bind (0 picks a free port)
+            min_interval: Minimum seconds between requests (rate limit)
+            faults: Initial fault configuration
+        """
+        if isinstance(payload, str):
+            payload = load_fixture(payload)
+        self.payload: Dict[str, Any] = copy.deepcopy(payload)
+        self.password = password
+        self.min_interval = min_interval
+        self.faults = faults or MockControllerFaults()
+        self.requests: List[RequestRecord] = []
+        self.writes: List[Tuple[str, str, str]] = []
+        self._lock = threading.Lock()
+        self._last_request = float("-inf")
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Return the URL up to and including the password segment."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/{self.password}"
+
+    @property
+    def url(self) -> str:
+        """Return the host URL as configured in the integration (without suffix)."""
+        return f"{self.base_url}/all"
+
+    @property
+    def rejected_count(self) -> int:
+        """Return how many requests were rejected by the rate limit."""
+        return sum(1 for request in self.requests if request.status == 401)
+
+    def start(self) -> "MockController":
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "MockController":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def set_value(self, component: str, key: str, value: Any) -> None:
+        """Change a value in the served payload."""
+        with self._lock:
+            field_data = self.payload[component].get(key)
+            if isinstance(field_data, dict):
+                field_data["val"] = value
+            else:
+                self.payload[component][key] = value
+
+    def reset_rate_limit(self) -> None:
+        """Forget the last request time so the next request is accepted."""
+        with self._lock:
+            self._last_request = float("-inf")
+
+    def _check_rate_limit(self) -> bool:
+        """Return True if a request arriving now is allowed."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_request < self.min_interval:
+                return False
+            self._last_request = now
+            return True
+
+    def handle(self, path: str) -> Tuple[int, bytes, str]:
+        """Compute the response for a request path.
+
+        Returns:
+            Tuple of (HTTP status, body bytes, content charset)
+        """
+        if not self._check_rate_limit():
+            return 401, RATE_LIMIT_BODY.encode("ascii"), "utf-8"
+
+        segments = path.split("/", 2)
+        if len(segments) < 3 or segments[1] != self.password:
+            return 401, b"Wrong password", "utf-8"
+        request = unquote(segments[2])
+
+        if "=" in request:
+            return self._handle_write(request)
+
+        target = request.rstrip("?")
+        suffix = request[len(target):]
+        with self._lock:
+            if target == "all":
+                payload = copy.deepcopy(self.payload)
+            elif target in self.payload:
+                payload = {target: copy.deepcopy(self.payload[target])}
+            else:
+                return 404, b"Not found", "utf-8"
+
+        if suffix != "?":
+            payload = flatten_payload(payload)
+        return 200, self._encode(payload), self.faults.charset
+
+    def _handle_write(self, request: str) -> Tuple[int, bytes, str]:
+        """Apply a '<component>_<key>=<value>' write."""
+        name, value = request.split("=", 1)
+        component, _, key = name.partition("_")
+        with self._lock:
+            known = component in self.payload and key in self.payload[component]
+        if not known:
+            return 404, f"Unknown parameter {name}".encode("utf-8"), "utf-8"
+        self.set_value(component, key, value)
+        self.writes.append((component, key, value))
+        return 200, f"{name}={value}".encode("utf-8"), "utf-8"
+
+    def _encode(self, payload: Dict[str, Any]) -> bytes:
+        """Serialize a payload, applying charset and malformed-JSON faults."""
+        faults = self.faults
+        parts = []
+        for component, values in payload.items():
+            text = f'"{component}":' + json.dumps(values, ensure_ascii=False)
+            if faults.malformed:
+                text = text.replace('"L_statetext":', '"L_statetext:').replace("\\n", "\n")
+            if faults.charset == "iso-8859-1" or (
+                faults.charset == "mixed" and component in faults.mixed_components
+            ):
+                parts.append(text.encode("iso-8859-1", "replace"))
+            else:
+                parts.append(text.encode("utf-8"))
+        body = b"{" + b",".join(parts) + b"}"
+        if faults.truncate is not None:
+            body = body[: int(len(body) * faults.truncate)]
+        return body
+
+
+def _make_handler(controller: MockController) -> type:
+    """Create the request handler class bound to a controller."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            faults = controller.faults
+            if faults.latency or faults.latency_jitter:
+                time.sleep(faults.latency + random.uniform(0, faults.latency_jitter))
+
+            if faults.outage == OUTAGE_REFUSE:
+                controller.requests.append(RequestRecord(time.monotonic(), self.path, 0))
+                self.close_connection = True
+                self.connection.close()
+                return
+            if faults.outage == OUTAGE_HANG:
+                controller.requests.append(RequestRecord(time.monotonic(), self.path, 0))
+                time.sleep(faults.hang_seconds)
+                return
+            if faults.outage == OUTAGE_ERROR:
+                status, body, charset = 503, b"Service unavailable", "utf-8"
+            else:
+                status, body, charset = controller.handle(self.path)
+
+            controller.requests.append(RequestRecord(time.monotonic(), self.path, status))
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", f"application/json; charset={charset}")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, format: str, *args: Any) -> None:
+            """Keep test output quiet."""
+
+    return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the mock controller in the foreground."""
+    parser = argparse.ArgumentParser(description="Serve a fixture like an Ökofen controller.")
+    parser.add_argument("--fixture", default="api_response_basic.json", help="Fixture file in tests/fixtures")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4321)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--min-interval", type=float, default=RATE_LIMIT_SECONDS)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--truncate", type=float)
+    parser.add_argument("--malformed", action="store_true")
+    parser.add_argument("--charset", choices=["utf-8", "iso-8859-1", "mixed"], default="utf-8")
+    parser.add_argument("--outage", choices=[OUTAGE_REFUSE, OUTAGE_ERROR, OUTAGE_HANG])
+    args = parser.parse_args(argv)
+
+    faults = MockControllerFaults(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        truncate=args.truncate,
+        malformed=args.malformed,
+        charset=args.charset,
+        outage=args.outage,
+    )
+    controller = MockController(
+        args.fixture,
+        password=args.password,
+        host=args.host,
+        port=args.port,
+        min_interval=args.min_interval,
+        faults=faults,
+    )
+    print(f"Serving {args.fixture} at {controller.url}?")
+    try:
+        controller._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        controller._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
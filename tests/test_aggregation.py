@@ -0,0 +1,94 @@
+"""Tests for the rolling windows and the decoupled publish rate."""
+import random
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact.aggregation import RollingWindow, WindowPublisher
+from custom_components.oekofen_pellematic_compact.dynamic_discovery import discover_all_entities
+from custom_components.oekofen_pellematic_compact.sensor import PellematicSensor
+
+from .benchmarks.ha_stubs import (
+    StateWriter,
+    StubHass,
+    async_add_entities_to_hub,
+    async_remove_entities_from_hub,
+    attach_writer,
+    create_hub,
+)
+
+
+def test_rolling_window_matches_recomputed_aggregates():
+    """Incremental mean/min/max equal the aggregates of the last N values."""
+    rng = random.Random(42)
+    window = RollingWindow(7)
+    values = []
+    for _ in range(200):
+        value = round(rng.uniform(-20, 90), 1)
+        values.append(value)
+        window.add(value)
+        recent = values[-7:]
+
+        assert len(window) == len(recent)
+        assert window.mean == pytest.approx(sum(recent) / len(recent))
+        assert window.min == min(recent)
+        assert window.max == max(recent)
+        assert window.last == value
+
+
+def test_empty_window_has_no_aggregates():
+    window = RollingWindow(3)
+
+    assert window.mean is None and window.min is None and window.last is None
+    assert window.as_dict()["samples"] == 0
+
+
+def test_publisher_gates_publications_with_slack():
+    """Polls within the publish interval are sampled, not published."""
+    publisher = WindowPublisher(30, 5)
+
+    assert publisher.window_size == 6
+    assert publisher.due(0)
+    assert not publisher.due(5)
+    assert not publisher.due(25)
+    # A poll that arrives slightly early still publishes
+    assert publisher.due(28)
+    assert not publisher.due(33)
+    assert publisher.publishes == 2
+
+
+@pytest.mark.asyncio
+async def test_hub_publishes_slower_than_it_polls(monkeypatch):
+    """Entities are updated once per publish interval with the window aggregates."""
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(pellematic, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    data = {"pe1": {"L_temp_act": {"val": 700, "unit": "°C", "factor": 0.1}}}
+    hass = StubHass()
+    hub = create_hub(hass, data, publisher=WindowPublisher(30, 5))
+    hub.fetch_pellematic_data = AsyncMock(return_value=True)
+    sensors = [PellematicSensor("Test", hub, {}, definition) for definition in discover_all_entities(data)["sensors"]]
+    writer = StateWriter()
+    attach_writer(sensors, writer)
+    await async_add_entities_to_hub(hass, sensors)
+
+    for poll, value in enumerate((700, 710, 690, 705, 720, 700, 715)):
+        clock.now = poll * 5
+        data["pe1"]["L_temp_act"]["val"] = value
+        await hub.async_refresh_api_data()
+
+    # Published after the first poll (t=0) and after the seventh (t=30)
+    assert writer.writes == 2
+    assert hub.publisher.polls == 7
+    assert sensors[0].state == 71.5
+    assert sensors[0].extra_state_attributes == {
+        "mean": 70.667,
+        "min": 69,
+        "max": 72,
+        "last": 71.5,
+        "samples": 6,
+    }
+
+    await async_remove_entities_from_hub(hass, sensors)
+    assert hub.publisher.as_dict()["tracked"] == 0
@@ -0,0 +1,83 @@
+"""Performance regression gate for the fixture benchmark suite.
+
+The suite in tests/benchmarks/bench_fixtures.py is run with a short
+measurement time and compared against the stored baseline. Timings are
+normalized against a calibration workload, so the baseline is portable
+across machines. The threshold is looser than the command line default
+because the test suite often runs on shared CI machines; override it with
+the PELLEMATIC_BENCH_THRESHOLD environment variable.
+"""
+import asyncio
+import json
+import os
+
+import pytest
+
+from tests.benchmarks import harness
+from tests.benchmarks.bench_fixtures import BASELINE_PATH, SUITE, build_cases, fixture_paths
+
+GATE_THRESHOLD = float(os.environ.get("PELLEMATIC_BENCH_THRESHOLD", "3.0"))
+STAGES = (
+    "decode",
+    "repair",
+    "json_loads",
+    "discover_all_entities",
+    "discover_components_from_api",
+    "construct_entities",
+    "poll_fan_out",
+)
+
+
+def _document(results):
+    return harness.results_to_document(SUITE, 1.0, results)
+
+
+def test_compare_to_baseline_flags_slowdown():
+    """A case slower than threshold × baseline is reported."""
+    baseline = _document([harness.BenchmarkResult("a", 1e-3, 1.0, 10)])
+    current = _document([harness.BenchmarkResult("a", 3e-3, 3.0, 10)])
+
+    regressions = harness.compare_to_baseline(current, baseline, threshold=2.0)
+
+    assert [r.name for r in regressions] == ["a"]
+    assert regressions[0].ratio == pytest.approx(3.0)
+
+
+def test_compare_to_baseline_ignores_noise_and_unknown_cases():
+    """Sub-noise-floor timings and cases without a baseline never fail."""
+    baseline = _document([harness.BenchmarkResult("fast", 1e-7, 0.001, 10)])
+    current = _document([
+        harness.BenchmarkResult("fast", 1e-6, 0.01, 10),
+        harness.BenchmarkResult("new", 1.0, 100.0, 1),
+    ])
+
+    assert harness.compare_to_baseline(current, baseline, threshold=2.0) == []
+
+
+def test_results_document_is_json_serializable(tmp_path):
+    """Result documents round-trip through the JSON writer."""
+    document = _document([harness.BenchmarkResult("a", 1e-3, 1.0, 10)])
+    path = tmp_path / "results.json"
+
+    harness.write_document(path, document)
+
+    assert json.loads(path.read_text()) == document
+
+
+@pytest.mark.benchmark
+def test_fixture_suite_has_no_regressions():
+    """Every fixture and stage runs and stays within the baseline threshold."""
+    loop = asyncio.new_event_loop()
+    try:
+        calibration, results = harness.run_cases(build_cases(loop), repeat=3, min_time=0.002)
+    finally:
+        loop.close()
+    document = harness.results_to_document(SUITE, calibration, results)
+
+    expected = {f"{path.name}/{stage}" for path in fixture_paths() for stage in STAGES}
+    assert set(document["results"]) == expected
+
+    regressions = harness.compare_to_baseline(
+        document, harness.load_document(BASELINE_PATH), GATE_THRESHOLD
+    )
+    assert not regressions, "Performance regressions:\n" + "\n".join(map(str, regressions))
@@ -0,0 +1,167 @@
+"""Tests for the single-request capability probe and the profile fast paths."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.const import CONF_HOST, CONF_NAME
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact.capabilities import (
+    CAPABILITY_PROFILE_VERSION,
+    build_capability_profile,
+    is_current_profile,
+    key_set_hash,
+    polls_with_metadata,
+)
+from custom_components.oekofen_pellematic_compact.config_flow import OekofenPellematicCompactConfigFlow
+from custom_components.oekofen_pellematic_compact.const import (
+    CONF_API_SUFFIX,
+    CONF_CAPABILITIES,
+    CONF_CHARSET,
+    CONF_NUM_OF_HEATING_CIRCUIT,
+    CONF_OLD_FIRMWARE,
+    DEFAULT_CHARSET,
+    DEFAULT_OLD_FIRMWARE,
+)
+from custom_components.oekofen_pellematic_compact.dynamic_discovery import discover_all_entities
+from custom_components.oekofen_pellematic_compact.sensor import PellematicSensor
+
+from .benchmarks.ha_stubs import StubHass
+from .mock_controller import MockController
+
+
+def test_probe_derives_profile_from_one_request():
+    """Charset, suffix, metadata, components and keys come from a single response."""
+    with MockController("api_response_basic.json") as controller:
+        profile, data = pellematic._probe_capabilities(controller.url)
+
+        assert len(controller.requests) == 1
+        assert profile["version"] == CAPABILITY_PROFILE_VERSION
+        assert profile[CONF_CHARSET] == "utf-8"
+        assert profile[CONF_API_SUFFIX] == "?"
+        assert profile[CONF_OLD_FIRMWARE] is False
+        assert profile["metadata"] is True
+        assert profile["components"][CONF_NUM_OF_HEATING_CIRCUIT] == 1
+        assert profile["key_counts"]["pe1"] == len(controller.payload["pe1"])
+        assert profile["key_hash"] == key_set_hash(controller.payload)
+        assert data == controller.payload
+
+
+def test_probe_with_configured_suffix():
+    """A configured suffix is probed as is; the plain '??' payload has no metadata."""
+    with MockController("api_response_basic.json") as controller:
+        profile, data = pellematic._probe_capabilities(controller.url, "??")
+
+        assert controller.requests[-1].path.endswith("/all??")
+        assert profile[CONF_API_SUFFIX] == "??"
+        assert profile["metadata"] is False
+        assert not pellematic._api_response_has_metadata(data)
+
+
+def test_probe_with_configured_charset():
+    """A configured charset is used for decoding and stored instead of the detected one."""
+    with MockController("api_response_basic.json") as controller:
+        profile, _ = pellematic._probe_capabilities(controller.url, "?", "iso-8859-1")
+
+        assert profile[CONF_CHARSET] == "iso-8859-1"
+
+
+def test_profile_version_and_suffix_guard():
+    """Outdated profiles and profiles probed for another suffix guarantee nothing."""
+    data = {"pe1": {"L_temp_act": {"val": 700, "factor": 0.1}}}
+    profile = build_capability_profile(data, "utf-8", "?", "?", {})
+
+    assert is_current_profile(profile)
+    assert polls_with_metadata(profile, "?")
+    assert not polls_with_metadata(profile, "??")
+    assert not polls_with_metadata({**profile, "version": 0}, "?")
+    assert not polls_with_metadata(None, "?")
+    # The suffix was detected from a '?' response, but the hub polls '??'
+    assert not build_capability_profile(data, "utf-8", "??", "?", {})["metadata"]
+
+
+def test_sensor_skips_unit_fallback_with_metadata_profile():
+    """Sensors of a hub with a metadata profile no longer scale by unit."""
+    data = {"pe1": {"L_temp_act": {"val": 700, "unit": "°C"}}}
+    sensor_def = next(
+        d for d in discover_all_entities(data)["sensors"] if d["key"] == "L_temp_act"
+    )
+
+    def _state(capabilities):
+        hub = pellematic.PellematicHub(StubHass(), "Test", "http://host/pw/all", 30, capabilities=capabilities)
+        hub.data = data
+        return PellematicSensor("Test", hub, {}, sensor_def).state
+
+    assert _state(None) == 70
+    assert _state(build_capability_profile(data, "utf-8", "?", "?", {})) == 700
+
+
+def test_seed_data_counts_as_fetch():
+    """A probe response used as first data is rate-limited like a fetch."""
+    hub = pellematic.PellematicHub(StubHass(), "Test", "http://host/pw/all", 30)
+
+    hub.seed_data({"pe1": {}})
+
+    assert hub.data == {"pe1": {}}
+    assert hub._last_fetch_time > 0
+
+
+@pytest.mark.asyncio
+async def test_config_flow_stores_profile():
+    """The config flow caches the profile of its detection response in the entry."""
+    flow = OekofenPellematicCompactConfigFlow()
+    flow.hass = MagicMock()
+    data = {"pe1": {"L_temp_act": {"val": "700", "unit": "°C", "factor": "0.1"}}}
+    flow.hass.async_add_executor_job = AsyncMock(return_value=(data, "utf-8", "?", False))
+    flow.async_set_unique_id = AsyncMock(return_value=None)
+    flow._abort_if_unique_id_configured = MagicMock(return_value=None)
+
+    with patch(
+        "custom_components.oekofen_pellematic_compact.discover_components_from_api",
+        return_value={CONF_NUM_OF_HEATING_CIRCUIT: 0},
+    ):
+        result = await flow.async_step_user({
+            CONF_HOST: "http://192.168.1.100/pass/all",
+            CONF_NAME: "Heater",
+            CONF_CHARSET: DEFAULT_CHARSET,
+            CONF_OLD_FIRMWARE: DEFAULT_OLD_FIRMWARE,
+        })
+
+    profile = result["data"][CONF_CAPABILITIES]
+    assert polls_with_metadata(profile, "?")
+    assert profile["key_counts"] == {"pe1": 1}
+
+
+@pytest.mark.asyncio
+async def test_config_flow_profile_keeps_user_selected_charset():
+    """A charset chosen by the user is stored in the profile, not the detected one."""
+    flow = OekofenPellematicCompactConfigFlow()
+    flow.hass = MagicMock()
+    data = {"pe1": {"L_temp_act": {"val": "700", "unit": "°C", "factor": "0.1"}}}
+    flow.hass.async_add_executor_job = AsyncMock(return_value=(data, "iso-8859-1", "?", False))
+    flow.async_set_unique_id = AsyncMock(return_value=None)
+    flow._abort_if_unique_id_configured = MagicMock(return_value=None)
+
+    with patch(
+        "custom_components.oekofen_pellematic_compact.discover_components_from_api",
+        return_value={CONF_NUM_OF_HEATING_CIRCUIT: 0},
+    ):
+        result = await flow.async_step_user({
+            CONF_HOST: "http://192.168.1.100/pass/all",
+            CONF_NAME: "Heater",
+            CONF_CHARSET: "utf-8",
+            CONF_OLD_FIRMWARE: DEFAULT_OLD_FIRMWARE,
+        })
+
+    assert result["data"][CONF_CHARSET] == "utf-8"
+    assert result["data"][CONF_CAPABILITIES][CONF_CHARSET] == "utf-8"
+
+
+def test_key_set_hash_depends_on_keys_only():
+    """Values and order do not change the hash, an added key does."""
+    data = {"pe1": {"L_temp_act": {"val": 700}, "mode": {"val": 1}}, "error": {}}
+    reordered = {"error": {}, "pe1": {"mode": {"val": 2}, "L_temp_act": {"val": 650}}}
+
+    assert key_set_hash(data) == key_set_hash(reordered)
+    assert len(key_set_hash(data)) == 16
+    reordered["pe1"]["L_temp_set"] = {"val": 700}
+    assert key_set_hash(data) != key_set_hash(reordered)
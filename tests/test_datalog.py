@@ -0,0 +1,147 @@
+"""Tests for the columnar data log of every poll."""
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact import datalog
+from custom_components.oekofen_pellematic_compact.datalog import DataLogger, read_datalog
+
+from .benchmarks.ha_stubs import StubHass, create_hub
+from .mock_controller import flatten_payload
+
+# 2026-01-01 12:00 UTC, far from midnight in every time zone that matters here
+START = 1767268800.0
+
+
+def _payload(temp=700, flow=None):
+    data = {
+        "pe1": {"L_temp_act": {"val": temp, "factor": 0.1}, "L_statetext": {"val": "Zündung"}},
+        "ww1": {"L_temp_act": {"val": 480, "factor": 0.1}},
+    }
+    if flow is not None:
+        data["hk1"] = {"L_flowtemp_act": {"val": flow, "factor": 0.1}}
+    return data
+
+
+def _logger(tmp_path, clock, **kwargs):
+    kwargs.setdefault("max_bytes", 10 * 1024 * 1024)
+    return DataLogger(str(tmp_path), "My Heater", clock=lambda: clock.now, **kwargs)
+
+
+def _key_records(path):
+    return sum(1 for kind, _ in datalog._read_records(path) if kind == datalog.RECORD_KEYS)
+
+
+def test_round_trip_scales_values_and_fills_gaps(tmp_path):
+    clock = SimpleNamespace(now=START)
+    logger = _logger(tmp_path, clock, batch_size=3)
+
+    batches = []
+    for poll, (temp, flow) in enumerate([(700, None), (705, 350), (712, 351)]):
+        clock.now = START + poll * 5.25
+        batches.append(logger.append(_payload(temp, flow)))
+    assert batches[:2] == [None, None]
+    logger.write(batches[2])
+
+    (name,) = os.listdir(tmp_path)
+    assert name == "My_Heater_20260101.col"
+    log = read_datalog(str(tmp_path / name))
+    assert log.timestamps == pytest.approx([START, START + 5.25, START + 10.5])
+    # Only numeric values of the logged components (pe, hk, pu)
+    assert log.columns == {
+        "pe1.L_temp_act": [70, 70.5, 71.2],
+        "hk1.L_flowtemp_act": [None, 35, 35.1],
+    }
+
+
+def test_values_without_factor_are_scaled_by_their_unit(tmp_path):
+    """Old firmware payloads read back as the values the sensor entities show."""
+    clock = SimpleNamespace(now=START)
+    logger = _logger(tmp_path, clock, batch_size=1, unit_fallback=True)
+    logger.write(logger.append(flatten_payload(_payload(633, 603))))
+
+    log = read_datalog(str(tmp_path / "My_Heater_20260101.col"))
+    assert log.columns == {"pe1.L_temp_act": [63.3], "hk1.L_flowtemp_act": [60.3]}
+
+
+def test_key_dictionary_is_stored_once_per_file(tmp_path):
+    clock = SimpleNamespace(now=START)
+    logger = _logger(tmp_path, clock, batch_size=2)
+    for poll in range(6):
+        clock.now = START + poll * 30
+        batch = logger.append(_payload(700 + poll))
+        if batch is not None:
+            logger.write(batch)
+    path = str(tmp_path / "My_Heater_20260101.col")
+    assert logger.blocks == 3
+    assert _key_records(path) == 1
+
+    # A restarted logger continues the file with the same key ids
+    restarted = _logger(tmp_path, clock, batch_size=1)
+    clock.now += 30
+    restarted.write(restarted.append(_payload(800, 400)))
+
+    assert _key_records(path) == 2
+    log = read_datalog(path)
+    assert log.columns["pe1.L_temp_act"] == [70, 70.1, 70.2, 70.3, 70.4, 70.5, 80]
+    assert log.columns["hk1.L_flowtemp_act"] == [None] * 6 + [40]
+
+
+def test_files_rotate_daily_and_oldest_are_deleted_over_the_limit(tmp_path):
+    clock = SimpleNamespace(now=START)
+    logger = _logger(tmp_path, clock, batch_size=1, max_bytes=1)
+
+    for day in range(3):
+        clock.now = START + day * 86400
+        logger.write(logger.append(_payload()))
+        assert len(os.listdir(tmp_path)) == 1
+
+    # The file being written is never deleted; other hubs' files are left alone
+    (tmp_path / "Other_20250101.col").write_bytes(b"x")
+    clock.now = START + 3 * 86400
+    logger.write(logger.append(_payload()))
+    assert sorted(os.listdir(tmp_path)) == ["My_Heater_20260104.col", "Other_20250101.col"]
+    assert logger.files_deleted == 3
+
+
+def test_truncated_file_is_read_up_to_its_last_complete_record(tmp_path):
+    clock = SimpleNamespace(now=START)
+    logger = _logger(tmp_path, clock, batch_size=1)
+    logger.write(logger.append(_payload(700)))
+    clock.now += 30
+    logger.write(logger.append(_payload(710)))
+    path = tmp_path / "My_Heater_20260101.col"
+    path.write_bytes(path.read_bytes()[:-3])
+
+    assert read_datalog(str(path)).columns["pe1.L_temp_act"] == [70]
+
+
+@pytest.mark.asyncio
+async def test_hub_logs_every_poll_and_writes_batches_in_the_executor(tmp_path, monkeypatch):
+    clock = SimpleNamespace(now=START)
+    monkeypatch.setattr(pellematic, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    hass = StubHass()
+    hass.async_add_executor_job = MagicMock()
+    hub = create_hub(hass, datalog=_logger(tmp_path, clock, batch_size=2))
+    hub._sensors.append(lambda: None)
+
+    async def fetch():
+        hub.data = _payload(700 + int(clock.now - START))
+        return True
+
+    hub.fetch_pellematic_data = AsyncMock(side_effect=fetch)
+    for poll in range(3):
+        clock.now = START + poll * 30
+        await hub.async_refresh_api_data()
+
+    hass.async_add_executor_job.assert_called_once()
+    write, batch = hass.async_add_executor_job.call_args[0]
+    assert write == hub.datalog.write and len(batch.polls) == 2
+
+    # The pending poll is written when the hub shuts down
+    hub.async_shutdown()
+    assert len(hass.async_add_executor_job.call_args[0][1].polls) == 1
+    assert hub.datalog.as_dict()["polls"] == 3
@@ -0,0 +1,124 @@
+"""Tests for the deadband filter on sensor state writes."""
+import pytest
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+
+from custom_components.oekofen_pellematic_compact.deadband import (
+    DeadbandFilter,
+    deadband_threshold,
+)
+from custom_components.oekofen_pellematic_compact.dynamic_discovery import discover_all_entities
+from custom_components.oekofen_pellematic_compact.sensor import PellematicSensor
+
+from .benchmarks.ha_stubs import StateWriter, StubHass, attach_writer, create_hub
+from .conftest import load_fixture
+from .mock_controller import flatten_payload
+
+
+class FakeClock:
+    """Monotonic clock advanced by the test."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_threshold_lookup():
+    """Thresholds are steps of the factor; device class and unit set the number of steps."""
+    measurement = SensorStateClass.MEASUREMENT
+    assert deadband_threshold(SensorDeviceClass.TEMPERATURE, measurement, "°C", 0.1) == 0.2
+    # A coarser resolution gets a coarser threshold
+    assert deadband_threshold(SensorDeviceClass.TEMPERATURE, measurement, "°C", 0.5) == 1.0
+    assert deadband_threshold(SensorDeviceClass.POWER, measurement, "W", 1) == 20
+    assert deadband_threshold(SensorDeviceClass.POWER, measurement, "kW", 0.1) == 0.2
+    assert deadband_threshold(SensorDeviceClass.PRESSURE, measurement, "bar", 0.01) == 0.05
+    assert deadband_threshold(None, measurement, "%", 1) == 2
+    assert deadband_threshold(None, measurement, "l/min", "0.5") == 1.0
+    assert deadband_threshold(None, measurement, None, "n/a") == 2.0
+    # Counters and sensors without a state class are never filtered
+    assert deadband_threshold(SensorDeviceClass.ENERGY, SensorStateClass.TOTAL_INCREASING, "kWh", 0.1) is None
+    assert deadband_threshold(SensorDeviceClass.ENERGY, measurement, "kWh", 0.1) is None
+    assert deadband_threshold(None, None, None, 1) is None
+
+
+def test_filter_suppresses_jitter_until_threshold_or_silence():
+    """Jitter is dropped; a move of the threshold or the silence time publishes."""
+    clock = FakeClock()
+    deadband = DeadbandFilter(600, clock)
+
+    assert deadband.should_publish("temp", 70.0, 0.2)
+    assert not deadband.should_publish("temp", 70.1, 0.2)
+    assert not deadband.should_publish("temp", 70.0, 0.2)
+    # Float noise in 70.2 - 70.0 must not hide a move of exactly the threshold
+    assert deadband.should_publish("temp", 70.0 + 0.1 * 2, 0.2)
+    assert not deadband.should_publish("temp", 70.1, 0.2)
+    clock.now = 600
+    assert deadband.should_publish("temp", 70.1, 0.2)
+
+    assert deadband.published == 3
+    assert deadband.suppressed == 3
+    assert deadband.suppressed_changes == 2
+
+
+def test_filter_publishes_non_numeric_transitions():
+    """Unavailable and text states always pass."""
+    deadband = DeadbandFilter(600, FakeClock())
+
+    assert deadband.should_publish("temp", 70.0, 0.2)
+    assert deadband.should_publish("temp", None, 0.2)
+    assert deadband.should_publish("temp", 70.0, 0.2)
+    assert deadband.should_publish("temp", "off", 0.2)
+
+    deadband.forget("temp")
+    assert deadband.as_dict()["sensors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sensor_skips_writes_within_deadband():
+    """Hub dispatch only writes measurements that moved past their threshold."""
+    data = {
+        "pe1": {
+            "L_temp_act": {"val": 700, "unit": "°C", "factor": 0.1},
+            "L_energy": {"val": 1000, "unit": "kWh", "factor": 0.1},
+        }
+    }
+    hub = create_hub(StubHass(), data, deadband=DeadbandFilter(600))
+    sensors = [
+        PellematicSensor("Test", hub, {}, definition)
+        for definition in discover_all_entities(data)["sensors"]
+        if definition["key"] in ("L_temp_act", "L_energy")
+    ]
+    writer = StateWriter()
+    attach_writer(sensors, writer)
+    temperature = next(sensor for sensor in sensors if sensor._key == "L_temp_act")
+    assert temperature._deadband_threshold == 0.2
+
+    for value in (700, 701, 700, 703):
+        data["pe1"]["L_temp_act"]["val"] = value
+        for sensor in sensors:
+            sensor._api_data_updated()
+
+    # Temperature: 70.0 and 70.3; the energy reading is written on every poll
+    assert writer.writes == 2 + 4
+    assert hub.deadband.suppressed == 2
+
+
+def test_threshold_follows_unit_fallback_scaling_of_old_firmware():
+    """Without factors temperatures are scaled by 0.1, so is their threshold."""
+    data = flatten_payload(load_fixture("api_response_basic.json"))
+    hub = create_hub(StubHass(), data, deadband=DeadbandFilter(600))
+    sensors = {
+        (definition["component"], definition["key"]): PellematicSensor("Test", hub, {}, definition)
+        for definition in discover_all_entities(data)["sensors"]
+    }
+
+    assert sensors[("pe1", "L_temp_act")]._deadband_threshold == 0.2
+    assert sensors[("hk1", "L_flowtemp_act")]._deadband_threshold == 0.2
+    # A move of 0.3 °C (3 raw steps) is published
+    sensor = sensors[("pe1", "L_temp_act")]
+    attach_writer([sensor], StateWriter())
+    sensor._api_data_updated()
+    data["pe1"]["L_temp_act"] += 3
+    sensor._api_data_updated()
+    assert hub.deadband.suppressed == 0
@@ -1,6 +1,7 @@
 """Tests for auto-discovery functionality."""
 import pytest
-from custom_components.oekofen_pellematic_compact import discover_components_from_api
+from custom_components.oekofen_pellematic_compact import PellematicHub, discover_components_from_api
+from custom_components.oekofen_pellematic_compact.components import ComponentIndex
 from custom_components.oekofen_pellematic_compact.const import (
     CONF_NUM_OF_HEATING_CIRCUIT,
     CONF_NUM_OF_HOT_WATER,
@@ -16,6 +17,8 @@ from custom_components.oekofen_pellematic_compact.const import (
     CONF_SMART_PV,
 )
 
+from .benchmarks.ha_stubs import StubHass
+
 
 def test_discovery_basic_setup():
     """Test discovery with basic setup (1 HK, 1 WW, 1 PE, 1 PU)."""
@@ -379,3 +382,32 @@ def test_discovery_with_sk_dash():
     assert CONF_NUM_OF_HEAT_PUMPS not in discovered
     assert CONF_STIRLING not in discovered
     assert CONF_SMART_PV not in discovered
+
+
+def test_component_index_families_and_instances():
+    """The index maps families to sorted instance numbers in a single pass."""
+    index = ComponentIndex({"hk12": {}, "hk1": {}, "wireless2": {}, "circ1": {}, "system": {}, "hk_extra": {}})
+
+    assert index.instances == {"hk": [1, 12], "wireless": [2], "circ": [1]}
+    assert index.components("hk") == ["hk1", "hk12"]
+    assert index.count("pe") == 0
+    assert "system" in index
+    assert index.discovered() == {
+        CONF_NUM_OF_HEATING_CIRCUIT: 2,
+        CONF_NUM_OF_WIRELESS_SENSORS: 1,
+        CONF_CIRCULATOR: True,
+    }
+
+
+def test_hub_reuses_component_index_per_snapshot():
+    """The hub builds the index once per data snapshot."""
+    hub = PellematicHub(StubHass(), "Test", "http://host/pw/all", 30)
+    hub.data = {"hk1": {}, "pe1": {}}
+
+    index = hub.component_index
+    assert hub.component_index is index
+    assert hub.get_discovered_components()[CONF_NUM_OF_PELLEMATIC_HEATER] == 1
+
+    hub.data = {"hk1": {}, "hk2": {}}
+    assert hub.component_index is not index
+    assert hub.get_discovered_components() == {CONF_NUM_OF_HEATING_CIRCUIT: 2}
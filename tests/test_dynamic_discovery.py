@@ -7,9 +7,12 @@ from custom_components.oekofen_pellematic_compact.dynamic_discovery import (
     is_select,
     is_number,
     parse_select_options,
+    format_descriptor,
+    canonical_unit,
     infer_device_class,
     infer_binary_device_class,
     infer_icon,
+    infer_entity_category,
     normalize_unit,
     create_sensor_definition,
     discover_entities_from_component,
@@ -17,7 +20,9 @@ from custom_components.oekofen_pellematic_compact.dynamic_discovery import (
 )
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass
-from homeassistant.const import UnitOfTemperature, UnitOfFrequency, PERCENTAGE
+from homeassistant.const import UnitOfTemperature, UnitOfFrequency, PERCENTAGE, EntityCategory
+
+from .conftest import load_fixture
 
 
 def test_infer_binary_device_class():
@@ -119,6 +124,46 @@ def test_parse_select_options():
     assert parse_select_options("invalid") == []
 
 
+def test_format_descriptor_maps_sparse_values_both_ways():
+    """Values are looked up by value, not by position, and descriptors are shared."""
+    descriptor = format_descriptor("0:Aus|2:Auto|10:Ein")
+
+    assert descriptor.options == ["0_aus", "2_auto", "10_ein"]
+    assert descriptor.is_select and not descriptor.is_binary
+    assert descriptor.option(10) == "10_ein"
+    assert descriptor.option("2") == "2_auto"
+    assert descriptor.option(2.0) == "2_auto"
+    assert descriptor.option(1) is None
+    assert descriptor.option([1]) is None
+    assert descriptor.text(10) == "Ein"
+    assert descriptor.value("10_ein") == "10"
+    assert descriptor.value("1_auto") is None
+    assert format_descriptor("0:Aus|2:Auto|10:Ein") is descriptor
+    assert format_descriptor("0:Off|1:On").is_binary
+    assert format_descriptor(None) is None
+
+    component = {
+        "mode": {"val": 1, "format": "0:Aus|1:Auto|2:Ein"},
+        "mode_dhw": {"val": 2, "format": "0:Aus|1:Auto|2:Ein"},
+    }
+    selects = discover_entities_from_component("hk1", component)["selects"]
+    assert selects[0]["format_descriptor"] is selects[1]["format_descriptor"]
+    assert selects[0]["options"] is selects[1]["options"]
+
+
+def test_enum_sensor_exposes_text_of_its_value():
+    """Read-only enum sensors keep their numeric state and add the label as attribute."""
+    from custom_components.oekofen_pellematic_compact.sensor import PellematicSensor
+
+    data = {"wp1": {"L_sg_ready": {"val": 2, "format": "0:-|1:SG Ready 1|2:SG Ready 2"}}}
+    definition = discover_all_entities(data)["sensors"][0]
+    hub = type("Hub", (), {"data": data})()
+    sensor = PellematicSensor("Pellematic", hub, {}, definition)
+
+    assert sensor.state == 2
+    assert sensor.extra_state_attributes == {"text": "SG Ready 2"}
+
+
 def test_infer_device_class():
     """Test device class inference."""
     # Temperature
@@ -163,6 +208,16 @@ def test_normalize_unit():
     assert normalize_unit("") is None
 
 
+def test_unit_aliases():
+    """Misspelled degree units are canonicalized by a single lookup."""
+    for unit in ("?C", "?c", "Â°C", "C", "°C"):
+        assert canonical_unit(unit) == "°C"
+        assert normalize_unit(unit) == UnitOfTemperature.CELSIUS
+        assert infer_device_class({"unit": unit}, "L_x") == SensorDeviceClass.TEMPERATURE
+    assert canonical_unit(None) == ""
+    assert canonical_unit("kWh") == "kWh"
+
+
 def test_create_sensor_definition():
     """Test sensor definition creation."""
     data = {
@@ -322,3 +377,37 @@ def test_multilingual_support():
     data_en = {"val": 100}
     definition_en = create_sensor_definition("system", "L_ambient", data_en)
     assert definition_en["name"] == "L_ambient"
+
+
+def test_infer_entity_category():
+    """Discovery classifies entities as primary, diagnostic or config."""
+    # Measurements and energy totals are primary
+    assert infer_entity_category("L_temp_act", {"val": 700, "unit": "°C"}, "sensors") == (None, True)
+    assert infer_entity_category("L_total", {"val": 5, "unit": "kWh"}, "sensors") == (None, True)
+    # Counters, errors and status texts are diagnostics
+    assert infer_entity_category("L_starts", {"val": 812}, "sensors") == (EntityCategory.DIAGNOSTIC, True)
+    assert infer_entity_category("L_errors", {"val": 0}, "sensors") == (EntityCategory.DIAGNOSTIC, True)
+    # Writable settings are config, mode selects stay primary
+    assert infer_entity_category("temp_heat", {"val": 200, "min": 100, "max": 300}, "numbers") == (
+        EntityCategory.CONFIG, True
+    )
+    assert infer_entity_category("mode_auto", {"val": 1, "format": "0:Off|1:Auto"}, "selects") == (None, True)
+    # Free-text fields and schedule time blocks are disabled by default
+    assert infer_entity_category("name", {"val": "HK1", "length": 16}, "sensors") == (EntityCategory.DIAGNOSTIC, False)
+    assert infer_entity_category("L_green_1_timeblock", {"val": "07:00-10:00"}, "sensors") == (
+        EntityCategory.DIAGNOSTIC, False
+    )
+
+
+def test_discovered_definitions_carry_category_and_enabled_flag():
+    """Every definition has a category and enabled flag; the entities apply them."""
+    from custom_components.oekofen_pellematic_compact.sensor import PellematicSensor
+
+    discovered = discover_all_entities(load_fixture("api_response_greenmode.json"))
+    definitions = [d for definitions in discovered.values() for d in definitions]
+
+    assert all("entity_category" in d and "enabled_default" in d for d in definitions)
+    timeblock = next(d for d in discovered["sensors"] if d["key"] == "L_green_1_timeblock")
+    sensor = PellematicSensor("Pellematic", None, {}, timeblock)
+    assert sensor.entity_category == EntityCategory.DIAGNOSTIC
+    assert sensor.entity_registry_enabled_default is False
@@ -0,0 +1,148 @@
+"""Tests for the entity include/exclude filter applied during discovery."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.const import CONF_HOST, CONF_NAME, CONF_SCAN_INTERVAL
+
+from custom_components.oekofen_pellematic_compact.config_flow import OekofenPellematicCompactConfigFlow
+from custom_components.oekofen_pellematic_compact.const import (
+    CONF_CHARSET,
+    CONF_EXCLUDE_ENTITIES,
+    CONF_INCLUDE_ENTITIES,
+    CONF_OLD_FIRMWARE,
+)
+from custom_components.oekofen_pellematic_compact.dynamic_discovery import (
+    discover_all_entities,
+    is_read_only_statistic,
+)
+from custom_components.oekofen_pellematic_compact.entity_filter import (
+    ENTITY_MEMORY_ESTIMATE,
+    EntityFilter,
+    count_entities,
+    entity_preview,
+    parse_patterns,
+)
+
+from .conftest import load_fixture
+
+
+def _keys(discovered):
+    return {
+        (definition["component"], definition["key"])
+        for definitions in discovered.values()
+        for definition in definitions
+    }
+
+
+def test_patterns_match_keys_components_and_classifications():
+    entity_filter = EntityFilter(
+        include=["pe1.L_*", "hk*", "@select"],
+        exclude=["*.L_statetext", "@statistic"],
+    )
+
+    assert entity_filter.allows("pe1", "L_temp_act", "sensor")
+    assert entity_filter.allows("hk2", "temp_heat", "number")
+    assert entity_filter.allows("ww1", "mode", "select")
+    assert not entity_filter.allows("ww1", "L_temp_set", "sensor")
+    assert not entity_filter.allows("pe1", "L_statetext", "sensor")
+    assert not entity_filter.allows("pe1", "L_runtime", "sensor", statistic=True)
+    # Keys are matched case-sensitively, like the API sends them
+    assert not entity_filter.allows("pe1", "l_temp_act", "sensor")
+
+
+def test_parse_and_validate_config():
+    assert parse_patterns("pe1.L_*, hk2\n@statistic,,") == ["pe1.L_*", "hk2", "@statistic"]
+    assert EntityFilter.from_config({}) is None
+    assert EntityFilter.from_config({CONF_INCLUDE_ENTITIES: " , "}) is None
+    with pytest.raises(ValueError):
+        EntityFilter.from_config({CONF_EXCLUDE_ENTITIES: "@diagnostic"})
+
+
+def test_discovery_skips_filtered_keys_before_building_definitions():
+    """Excluding statistics and a component removes exactly those definitions."""
+    data = load_fixture("api_response_greenmode.json")
+    unfiltered = discover_all_entities(data)
+
+    filtered = discover_all_entities(data, EntityFilter(exclude=["@statistic", "hk1"]))
+
+    expected = {
+        (component, key)
+        for component, key in _keys(unfiltered)
+        if component != "hk1" and not is_read_only_statistic(key)
+    }
+    assert _keys(filtered) == expected
+    assert count_entities(filtered) < count_entities(unfiltered)
+
+
+def test_preview_counts_and_memory():
+    data = load_fixture("api_response_greenmode.json")
+    unfiltered = discover_all_entities(data)
+    filtered = discover_all_entities(data, EntityFilter(include=["@select"]))
+
+    preview = entity_preview(unfiltered, filtered)
+
+    assert preview["entities_total"] == count_entities(unfiltered)
+    assert preview["entities_kept"] == len(unfiltered["selects"])
+    assert preview["memory_kept"] == f"{len(unfiltered['selects']) * ENTITY_MEMORY_ESTIMATE / 1024:.0f} KiB"
+    assert preview["breakdown"].startswith("0/")
+
+
+@pytest.mark.asyncio
+async def test_reconfigure_shows_preview_before_applying_filter():
+    """A changed filter is confirmed on a preview step before the entry is reloaded."""
+    flow = OekofenPellematicCompactConfigFlow()
+    flow.hass = MagicMock()
+    entry = MagicMock()
+    entry.data = {
+        CONF_HOST: "http://192.168.1.100/pass/",
+        CONF_NAME: "My Heater",
+        CONF_CHARSET: "utf-8",
+        CONF_OLD_FIRMWARE: False,
+    }
+    flow.hass.config_entries.async_get_entry = MagicMock(return_value=entry)
+    flow.hass.config_entries.async_update_entry = MagicMock()
+    flow.hass.config_entries.async_reload = AsyncMock(return_value=None)
+    flow.context = {"entry_id": "test123"}
+    data = load_fixture("api_response_greenmode.json")
+    flow.hass.async_add_executor_job = AsyncMock(return_value=(data, "utf-8", "?", False))
+    user_input = {
+        CONF_HOST: "http://192.168.1.100/pass/",
+        CONF_SCAN_INTERVAL: 30,
+        CONF_CHARSET: "utf-8",
+        CONF_OLD_FIRMWARE: False,
+        CONF_EXCLUDE_ENTITIES: "@statistic",
+    }
+
+    with patch(
+        "custom_components.oekofen_pellematic_compact.discover_components_from_api",
+        return_value={},
+    ):
+        result = await flow.async_step_reconfigure(dict(user_input))
+
+        assert result["step_id"] == "reconfigure_filter"
+        placeholders = result["description_placeholders"]
+        assert int(placeholders["entities_kept"]) < int(placeholders["entities_total"])
+        flow.hass.config_entries.async_update_entry.assert_not_called()
+
+        result = await flow.async_step_reconfigure_filter({})
+
+    assert result["reason"] == "reconfiguration_successful"
+    updated = flow.hass.config_entries.async_update_entry.call_args[1]["data"]
+    assert updated[CONF_EXCLUDE_ENTITIES] == "@statistic"
+
+
+@pytest.mark.asyncio
+async def test_reconfigure_rejects_unknown_classification():
+    flow = OekofenPellematicCompactConfigFlow()
+    flow.hass = MagicMock()
+    entry = MagicMock()
+    entry.data = {CONF_HOST: "http://192.168.1.100/pass/", CONF_NAME: "My Heater"}
+    flow.hass.config_entries.async_get_entry = MagicMock(return_value=entry)
+    flow.context = {"entry_id": "test123"}
+
+    result = await flow.async_step_reconfigure({
+        CONF_HOST: "http://192.168.1.100/pass/",
+        CONF_EXCLUDE_ENTITIES: "@diagnostic",
+    })
+
+    assert result["errors"] == {CONF_EXCLUDE_ENTITIES: "invalid_entity_filter"}
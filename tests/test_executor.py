@@ -0,0 +1,155 @@
+"""Tests for the bounded controller I/O executor."""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact.const import DATA_IO_EXECUTOR, DOMAIN
+from custom_components.oekofen_pellematic_compact.diagnostics import async_get_config_entry_diagnostics
+from custom_components.oekofen_pellematic_compact.executor import (
+    ControllerExecutor,
+    async_get_controller_executor,
+)
+
+from .benchmarks.ha_stubs import StubHass
+from .benchmarks.soak import StubConfigEntries
+
+
+class Tracker:
+    """Blocking job that records how many jobs run concurrently."""
+
+    def __init__(self, duration=0.05):
+        self.duration = duration
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, value=None):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.duration)
+        with self._lock:
+            self.active -= 1
+        return value
+
+
+@pytest.fixture
+def executor():
+    executor = ControllerExecutor(max_workers=2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_one_controller_run_one_at_a_time(executor):
+    """A controller never gets more than one request at a time."""
+    tracker = Tracker()
+
+    results = await asyncio.gather(*(executor.async_run("Haus", tracker, i) for i in range(3)))
+
+    assert results == [0, 1, 2]
+    assert tracker.peak == 1
+    stats = executor.stats["Haus"]
+    assert stats.completed == 3
+    # The first job starts right away, the other two wait for it
+    assert stats.max_queued == 2
+    assert stats.queued == stats.running == 0
+    assert stats.max_wait_seconds >= tracker.duration
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_the_controller_busy_until_its_request_ends(executor):
+    """The next job waits for the thread of a cancelled job, not for its caller."""
+    tracker = Tracker(duration=0.2)
+    first = asyncio.ensure_future(executor.async_run("Haus", tracker, 1))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    assert await executor.async_run("Haus", tracker, 2) == 2
+    assert tracker.peak == 1
+    stats = executor.stats["Haus"]
+    assert stats.completed == 2
+    assert stats.queued == stats.running == 0
+
+
+@pytest.mark.asyncio
+async def test_controllers_run_in_parallel_up_to_max_workers(executor):
+    """Different controllers share the pool, bounded by its size."""
+    tracker = Tracker()
+
+    await asyncio.gather(*(executor.async_run(name, tracker) for name in ("a", "b", "c", "d")))
+
+    assert tracker.peak == 2
+    assert set(executor.stats) == {"a", "b", "c", "d"}
+
+
+@pytest.mark.asyncio
+async def test_failures_are_counted_and_raised(executor):
+    """A failing job raises to the caller and counts as failed."""
+
+    def fail():
+        raise OSError("timed out")
+
+    with pytest.raises(OSError):
+        await executor.async_run("Haus", fail)
+    assert await executor.async_run("Haus", lambda: "ok") == "ok"
+
+    assert executor.as_dict()["controllers"]["Haus"]["failed"] == 1
+    assert executor.as_dict()["controllers"]["Haus"]["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_shutdown_rejects_new_jobs(executor):
+    """After shutdown no further jobs are accepted."""
+    executor.shutdown()
+
+    with pytest.raises(RuntimeError):
+        await executor.async_run("Haus", lambda: None)
+
+
+@pytest.mark.asyncio
+async def test_unloading_the_last_entry_shuts_the_executor_down():
+    """The executor lives as long as at least one entry is loaded."""
+    hass = StubHass()
+    hass.config_entries = StubConfigEntries()
+    hass.data[DOMAIN] = {}
+    hubs = {}
+    for name in ("Haus", "Halle"):
+        hubs[name] = pellematic.PellematicHub(hass, name, "http://192.0.2.1/pw/all", 30)
+        hass.data[DOMAIN][name] = {"hub": hubs[name]}
+    executor = async_get_controller_executor(hass)
+
+    await pellematic.async_unload_entry(hass, SimpleNamespace(data={"name": "Haus"}))
+    assert hass.data[DATA_IO_EXECUTOR] is executor
+    assert not executor.closed
+
+    await pellematic.async_unload_entry(hass, SimpleNamespace(data={"name": "Halle"}))
+    assert DATA_IO_EXECUTOR not in hass.data
+    assert executor.closed
+    # A new setup gets a fresh executor
+    assert async_get_controller_executor(hass) is not executor
+    hass.data[DATA_IO_EXECUTOR].shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_include_io_metrics_and_redact_host(monkeypatch):
+    """Diagnostics show the executor metrics but not the password in the host URL."""
+    monkeypatch.setattr(pellematic, "fetch_data", lambda url, charset, api_suffix: {"pe1": {}})
+    hass = StubHass()
+    hub = pellematic.PellematicHub(hass, "Haus", "http://192.0.2.1/secret/all", 30)
+    hass.data[DOMAIN] = {"Haus": {"hub": hub}}
+    entry = SimpleNamespace(data={"name": "Haus", "host": "http://192.0.2.1/secret/all"})
+
+    assert await hub.fetch_pellematic_data() is True
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    async_get_controller_executor(hass).shutdown(wait=True)
+
+    assert "secret" not in str(diagnostics)
+    assert diagnostics["hub"]["components"] == ["pe1"]
+    assert diagnostics["io_executor"]["controllers"]["Haus"]["completed"] == 1
@@ -4,12 +4,23 @@ import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from homeassistant.helpers import entity_registry as er
 
+from custom_components.oekofen_pellematic_compact import migration
 from custom_components.oekofen_pellematic_compact.migration import (
+    analyze_entities,
+    async_migrate_and_check_entities,
     async_migrate_entity_ids,
     async_check_and_warn_entity_changes,
     _generate_old_entity_id_patterns,
 )
 
+from tests.benchmarks import harness
+from tests.benchmarks.bench_migration import (
+    StubRegistry,
+    legacy_migrate_and_check,
+    migrate_and_check,
+    synthetic_entity_ids,
+)
+
 
 @pytest.fixture
 def mock_entity_registry():
@@ -85,6 +96,8 @@ async def test_migrate_entity_ids_with_old_format(mock_hass):
             mock_hass.components.persistent_notification.async_create = Mock()
             
             mock_registry = Mock()
+            # Entity ID index of the registry, used for collision checks
+            mock_registry.entities = {e.entity_id: e for e in mock_entries}
             mock_get_registry.return_value = mock_registry
             
             migrated = await async_migrate_entity_ids(mock_hass, "test_entry", "test_hub")
@@ -234,3 +247,96 @@ def test_old_pattern_matching():
     climate_pattern = next(p for p in patterns if p[0] == "climate")
     assert re.match(climate_pattern[1], "climate.pellematic_heating_circuit_1_climate")
     assert not re.match(climate_pattern[1], "climate.pellematic_hk1_climate")
+
+
+def test_analyze_entities_plans_migration_and_warnings_in_one_pass():
+    """Old patterns are preserved, mixed case is renamed unless the target is taken."""
+    entity_ids = [
+        "sensor.pellematic_heater_1_power",
+        "climate.pellematic_heating_circuit_1_climate",
+        "sensor.pellematic_pe1_L_temp_act",
+        "sensor.pellematic_pe1_L_Temp_act",
+        "sensor.pellematic_ww1_L_temp_set",
+        "sensor.pellematic_hk1_raumtemperatur",
+    ]
+    existing = set(entity_ids) | {"sensor.pellematic_ww1_l_temp_set"}
+
+    analysis = analyze_entities(entity_ids, existing)
+
+    assert analysis.preserved == entity_ids[:2]
+    assert analysis.renames == [("sensor.pellematic_pe1_L_temp_act", "sensor.pellematic_pe1_l_temp_act")]
+    # Taken by the planned rename above, or already in the registry
+    assert analysis.collisions == [
+        ("sensor.pellematic_pe1_L_Temp_act", "sensor.pellematic_pe1_l_temp_act"),
+        ("sensor.pellematic_ww1_L_temp_set", "sensor.pellematic_ww1_l_temp_set"),
+    ]
+    # The first indicator in list order is reported, as before
+    assert analysis.warnings == [
+        "Entity sensor.pellematic_hk1_raumtemperatur contains translated text ('temperatur'). "
+        "This may cause issues if the system language changes."
+    ]
+    assert analysis.migrated == 3
+
+
+@pytest.mark.asyncio
+async def test_migrate_and_check_walks_registry_once(mock_hass):
+    """Migration and warning check share one registry walk and apply renames together."""
+    registry = StubRegistry(["sensor.pellematic_pe1_L_temp_act", "sensor.pellematic_pellematic_1_kesseltemperatur"])
+    mock_hass.services.async_call = AsyncMock()
+
+    with patch("custom_components.oekofen_pellematic_compact.migration.er.async_get", return_value=registry):
+        with patch(
+            "custom_components.oekofen_pellematic_compact.migration.er.async_entries_for_config_entry",
+            return_value=list(registry.entities.values()),
+        ) as mock_entries:
+            migrated, warnings = await async_migrate_and_check_entities(mock_hass, "test_entry", "test_hub")
+
+    assert mock_entries.call_count == 1
+    assert migrated == 1
+    assert registry.updates == [("sensor.pellematic_pe1_L_temp_act", "sensor.pellematic_pe1_l_temp_act")]
+    assert len(warnings) == 1
+    assert mock_hass.data["oekofen_pellematic_compact"]["test_hub"]["migrated_entity_ids"] is True
+
+
+def test_engine_matches_previous_implementation():
+    """On a synthetic registry the engine migrates, skips and warns exactly as before."""
+    registry = StubRegistry(synthetic_entity_ids(2_000))
+    entities = list(registry.entities.values())
+
+    legacy = legacy_migrate_and_check(registry, entities)
+    legacy_updates, registry.updates = registry.updates, []
+
+    assert migrate_and_check(registry, entities) == legacy
+    assert registry.updates == legacy_updates
+
+
+@pytest.mark.benchmark
+def test_engine_faster_on_large_registry():
+    """On a 10k-entity registry the one-pass engine is clearly faster."""
+    registry = StubRegistry(synthetic_entity_ids(10_000))
+    entities = list(registry.entities.values())
+
+    # Both log every preserved entity and skipped rename; time the matching only
+    with patch.object(migration._LOGGER, "disabled", True):
+        current, _ = harness.time_call(lambda: migrate_and_check(registry, entities), repeat=3)
+        legacy, _ = harness.time_call(lambda: legacy_migrate_and_check(registry, entities), repeat=3)
+
+    assert legacy / current > 1.5
+
+
+@pytest.mark.asyncio
+async def test_check_still_warns_after_failed_migration(mock_hass):
+    """A failing migration does not swallow the translated-text warnings."""
+    registry = StubRegistry(["sensor.pellematic_pe1_L_temp_act", "sensor.pellematic_pellematic_1_kesseltemperatur"])
+    mock_hass.services.async_call = AsyncMock()
+
+    with patch("custom_components.oekofen_pellematic_compact.migration.er.async_get", return_value=registry), patch(
+        "custom_components.oekofen_pellematic_compact.migration.er.async_entries_for_config_entry",
+        return_value=list(registry.entities.values()),
+    ), patch.object(migration, "_apply_migration", side_effect=RuntimeError("registry locked")):
+        migrated, warnings = await async_migrate_and_check_entities(mock_hass, "test_entry", "test_hub")
+
+    assert migrated == 0
+    assert len(warnings) == 1
+    # The warnings notification is still created
+    mock_hass.services.async_call.assert_called_once()
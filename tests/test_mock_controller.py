@@ -0,0 +1,187 @@
+"""End-to-end tests of PellematicHub against the local mock controller."""
+import asyncio
+import time
+import urllib.error
+
+import pytest
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact import fetch_data, send_data
+
+from .benchmarks.ha_stubs import StubHass
+from .mock_controller import (
+    OUTAGE_ERROR,
+    OUTAGE_REFUSE,
+    RATE_LIMIT_BODY,
+    MockController,
+)
+
+# Keep the tests fast: the hub and the controller agree on a short interval.
+TEST_INTERVAL = 0.05
+
+
+@pytest.fixture
+def controller():
+    """Serve the basic fixture with a short rate limit."""
+    with MockController("api_response_basic.json", min_interval=TEST_INTERVAL) as mock:
+        yield mock
+
+
+def _create_hub(controller, **kwargs):
+    hub = pellematic.PellematicHub(
+        StubHass(),
+        name="Test",
+        host=controller.url,
+        scan_interval=30,
+        charset=kwargs.pop("charset", "utf-8"),
+        api_suffix=kwargs.pop("api_suffix", "?"),
+    )
+    hub._min_fetch_interval = TEST_INTERVAL
+    return hub
+
+
+@pytest.mark.asyncio
+async def test_hub_fetches_payload_with_metadata(controller):
+    """The hub parses the '?' payload including metadata."""
+    hub = _create_hub(controller)
+
+    assert await hub.fetch_pellematic_data() is True
+
+    assert hub.data["pe1"] == controller.payload["pe1"]
+    assert controller.requests[-1].path.endswith("/all?")
+
+
+@pytest.mark.asyncio
+async def test_double_question_mark_returns_plain_values(controller):
+    """The '??' suffix serves the old-firmware format without metadata."""
+    hub = _create_hub(controller, api_suffix="??")
+
+    assert await hub.fetch_pellematic_data() is True
+
+    assert not pellematic._api_response_has_metadata(hub.data)
+    assert hub.data["system"]["L_ambient"] == controller.payload["system"]["L_ambient"]["val"]
+
+
+def test_rate_limit_rejects_back_to_back_requests():
+    """Requests within 2500 ms get the controller's 401 body."""
+    with MockController("api_response_basic.json") as controller:
+        fetch_data(controller.url, "utf-8", "?")
+        with pytest.raises(urllib.error.HTTPError) as err:
+            fetch_data(controller.url, "utf-8", "?")
+
+    assert err.value.code == 401
+    assert err.value.read().decode() == RATE_LIMIT_BODY
+    assert controller.rejected_count == 1
+
+
+@pytest.mark.asyncio
+async def test_hub_rate_limiting_avoids_rejections(controller):
+    """Back-to-back hub fetches are spaced so the controller never rejects them."""
+    hub = _create_hub(controller)
+    # The hub measures from sending, the controller from arrival; leave room for jitter
+    hub._min_fetch_interval = TEST_INTERVAL * 1.5
+
+    for _ in range(3):
+        assert await hub.fetch_pellematic_data() is True
+
+    assert controller.rejected_count == 0
+
+
+@pytest.mark.asyncio
+async def test_write_is_reflected_in_next_poll(controller):
+    """A component_key=value write changes the served value."""
+    hub = _create_hub(controller)
+
+    await hub.async_send_pellematic_data(215, "hk1", "temp_heat")
+    await asyncio.sleep(TEST_INTERVAL)
+    assert await hub.fetch_pellematic_data() is True
+
+    assert controller.writes == [("hk1", "temp_heat", "215")]
+    assert hub.data["hk1"]["temp_heat"]["val"] == "215"
+
+
+def test_write_to_unknown_parameter_fails(controller):
+    """Writes to keys the controller does not know return an HTTP error."""
+    with pytest.raises(urllib.error.HTTPError):
+        send_data(f"{controller.base_url}/hk1_does_not_exist=1")
+
+
+def test_component_endpoint_serves_single_component(controller):
+    """'/<password>/<component>?' returns only that component."""
+    data = fetch_data(f"{controller.base_url}/pe1", "utf-8", "?")
+
+    assert list(data) == ["pe1"]
+
+
+@pytest.mark.asyncio
+async def test_malformed_json_is_repaired(controller):
+    """The 4.02 L_statetext defect and raw newlines are repaired by the hub."""
+    controller.payload["system"]["L_statetext"] = "line one\nline two"
+    controller.faults.malformed = True
+    hub = _create_hub(controller)
+
+    assert await hub.fetch_pellematic_data() is True
+
+    assert hub.data["system"]["L_statetext"] == "line one\nline two"
+
+
+@pytest.mark.asyncio
+async def test_truncated_response_keeps_previous_data(controller):
+    """A truncated payload fails the poll without dropping cached data."""
+    hub = _create_hub(controller)
+    assert await hub.fetch_pellematic_data() is True
+    previous = hub.data
+
+    controller.faults.truncate = 0.5
+    assert await hub.fetch_pellematic_data() is False
+
+    assert hub.data is previous
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("outage", [OUTAGE_REFUSE, OUTAGE_ERROR])
+async def test_outage_fails_poll(controller, outage):
+    """Refused connections and HTTP errors fail the poll."""
+    controller.faults.outage = outage
+    hub = _create_hub(controller)
+
+    assert await hub.fetch_pellematic_data() is False
+
+
+@pytest.mark.asyncio
+async def test_latency_is_injected(controller):
+    """Configured latency delays the response."""
+    controller.faults.latency = 0.2
+    hub = _create_hub(controller)
+
+    start = time.monotonic()
+    assert await hub.fetch_pellematic_data() is True
+
+    assert time.monotonic() - start >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_iso_8859_1_payload_decodes_with_configured_charset():
+    """A controller sending ISO-8859-1 is readable with the iso-8859-1 charset."""
+    with MockController("api_response_base_da.json", min_interval=TEST_INTERVAL) as controller:
+        controller.faults.charset = "iso-8859-1"
+        hub = _create_hub(controller, charset="iso-8859-1")
+
+        assert await hub.fetch_pellematic_data() is True
+
+    assert hub.data["system"] == controller.payload["system"]
+
+
+@pytest.mark.asyncio
+async def test_mixed_payload_keeps_latin1_values_and_units():
+    """ISO-8859-1 spans in a UTF-8 payload are decoded, not dropped."""
+    with MockController("api_response_basic.json", min_interval=TEST_INTERVAL) as controller:
+        controller.faults.charset = "mixed"
+        controller.faults.mixed_components = {"system", "pe1"}
+        hub = _create_hub(controller, charset="utf-8")
+
+        assert await hub.fetch_pellematic_data() is True
+
+    assert hub.data["system"] == controller.payload["system"]
+    assert hub.data["pe1"]["L_temp_act"]["unit"] == "°C"
+    assert hub.data["hk1"] == controller.payload["hk1"]
@@ -0,0 +1,115 @@
+"""Tests for the synthetic large-plant payload generator and scaling suite."""
+import asyncio
+import os
+
+import pytest
+
+from custom_components.oekofen_pellematic_compact import (
+    _api_response_has_metadata,
+    discover_components_from_api,
+)
+from custom_components.oekofen_pellematic_compact.const import (
+    CONF_NUM_OF_BUFFER_STORAGE,
+    CONF_NUM_OF_HEATING_CIRCUIT,
+    CONF_NUM_OF_PELLEMATIC_HEATER,
+    CONF_NUM_OF_WIRELESS_SENSORS,
+)
+from custom_components.oekofen_pellematic_compact.dynamic_discovery import discover_all_entities
+
+from tests.benchmarks import harness
+from tests.benchmarks.bench_scaling import BASELINE_PATH, SUITE, build_cases, per_key_growth
+from tests.benchmarks.payload_generator import (
+    SENTINEL_VALUES,
+    count_keys,
+    generate_payload,
+    generate_payload_for_keys,
+)
+
+GATE_THRESHOLD = float(os.environ.get("PELLEMATIC_BENCH_THRESHOLD", "3.0"))
+
+
+def test_component_counts_are_discovered():
+    """Generated components are found by component discovery."""
+    payload = generate_payload({"hk": 12, "pu": 3, "pe": 4, "wireless": 24})
+
+    discovered = discover_components_from_api(payload)
+
+    assert discovered[CONF_NUM_OF_HEATING_CIRCUIT] == 12
+    assert discovered[CONF_NUM_OF_BUFFER_STORAGE] == 3
+    assert discovered[CONF_NUM_OF_PELLEMATIC_HEATER] == 4
+    assert discovered[CONF_NUM_OF_WIRELESS_SENSORS] == 24
+
+
+def test_same_seed_gives_same_payload():
+    """Payloads are reproducible from the seed."""
+    counts = {"hk": 3, "pe": 2}
+
+    assert generate_payload(counts, seed=7) == generate_payload(counts, seed=7)
+    assert generate_payload(counts, seed=7) != generate_payload(counts, seed=8)
+
+
+def test_payload_contains_strings_and_sentinels():
+    """String values are kept and wide-range values may become sentinels."""
+    payload = generate_payload({"hk": 4, "pe": 4, "wireless": 4}, sentinel_rate=0.5)
+    values = [
+        field["val"]
+        for component in payload.values()
+        for field in component.values()
+        if isinstance(field, dict) and "val" in field
+    ]
+
+    assert any(isinstance(value, str) and not value.lstrip("-").isdigit() for value in values)
+    assert any(value in SENTINEL_VALUES for value in values)
+
+
+def test_values_respect_format_options():
+    """Values of format fields are always one of the listed options."""
+    payload = generate_payload({"hk": 6}, seed=3)
+
+    for component in payload.values():
+        for field in component.values():
+            if isinstance(field, dict) and "|" in str(field.get("format", "")):
+                options = [part.split(":", 1)[0] for part in field["format"].split("|")]
+                assert str(field["val"]) in options
+
+
+def test_plain_value_format():
+    """with_metadata=False produces the old-firmware format."""
+    payload = generate_payload({"hk": 2}, with_metadata=False)
+
+    assert not _api_response_has_metadata(payload)
+
+
+@pytest.mark.parametrize("target", [1_000, 5_000])
+def test_generate_payload_for_keys_reaches_target(target):
+    """Target-sized payloads have at least the requested number of keys."""
+    payload, counts = generate_payload_for_keys(target)
+
+    assert count_keys(payload) >= target
+    assert counts["hk"] > counts["circ"]
+    assert discover_all_entities(payload)["sensors"]
+
+
+def test_unknown_family_is_rejected():
+    """Typos in component families fail loudly."""
+    with pytest.raises(ValueError):
+        generate_payload({"heating": 1})
+
+
+@pytest.mark.benchmark
+def test_scaling_suite_has_no_regressions():
+    """Scaling stays within the baseline and roughly linear up to 10k keys."""
+    loop = asyncio.new_event_loop()
+    try:
+        calibration, results = harness.run_cases(build_cases(loop=loop), repeat=3, min_time=0.002)
+    finally:
+        loop.close()
+    document = harness.results_to_document(SUITE, calibration, results)
+
+    regressions = harness.compare_to_baseline(
+        document, harness.load_document(BASELINE_PATH), GATE_THRESHOLD
+    )
+    assert not regressions, "Performance regressions:\n" + "\n".join(map(str, regressions))
+
+    for stage, by_size in per_key_growth(results).items():
+        assert max(by_size.values()) < GATE_THRESHOLD, f"{stage} grows super-linearly: {by_size}"
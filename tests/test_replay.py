@@ -0,0 +1,185 @@
+"""Tests for traffic recording and accelerated replay."""
+import asyncio
+import itertools
+import json
+
+import pytest
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact import replay as replay_module
+from custom_components.oekofen_pellematic_compact.replay import (
+    RECORD_ERROR,
+    RECORD_RESPONSE,
+    RECORD_WRITE,
+    REDACTED,
+    RecordingFormatError,
+    TrafficRecord,
+    TrafficRecorder,
+    TrafficReplay,
+    async_replay,
+    read_records,
+    write_recording,
+)
+
+from .benchmarks.bench_replay import async_run_replay, simulate_day
+from .benchmarks.ha_stubs import StubHass
+from .conftest import load_fixture
+from .mock_controller import OUTAGE_ERROR, MockController
+
+TEST_INTERVAL = 0.05
+
+
+def _response(payload, timestamp):
+    return TrafficRecord(RECORD_RESPONSE, timestamp, json.dumps(payload).encode("utf-8"))
+
+
+def test_records_round_trip(tmp_path):
+    """Responses (compressed against their predecessor), errors and writes survive a round trip."""
+    payload = load_fixture("api_response_basic.json")
+    changed = json.loads(json.dumps(payload))
+    changed["pe1"]["L_temp_act"]["val"] = 701
+    records = [
+        _response(payload, 1.0),
+        TrafficRecord(RECORD_WRITE, 2.0, b"http://host/pw/hk1_temp_heat=215"),
+        _response(changed, 3.0),
+        TrafficRecord(RECORD_ERROR, 4.0, b"HTTP Error 503"),
+    ]
+    path = tmp_path / "plant.rec"
+
+    write_recording(str(path), records)
+
+    assert list(read_records(str(path))) == records
+    assert path.stat().st_size < len(records[0].payload) + len(records[2].payload) // 4
+
+
+def test_truncated_recording_keeps_complete_records(tmp_path):
+    """A recording cut off mid-record is read up to its last complete record."""
+    path = tmp_path / "plant.rec"
+    records = [_response({"pe1": {"L_temp_act": i}}, float(i)) for i in range(3)]
+    write_recording(str(path), records)
+    path.write_bytes(path.read_bytes()[:-3])
+
+    assert [record.timestamp for record in read_records(str(path))] == [0.0, 1.0]
+
+
+def test_rejects_other_files(tmp_path):
+    """Files without the recording header are rejected."""
+    path = tmp_path / "plant.rec"
+    path.write_text("{}")
+
+    with pytest.raises(RecordingFormatError):
+        list(read_records(str(path)))
+
+
+def _create_hub(controller):
+    hub = pellematic.PellematicHub(StubHass(), "Test", controller.url, 30, "utf-8", "?")
+    hub._min_fetch_interval = TEST_INTERVAL * 1.5
+    return hub
+
+
+@pytest.mark.asyncio
+async def test_hub_records_raw_responses_errors_and_writes(tmp_path):
+    """The hub records the raw bytes it fetched, failed fetches and write URLs."""
+    path = str(tmp_path / "plant.rec")
+    with MockController(min_interval=TEST_INTERVAL) as controller:
+        hub = _create_hub(controller)
+        await hub._hass.async_add_executor_job(hub.start_recording, path)
+
+        assert await hub.fetch_pellematic_data() is True
+        controller.faults.outage = OUTAGE_ERROR
+        assert await hub.fetch_pellematic_data() is False
+        controller.faults.outage = None
+        await asyncio.sleep(TEST_INTERVAL * 1.5)
+        await hub.async_send_pellematic_data(215, "hk1", "temp_heat")
+
+        assert hub.stop_recording() == path
+
+    records = list(read_records(path))
+    assert [record.kind for record in records] == [RECORD_RESPONSE, RECORD_ERROR, RECORD_WRITE]
+    assert json.loads(records[0].payload)["pe1"] == controller.payload["pe1"]
+    assert b"503" in records[1].payload
+    assert records[2].payload.endswith(b"/hk1_temp_heat=215")
+
+
+@pytest.mark.asyncio
+async def test_recording_does_not_contain_the_password(tmp_path):
+    """Write URLs and error messages are recorded without the controller password."""
+    path = str(tmp_path / "plant.rec")
+    with MockController(password="s3cret-pw", min_interval=TEST_INTERVAL) as controller:
+        hub = _create_hub(controller)
+        await hub._hass.async_add_executor_job(hub.start_recording, path)
+        assert await hub.fetch_pellematic_data() is True
+        await asyncio.sleep(TEST_INTERVAL * 1.5)
+        await hub.async_send_pellematic_data(215, "hk1", "temp_heat")
+        hub._recorder.record_error(OSError(f"Cannot reach {controller.url}"))
+        hub.stop_recording()
+
+    with open(path, "rb") as file:
+        assert b"s3cret-pw" not in file.read()
+    records = list(read_records(path))
+    assert records[1].payload.decode("utf-8").endswith(f"/{REDACTED}/hk1_temp_heat=215")
+    assert REDACTED.encode("utf-8") in records[2].payload
+
+    # Without a known password only write URLs are redacted
+    recorder = TrafficRecorder(str(tmp_path / "other.rec"))
+    recorder.record_write("http://192.0.2.1:4321/pw/hk1_mode=1")
+    recorder.close()
+    assert next(read_records(recorder.path)).payload == f"http://192.0.2.1:4321/{REDACTED}/hk1_mode=1".encode()
+
+
+@pytest.mark.asyncio
+async def test_replay_replaces_the_network():
+    """During a replay the hub serves recorded data and keeps writes local."""
+    payload = load_fixture("api_response_basic.json")
+    replay = TrafficReplay(
+        [
+            _response(payload, 0.0),
+            TrafficRecord(RECORD_ERROR, 30.0, b"timed out"),
+        ]
+    )
+    hub = pellematic.PellematicHub(StubHass(), "Test", "http://192.0.2.1/pw/all", 30)
+    hub.start_replay(replay)
+
+    assert await hub.fetch_pellematic_data() is True
+    assert hub.data == payload
+    assert await hub.fetch_pellematic_data() is False
+    assert hub.data == payload
+    assert await hub.fetch_pellematic_data() is False
+
+    hub.send_pellematic_data(215, "hk1", "temp_heat")
+    assert replay.writes == ["http://192.0.2.1/pw/hk1_temp_heat=215"]
+
+
+@pytest.mark.asyncio
+async def test_async_replay_scales_recorded_gaps(monkeypatch):
+    """Gaps between recorded polls are divided by the playback speed."""
+    payload = {"pe1": {"L_temp_act": {"val": 1}}}
+    replay = TrafficReplay([_response(payload, t) for t in (0.0, 30.0, 90.0)])
+    hub = pellematic.PellematicHub(StubHass(), "Test", "http://192.0.2.1/pw/all", 30)
+    updates = []
+    hub._sensors.append(lambda: updates.append(hub.data))
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(replay_module.asyncio, "sleep", fake_sleep)
+
+    assert await async_replay(hub, replay, speed=30) == 3
+    assert sleeps == [1.0, 2.0]
+    assert len(updates) == 3
+    assert hub._replay is None
+
+
+@pytest.mark.asyncio
+async def test_simulated_hour_replays_with_state_counts(tmp_path):
+    """An hour of simulated traffic replays through every entity."""
+    path = str(tmp_path / "hour.rec")
+    write_recording(path, itertools.islice(simulate_day(hours=1, interval=60), 60))
+
+    report = await async_run_replay(TrafficReplay.from_file(path))
+
+    assert report.fetches == 60
+    assert report.recorded_seconds == 59 * 60
+    assert report.state_writes == 60 * report.entities
+    assert 0 < report.state_changes < report.state_writes
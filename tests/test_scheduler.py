@@ -0,0 +1,191 @@
+"""Tests for the domain-wide poll scheduler."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact.scheduler import (
+    PollScheduler,
+    async_get_poll_scheduler,
+)
+
+from .benchmarks.ha_stubs import StubHass, patch_time_tracking
+
+INTERVAL = timedelta(seconds=30)
+
+
+async def _noop(_now=None):
+    return None
+
+
+@pytest.fixture
+def hass():
+    hass = StubHass()
+    with patch_time_tracking(hass):
+        yield hass
+
+
+def test_polls_are_spread_across_the_interval(hass):
+    """n hubs poll at i/n of the interval; unregistering rebalances."""
+    scheduler = PollScheduler(hass)
+
+    scheduler.async_register("a", INTERVAL, _noop)
+    unregister_b = scheduler.async_register("b", INTERVAL, _noop)
+    scheduler.async_register("c", INTERVAL, _noop)
+    assert scheduler.offsets == {"a": 0.0, "b": 10.0, "c": 20.0}
+
+    # The pending start timers follow the offsets
+    delays = [timer.interval for timer in hass.timers]
+    assert len(delays) == 3
+    assert (delays[1] - delays[0]) % 30 == pytest.approx(10.0, abs=0.1)
+    assert (delays[2] - delays[0]) % 30 == pytest.approx(20.0, abs=0.1)
+
+    unregister_b()
+    assert scheduler.offsets == {"a": 0.0, "c": 15.0}
+    assert len(hass.timers) == 2
+
+
+@pytest.mark.asyncio
+async def test_start_timer_runs_first_poll_and_starts_interval(hass):
+    """At its phase a poll runs once and continues on an interval timer."""
+    scheduler = PollScheduler(hass)
+    calls = []
+
+    async def action(now=None):
+        calls.append(now)
+
+    unregister = scheduler.async_register("a", INTERVAL, action)
+    start_timer = hass.timers[0]
+
+    await start_timer.fire("now")
+
+    assert calls == ["now"]
+    assert [(timer.interval, timer.one_shot) for timer in hass.timers] == [(INTERVAL, False)]
+
+    await hass.timers[0].fire("later")
+    assert calls == ["now", "later"]
+
+    unregister()
+    assert hass.timers == []
+
+
+@pytest.mark.asyncio
+async def test_concurrent_polls_are_capped(hass):
+    """No more than max_concurrent polls run at the same time."""
+    scheduler = PollScheduler(hass, max_concurrent=2)
+    release = asyncio.Event()
+
+    async def slow(_now=None):
+        await release.wait()
+
+    for name in "abcd":
+        scheduler.async_register(name, INTERVAL, slow)
+    polls = [asyncio.ensure_future(scheduler.async_poll_now(name)) for name in "abcd"]
+    await asyncio.sleep(0)
+    assert scheduler.active == 2
+
+    release.set()
+    assert await asyncio.gather(*polls) == [True] * 4
+    assert scheduler.peak_active == 2
+    assert scheduler.waited == 2
+    assert await scheduler.async_poll_now("unknown") is False
+
+
+@pytest.mark.asyncio
+async def test_hubs_register_with_the_shared_scheduler(hass):
+    """Hubs register their poll with the first sensor and leave with the last."""
+    hubs = [pellematic.PellematicHub(hass, name, "http://192.0.2.1/pw/all", 30) for name in ("Haus", "Halle")]
+
+    def listener():
+        return None
+
+    for hub in hubs:
+        hub.async_add_pellematic_sensor(listener)
+        hub.async_add_pellematic_sensor(listener)
+
+    scheduler = async_get_poll_scheduler(hass)
+    assert scheduler.offsets == {"Haus": 0.0, "Halle": 15.0}
+
+    hubs[0].async_remove_pellematic_sensor(listener)
+    assert set(scheduler.offsets) == {"Haus", "Halle"}
+    hubs[0].async_remove_pellematic_sensor(listener)
+    assert scheduler.offsets == {"Halle": 0.0}
+
+    hubs[1].async_shutdown()
+    assert scheduler.offsets == {}
+    assert hass.timers == []
+
+
+@pytest.mark.asyncio
+async def test_overrunning_poll_skips_ticks(hass):
+    """Ticks during a running poll are skipped and counted, not queued."""
+    scheduler = PollScheduler(hass)
+    release = asyncio.Event()
+    calls = []
+
+    async def slow(now=None):
+        calls.append(now)
+        if now == "tick 1":
+            await release.wait()
+
+    scheduler.async_register("a", INTERVAL, slow)
+    await hass.timers[0].fire("start")
+    interval_timer = hass.timers[0]
+    running = asyncio.ensure_future(interval_timer.fire("tick 1"))
+    await asyncio.sleep(0)
+
+    await interval_timer.fire("tick 2")
+    await interval_timer.fire("tick 3")
+    assert calls == ["start", "tick 1"]
+    assert scheduler.missed == {"a": 2}
+
+    release.set()
+    await running
+    await interval_timer.fire("tick 4")
+    assert calls == ["start", "tick 1", "tick 4"]
+    assert scheduler.durations["a"] is not None
+
+
+@pytest.mark.asyncio
+async def test_fixed_delay_polls_wait_an_interval_after_each_run(hass):
+    """In fixed-delay mode every poll schedules the next one after it ended."""
+    scheduler = PollScheduler(hass)
+    calls = []
+
+    async def action(now=None):
+        calls.append(now)
+
+    unregister = scheduler.async_register("a", INTERVAL, action, fixed_delay=True)
+    await hass.timers[0].fire("start")
+
+    assert calls == ["start"]
+    assert [(timer.interval, timer.one_shot) for timer in hass.timers] == [(INTERVAL, True)]
+
+    await hass.timers[0].fire("next")
+    assert calls == ["start", "next"]
+    assert len(hass.timers) == 1
+
+    unregister()
+    assert hass.timers == []
+
+
+@pytest.mark.asyncio
+async def test_fixed_delay_poll_is_rescheduled_after_it_raised(hass):
+    """An exception from a poll does not end fixed-delay polling."""
+    scheduler = PollScheduler(hass)
+    calls = []
+
+    async def action(now=None):
+        calls.append(now)
+        raise RuntimeError("poll failed")
+
+    scheduler.async_register("a", INTERVAL, action, fixed_delay=True)
+    with pytest.raises(RuntimeError):
+        await hass.timers[0].fire("start")
+    assert [(timer.interval, timer.one_shot) for timer in hass.timers] == [(INTERVAL, True)]
+
+    with pytest.raises(RuntimeError):
+        await hass.timers[0].fire("next")
+    assert calls == ["start", "next"]
+    assert len(hass.timers) == 1
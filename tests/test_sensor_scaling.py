@@ -13,6 +13,7 @@ import pytest
 from custom_components.oekofen_pellematic_compact.dynamic_discovery import (
     discover_all_entities,
 )
+from custom_components.oekofen_pellematic_compact.scaling import factor_precision, scale_value
 from custom_components.oekofen_pellematic_compact.sensor import PellematicSensor
 
 from .conftest import load_fixture
@@ -86,3 +87,37 @@ def test_numeric_scaling_still_works():
 
     # L_ambient = {"val":236, "factor":0.1} -> 23.6 °C
     assert sensors_by_uid["pellematic_system_L_ambient"].state == pytest.approx(23.6)
+
+
+@pytest.mark.parametrize(
+    ("value", "factor", "expected"),
+    [
+        (219, 0.1, "21.9"),
+        ("219", "0.1", "21.9"),
+        (580, 0.1, "58"),
+        (2.5, 1, "2.5"),
+        (2.55, 0.1, "0.255"),
+        (7, 0.5, "3.5"),
+        (12345, 0.01, "123.45"),
+    ],
+)
+def test_scaled_values_have_canonical_representation(value, factor, expected):
+    """Scaling rounds away float noise (219 * 0.1 = 21.900000000000002)."""
+    assert repr(scale_value(value, factor)) == expected
+
+
+def test_sensor_state_and_display_precision_follow_factor():
+    """Sensors report the rounded value and the precision implied by the factor."""
+    api_data = {
+        "pe1": {
+            "L_temp_act": {"val": 219, "unit": "°C", "factor": 0.1},
+            "L_frost_temp": {"val": 12345, "unit": "°C", "factor": 0.01},
+        }
+    }
+    sensors_by_uid = {s._attr_unique_id: s for s in _build_sensors(api_data)}
+
+    temperature = sensors_by_uid["pellematic_pe1_L_temp_act"]
+    assert repr(temperature.state) == "21.9"
+    assert temperature.suggested_display_precision == 1
+    assert sensors_by_uid["pellematic_pe1_L_frost_temp"].suggested_display_precision == 2
+    assert factor_precision("1") == 0
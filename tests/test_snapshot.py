@@ -0,0 +1,142 @@
+"""Tests for the versioned data snapshot (get_snapshot service, websocket command, bus event)."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from homeassistant.const import CONF_NAME
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact.const import DOMAIN, EVENT_SNAPSHOT
+from custom_components.oekofen_pellematic_compact.dynamic_discovery import discover_all_entities
+from custom_components.oekofen_pellematic_compact.sensor import PellematicSensor
+from custom_components.oekofen_pellematic_compact.snapshot import SnapshotStore, normalize_data
+
+from .benchmarks.ha_stubs import StubHass, create_hub
+from .conftest import load_fixture
+from .mock_controller import flatten_payload
+
+
+def _payload(temp=700, mode=1):
+    return {
+        "pe1": {
+            "L_temp_act": {"val": temp, "unit": "°C", "factor": 0.1},
+            "mode": {"val": mode, "format": "0:Aus|1:Auto|2:Ein"},
+            "L_statetext": {"val": "Zündung"},
+        },
+        "error": {"L_error": 0},
+    }
+
+
+def test_normalized_values_are_scaled_and_grouped_by_component():
+    data = load_fixture("api_response_greenmode.json")
+
+    components = normalize_data(data)
+
+    assert "error" not in components
+    assert set(components) == {component for component in data if component != "error"}
+    assert normalize_data(_payload())["pe1"] == {"L_temp_act": 70, "mode": 1, "L_statetext": "Zündung"}
+
+
+def test_values_without_factor_are_scaled_like_the_sensors():
+    """Old firmware payloads (no factor) give the values the sensor entities show."""
+    data = flatten_payload(load_fixture("api_response_basic.json"))
+    hub = create_hub(StubHass(), data)
+
+    components = hub.snapshot.get(hub.data)["components"]
+
+    assert components["pe1"]["L_temp_act"] == 63.3
+    assert components["hk1"]["L_flowtemp_act"] == 60.3
+    for definition in discover_all_entities(data)["sensors"]:
+        sensor = PellematicSensor("Test", hub, {}, definition)
+        assert components[definition["component"]][definition["key"]] == sensor._compute_state()
+    # Without the fallback (a profile guarantees factors) values stay raw
+    assert normalize_data(data)["pe1"]["L_temp_act"] == 633
+
+
+def test_deltas_contain_only_keys_changed_since_a_generation():
+    store = SnapshotStore()
+
+    first = store.get(_payload())
+    assert first["full"] and first["generation"] == 1
+    # Unchanged data (even as a new payload) keeps the generation
+    assert store.get(_payload())["generation"] == 1
+
+    store.get(_payload(temp=705))
+    third = store.get(_payload(temp=705, mode=2))
+    assert third["generation"] == 3
+    assert store.get(_payload(temp=705, mode=2), since_generation=1) == {
+        "generation": 3,
+        "full": False,
+        "components": {"pe1": {"L_temp_act": 70.5, "mode": 2}},
+    }
+    assert store.get(_payload(temp=705, mode=2), since_generation=3)["components"] == {}
+    # A generation the store has not issued yet gets a full snapshot
+    assert store.get(_payload(temp=705, mode=2), since_generation=9)["full"]
+
+
+def test_removed_keys_force_a_full_snapshot_for_older_generations():
+    store = SnapshotStore()
+    store.get(_payload())
+    data = _payload()
+    del data["pe1"]["L_statetext"]
+
+    snapshot = store.get(data, since_generation=1)
+
+    assert snapshot["full"] and snapshot["generation"] == 2
+    assert "L_statetext" not in snapshot["components"]["pe1"]
+    assert not store.get(data, since_generation=2)["full"]
+
+
+def test_service_and_websocket_return_snapshots_by_hub():
+    hass = StubHass()
+    hub = create_hub(hass, _payload())
+    entry = MagicMock(entry_id="entry1", data={CONF_NAME: hub.name})
+    hass.config_entries = MagicMock()
+    hass.config_entries.async_entries = MagicMock(return_value=[entry])
+    hass.data[DOMAIN] = {hub.name: {"hub": hub}}
+
+    snapshots = pellematic.async_get_snapshots(hass)
+    assert snapshots[hub.name]["components"]["pe1"]["L_temp_act"] == 70
+    assert pellematic.async_get_snapshots(hass, "other") == {}
+
+    connection = MagicMock()
+    pellematic.websocket_get_snapshot(
+        hass, connection, {"id": 5, "type": f"{DOMAIN}/get_snapshot", "since_generation": 1}
+    )
+    connection.send_result.assert_called_once_with(
+        5, {hub.name: {"generation": 1, "full": False, "components": {}}}
+    )
+
+
+@pytest.mark.asyncio
+async def test_hub_fires_one_event_per_poll_with_the_changed_values(monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(pellematic, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    hass = StubHass()
+    hass.bus = MagicMock()
+    hub = create_hub(hass, snapshot_event=True)
+    hub._sensors.append(lambda: None)
+    payloads = iter([_payload(), _payload(), _payload(temp=712), _payload(temp=712, mode=2)])
+
+    async def fetch():
+        hub.data = next(payloads)
+        return True
+
+    hub.fetch_pellematic_data = AsyncMock(side_effect=fetch)
+    for poll in range(4):
+        clock.now = poll * 30.0
+        await hub.async_refresh_api_data()
+
+    # No event for the initial state nor for the unchanged second poll
+    assert hass.bus.async_fire.call_count == 2
+    event_type, data = hass.bus.async_fire.call_args_list[0][0]
+    assert event_type == EVENT_SNAPSHOT
+    assert data == {
+        "hub": hub.name,
+        "generation": 2,
+        "changes": [["pe1", "L_temp_act", 71.2]],
+        "duration": 0.0,
+        "interval": 30.0,
+    }
+    assert hass.bus.async_fire.call_args_list[1][0][1]["changes"] == [["pe1", "mode", 2]]
@@ -0,0 +1,55 @@
+"""Tests for the soak harness and the unload cleanup it guards."""
+import pytest
+
+import custom_components.oekofen_pellematic_compact as pellematic
+
+from .benchmarks import soak
+from .benchmarks.ha_stubs import patch_time_tracking
+from .benchmarks.soak import SoakConfig, SoakRunner, async_run_soak
+from .mock_controller import OUTAGE_ERROR, MockController
+
+SHORT_SOAK = SoakConfig(
+    cycles=6,
+    polls_per_cycle=20,
+    outage_setup_every=2,
+    offline_reload_every=3,
+    rediscover_every=2,
+    warmup_cycles=2,
+)
+
+
+@pytest.mark.asyncio
+async def test_short_soak_finds_no_leaks():
+    """Reloads, outages and rediscovery leave nothing behind."""
+    report = await async_run_soak(SHORT_SOAK)
+
+    assert report.ok, report.problems
+    assert report.polls == 4 * SHORT_SOAK.polls_per_cycle
+    assert report.retries > 0
+    assert all(sample.entities for sample in report.samples if sample.cycle % 3 != 2)
+
+
+@pytest.mark.asyncio
+async def test_soak_reports_callback_leak(monkeypatch):
+    """Callbacks that are never unregistered are reported."""
+    monkeypatch.setattr(soak.pellematic.PellematicHub, "async_remove_pellematic_sensor", lambda self, cb: None)
+
+    report = await async_run_soak(SoakConfig(cycles=2, polls_per_cycle=2, outage_setup_every=0, offline_reload_every=0))
+
+    assert not report.ok
+    assert any("callbacks left" in problem for problem in report.problems)
+
+
+@pytest.mark.asyncio
+async def test_unload_cancels_pending_setup_retries():
+    """Unloading while the controller is offline cancels the platform retry timers."""
+    with MockController(min_interval=0) as controller:
+        runner = SoakRunner(SoakConfig(), controller)
+        controller.faults.outage = OUTAGE_ERROR
+        with patch_time_tracking(runner.hass):
+            await runner.setup()
+            assert any(timer.action.__name__ == "retry_setup" for timer in runner.hass.timers)
+
+            await pellematic.async_unload_entry(runner.hass, runner.entry)
+
+    assert runner.hass.timers == []
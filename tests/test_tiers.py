@@ -0,0 +1,137 @@
+"""Tests for tiered per-component polling."""
+import time
+
+import pytest
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact.tiers import PollTiers, component_url, fast_components
+
+from .benchmarks.ha_stubs import StubHass
+from .mock_controller import OUTAGE_ERROR, MockController
+
+TEST_INTERVAL = 0.05
+
+
+def _paths(controller):
+    return [record.path.split("/", 2)[2] for record in controller.requests]
+
+
+def _create_hub(controller, tiers):
+    hub = pellematic.PellematicHub(StubHass(), "Test", controller.url, 30, "utf-8", "?", tiers=tiers)
+    hub._min_fetch_interval = TEST_INTERVAL * 1.5
+    return hub
+
+
+def test_fast_components_and_urls():
+    """Boilers and heating circuits form the fast tier."""
+    data = {"system": {}, "hk1": {}, "hk12": {}, "pe1": {}, "pu1": {}, "weather": {}, "hk_extra": {}}
+    assert fast_components(data) == ["hk1", "hk12", "pe1"]
+    assert component_url("http://host:4321/pw/all", "pe1") == "http://host:4321/pw/pe1"
+    assert component_url("http://host:4321/pw/all?", "hk1_mode=1") == "http://host:4321/pw/hk1_mode=1"
+
+
+def test_plan_falls_back_to_full_fetch():
+    """Full fetches run first, once per refresh interval and when the fast tier does not fit."""
+    tiers = PollTiers(full_refresh_interval=600)
+    data = {"pe1": {}, "hk1": {}, "weather": {}}
+
+    assert tiers.plan(data, 0, 30) is None
+    tiers.record_full_fetch(0, duration=4.0)
+    assert tiers.plan(data, 30, 30) == ["pe1", "hk1"]
+    assert tiers.plan(data, 600, 30) is None
+    # The check uses the current (adaptive) interval
+    assert tiers.plan(data, 30, 5) is None
+
+    crowded = {f"hk{i}": {} for i in range(1, 13)}
+    assert tiers.plan(crowded, 30, 30) is None
+
+
+def test_plan_uses_tiers_only_if_component_requests_cost_less_than_a_full_fetch():
+    """One request per component, 2.5 s apart, must take less than /all."""
+    tiers = PollTiers(full_refresh_interval=600)
+    data = {"pe1": {}, "pe2": {}, "hk1": {}, "weather": {}}
+    tiers.record_full_fetch(0, duration=4.0)
+
+    # Two spacings (5 s) exceed the 4 s of a full fetch
+    assert tiers.plan(data, 30, 60) is None
+    assert tiers.plan({"pe1": {}, "hk1": {}}, 30, 60) == ["pe1", "hk1"]
+
+    # Measured component requests count as well
+    tiers.record_component_fetch(2, 2.0)
+    assert tiers.component_cost(2) == 4.5
+    assert tiers.plan({"pe1": {}, "hk1": {}}, 30, 60) is None
+
+    # Without a measured full fetch (e.g. the payload of the setup) /all is fetched
+    unmeasured = PollTiers(full_refresh_interval=600)
+    unmeasured.record_full_fetch(0)
+    assert unmeasured.plan({"pe1": {}}, 30, 30) is None
+
+
+@pytest.mark.asyncio
+async def test_hub_polls_fast_tier_between_full_fetches():
+    """Between full fetches only the fast components are requested and merged."""
+    with MockController("api_response_basic.json", min_interval=TEST_INTERVAL) as controller:
+        tiers = PollTiers(full_refresh_interval=600)
+        hub = _create_hub(controller, tiers)
+
+        assert await hub.fetch_pellematic_data() is True
+        # A slow /all, as on real controllers
+        tiers.full_fetch_duration = 1.0
+        buffer_before = hub.data["pu1"]
+        controller.set_value("pe1", "L_temp_act", 701)
+        controller.set_value("pu1", "L_tpo_act", 555)
+
+        assert await hub.fetch_pellematic_data() is True
+        assert _paths(controller) == ["all?", "hk1?", "pe1?"]
+        assert hub.data["pe1"]["L_temp_act"]["val"] == 701
+        # The slow tier keeps its values until the next full fetch
+        assert hub.data["pu1"] == buffer_before
+        assert 0 < tiers.component_fetch_duration < 1.0
+
+        tiers.last_full_fetch -= 600
+        assert await hub.fetch_pellematic_data() is True
+        assert _paths(controller)[-1] == "all?"
+        assert hub.data["pu1"]["L_tpo_act"]["val"] == 555
+        assert tiers.as_dict()["full_fetches"] == 2
+        assert tiers.as_dict()["component_fetches"] == 2
+
+
+@pytest.mark.asyncio
+async def test_response_without_its_component_falls_back_to_full_fetch():
+    """A component response is only merged if it contains the component."""
+    tiers = PollTiers(full_refresh_interval=600)
+    hub = pellematic.PellematicHub(StubHass(), "Test", "http://host/pw/all", 30, "utf-8", "?", tiers=tiers)
+    full = {"pe1": {"L_temp_act": {"val": 700}}, "hk1": {"L_flowtemp_act": {"val": 350}}}
+    hub.data = full
+    tiers.record_full_fetch(time.monotonic(), duration=10.0)
+    requests = []
+
+    async def fetch(url):
+        requests.append(url.rsplit("/", 1)[1])
+        # A controller that answers every endpoint with the full payload
+        return {"hk1": {"L_flowtemp_act": {"val": 351}}} if url.endswith("all") else {"system": {}}
+
+    hub._async_fetch_locked = fetch
+
+    assert await hub.fetch_pellematic_data() is True
+    assert requests == ["pe1", "all"]
+    assert hub.data == {"hk1": {"L_flowtemp_act": {"val": 351}}}
+    assert tiers.unsupported and tiers.component_fetches == 0
+
+    assert await hub.fetch_pellematic_data() is True
+    assert requests[-1] == "all"
+
+
+@pytest.mark.asyncio
+async def test_failed_component_fetch_keeps_previous_data():
+    """A failed fast-tier poll leaves the merged data untouched."""
+    with MockController("api_response_basic.json", min_interval=TEST_INTERVAL) as controller:
+        tiers = PollTiers(full_refresh_interval=600)
+        hub = _create_hub(controller, tiers)
+        assert await hub.fetch_pellematic_data() is True
+        tiers.full_fetch_duration = 1.0
+        data = hub.data
+
+        controller.faults.outage = OUTAGE_ERROR
+        assert await hub.fetch_pellematic_data() is False
+        assert hub.data is data
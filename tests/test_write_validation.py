@@ -195,14 +195,14 @@ def test_number_rejects_out_of_range_value(fixture_name):
 
         entity = make_number_entity(number_def)
         entity.hass = MagicMock()
-        entity.hass.async_add_executor_job = AsyncMock()
+        entity._hub.async_send_pellematic_data = AsyncMock()
 
         too_low = entity.native_min_value - 1
         too_high = entity.native_max_value + 1
 
         for bad_value in (too_low, too_high):
             asyncio.run(entity.async_set_native_value(bad_value))
-            entity.hass.async_add_executor_job.assert_not_called(), (
+            entity._hub.async_send_pellematic_data.assert_not_called(), (
                 f"[{fixture_name}] {number_def['component']}.{number_def['key']}: "
                 f"out-of-range value {bad_value} must not reach the API"
             )
@@ -221,11 +221,11 @@ def test_select_rejects_unknown_option(fixture_name):
 
         entity = make_select_entity(select_def)
         entity.hass = MagicMock()
-        entity.hass.async_add_executor_job = AsyncMock()
+        entity._hub.async_send_pellematic_data = AsyncMock()
 
         bad_option = "__nonexistent_option__"
         asyncio.run(entity.async_select_option(bad_option))
-        entity.hass.async_add_executor_job.assert_not_called(), (
+        entity._hub.async_send_pellematic_data.assert_not_called(), (
             f"[{fixture_name}] {select_def['component']}.{select_def['key']}: "
             f"unknown option '{bad_option}' must not reach the API"
         )
@@ -246,18 +246,17 @@ def test_number_accepts_valid_value(fixture_name):
 
         entity = make_number_entity(number_def)
         entity.hass = MagicMock()
-        entity.hass.async_add_executor_job = AsyncMock()
-        entity._hub.send_pellematic_data = MagicMock()
+        entity._hub.async_send_pellematic_data = AsyncMock()
 
         # Pick the midpoint as a definitely-valid value
         mid = (entity.native_min_value + entity.native_max_value) / 2
 
         asyncio.run(entity.async_set_native_value(mid))
-        entity.hass.async_add_executor_job.assert_called_once(), (
+        entity._hub.async_send_pellematic_data.assert_called_once(), (
             f"[{fixture_name}] {number_def['component']}.{number_def['key']}: "
             f"valid midpoint value {mid} should reach the API"
         )
-        entity.hass.async_add_executor_job.reset_mock()
+        entity._hub.async_send_pellematic_data.reset_mock()
 
 
 @pytest.mark.parametrize("fixture_name", FIXTURE_NAMES)
@@ -273,15 +272,15 @@ def test_select_accepts_valid_option(fixture_name):
 
         entity = make_select_entity(select_def)
         entity.hass = MagicMock()
-        entity.hass.async_add_executor_job = AsyncMock()
+        entity._hub.async_send_pellematic_data = AsyncMock()
 
         valid_option = select_def["options"][0]
         asyncio.run(entity.async_select_option(valid_option))
-        entity.hass.async_add_executor_job.assert_called_once(), (
+        entity._hub.async_send_pellematic_data.assert_called_once(), (
             f"[{fixture_name}] {select_def['component']}.{select_def['key']}: "
             f"valid option '{valid_option}' should reach the API"
         )
-        entity.hass.async_add_executor_job.reset_mock()
+        entity._hub.async_send_pellematic_data.reset_mock()
 
 
 # ---------------------------------------------------------------------------
@@ -300,18 +299,60 @@ def test_select_sends_numeric_index_to_api(fixture_name):
         for option in select_def["options"]:
             entity = make_select_entity(select_def)
             entity.hass = MagicMock()
-            entity.hass.async_add_executor_job = AsyncMock()
+            entity._hub.async_send_pellematic_data = AsyncMock()
 
             asyncio.run(entity.async_select_option(option))
 
-            entity.hass.async_add_executor_job.assert_called_once()
-            call_args = entity.hass.async_add_executor_job.call_args[0]
-            # call_args: (send_pellematic_data, value, prefix, key)
-            sent_value = str(call_args[1])
+            entity._hub.async_send_pellematic_data.assert_called_once()
+            call_args = entity._hub.async_send_pellematic_data.call_args[0]
+            # call_args: (value, prefix, key)
+            sent_value = str(call_args[0])
             expected_value = option.split("_", 1)[0]
 
             assert sent_value == expected_value, (
                 f"[{fixture_name}] {select_def['component']}.{select_def['key']} "
                 f"option='{option}': sent '{sent_value}' but expected '{expected_value}'"
             )
-            entity.hass.async_add_executor_job.reset_mock()
+            entity._hub.async_send_pellematic_data.reset_mock()
+
+
+def test_number_round_trips_factor_without_float_noise():
+    """21.9 with factor 0.1 is written as 219 (not 218) and read back as 21.9."""
+    entity = make_number_entity({
+        "component": "hk1",
+        "key": "temp_heat",
+        "name": "Comfort temperature",
+        "factor": 0.1,
+        "min_value": 100,
+        "max_value": 400,
+    })
+    entity.hass = MagicMock()
+    entity._hub.async_send_pellematic_data = AsyncMock()
+
+    asyncio.run(entity.async_set_native_value(21.9))
+    entity._hub.async_send_pellematic_data.assert_called_once_with(219, "hk1", "temp_heat")
+
+    entity._hub.data = {"hk1": {"temp_heat": {"val": 219, "factor": 0.1}}}
+    assert repr(entity._update_native_value()) == "21.9"
+    assert (entity.native_min_value, entity.native_max_value) == (10, 40)
+
+
+def test_select_reads_and_writes_sparse_option_values():
+    """Formats with gaps map values to options by value, not by list position."""
+    select_def = discover_all_entities(
+        {"hk1": {"mode": {"val": 10, "format": "0:Aus|2:Auto|10:Ein"}}}
+    )["selects"][0]
+    entity = make_select_entity(select_def)
+    entity._hub.data = {"hk1": {"mode": {"val": 10}}}
+    entity._hub.async_send_pellematic_data = AsyncMock()
+
+    entity._update_state()
+    assert entity.current_option == "10_ein"
+
+    # A value the format does not know has no option
+    entity._hub.data["hk1"]["mode"]["val"] = 1
+    entity._update_state()
+    assert entity.current_option is None
+
+    asyncio.run(entity.async_select_option("2_auto"))
+    entity._hub.async_send_pellematic_data.assert_called_once_with("2", "hk1", "mode")
@@ -0,0 +1,125 @@
+"""Tests for the adaptive poll interval."""
+import time as real_time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import custom_components.oekofen_pellematic_compact as pellematic
+from custom_components.oekofen_pellematic_compact.adaptive import AdaptiveInterval, extract_key_values
+from custom_components.oekofen_pellematic_compact.const import MIN_FETCH_INTERVAL
+from custom_components.oekofen_pellematic_compact.scheduler import async_get_poll_scheduler
+
+from tests.benchmarks.ha_stubs import StubHass, patch_time_tracking
+
+
+def _payload(temp, state=1, flow=400):
+    return {
+        "system": {"L_ambient": {"val": 50, "factor": 0.1}},
+        "pe1": {"L_temp_act": {"val": temp, "factor": 0.1}, "L_state": {"val": state}},
+        "hk1": {"L_flowtemp_act": {"val": flow, "factor": 0.1}},
+    }
+
+
+def test_extracts_scaled_key_values_and_states():
+    """Key values are scaled by their factor; old firmware values are plain."""
+    values, states = extract_key_values(_payload(633, state=5))
+    assert values == {"pe1.L_temp_act": pytest.approx(63.3), "hk1.L_flowtemp_act": pytest.approx(40.0)}
+    assert states == {"pe1.L_state": 5}
+
+    values, states = extract_key_values({"pe1": {"L_temp_act": "633", "L_state": "5"}, "hk2": {"L_flowtemp_act": "x"}})
+    assert values == {"pe1.L_temp_act": 633.0}
+    assert states == {"pe1.L_state": "5"}
+
+
+def test_quiet_plant_polls_less_often_up_to_the_upper_bound():
+    """Without changes the interval grows by half per poll until the upper bound."""
+    adaptive = AdaptiveInterval(30, min_interval=10, max_interval=60)
+    adaptive.update(_payload(600), 0.1, 0)
+    assert adaptive.update(_payload(600), 0.1, 30) == 45
+    assert adaptive.update(_payload(600), 0.1, 75) == 60
+    assert adaptive.update(_payload(600), 0.1, 135) == 60
+
+
+def test_changing_values_poll_more_often_down_to_the_lower_bound():
+    """Fast changes halve the interval, a state change jumps to the lower bound."""
+    adaptive = AdaptiveInterval(60, min_interval=10, max_interval=300)
+    adaptive.update(_payload(600), 0.1, 0)
+    # 2 K in one minute
+    assert adaptive.update(_payload(620), 0.1, 60) == 30
+    assert adaptive.rate == pytest.approx(2.0)
+    # Slow drift keeps the interval
+    assert adaptive.update(_payload(621), 0.1, 90) == 30
+
+    assert adaptive.update(_payload(621, state=2), 0.1, 120) == 10
+
+
+def test_slow_controller_and_failures_lengthen_the_interval():
+    """Latency caps the request share; failed polls back off."""
+    adaptive = AdaptiveInterval(10, min_interval=10, max_interval=300)
+    assert adaptive.update(_payload(600), 4.0, 0) == 20
+    assert adaptive.update(None, 0.0, 30) == 40
+
+
+def test_lower_bound_respects_controller_minimum():
+    """The interval never drops below the controller's minimum request spacing."""
+    adaptive = AdaptiveInterval(1, min_interval=1, max_interval=0)
+    assert adaptive.min_interval == adaptive.max_interval == adaptive.interval == MIN_FETCH_INTERVAL
+
+
+@pytest.mark.asyncio
+async def test_hub_applies_adaptive_interval_to_its_poll(monkeypatch):
+    """After each poll the hub hands the new interval to the scheduler."""
+    payloads = iter([_payload(600), _payload(650)])
+    monkeypatch.setattr(pellematic, "fetch_data", lambda url, charset, api_suffix: next(payloads))
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(pellematic, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    hass = StubHass()
+    with patch_time_tracking(hass):
+        adaptive = AdaptiveInterval(60, min_interval=10, max_interval=300)
+        hub = pellematic.PellematicHub(hass, "Test", "http://192.0.2.1/pw/all", 60, adaptive=adaptive)
+        hub._min_fetch_interval = 0
+        hub.async_add_pellematic_sensor(lambda: None)
+        scheduler = async_get_poll_scheduler(hass)
+
+        await hub.async_refresh_api_data()
+        assert scheduler._polls["Test"].fixed_delay
+        clock.now = 60.0
+        await hub.async_refresh_api_data()
+
+        assert scheduler._polls["Test"].interval == timedelta(seconds=30)
+        hub.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_latency_is_the_request_time_without_rate_limit_waits(monkeypatch):
+    """The spacing before a request does not count as controller latency."""
+    clock = SimpleNamespace(now=100.0)
+
+    def fetch(url, charset, api_suffix):
+        real_time.sleep(0.05)
+        return _payload(600)
+
+    async def sleep(seconds):
+        clock.now += seconds
+
+    monkeypatch.setattr(pellematic, "fetch_data", fetch)
+    monkeypatch.setattr(pellematic, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    monkeypatch.setattr(pellematic.asyncio, "sleep", sleep)
+    hass = StubHass()
+    with patch_time_tracking(hass):
+        adaptive = AdaptiveInterval(60, min_interval=10, max_interval=300)
+        latencies = []
+        update = adaptive.update
+        adaptive.update = lambda data, latency, timestamp: latencies.append(latency) or update(data, latency, timestamp)
+        hub = pellematic.PellematicHub(hass, "Test", "http://192.0.2.1/pw/all", 60, adaptive=adaptive)
+        hub.async_add_pellematic_sensor(lambda: None)
+        # The previous request was just sent, so the poll waits for the spacing first
+        hub._min_fetch_interval = 60
+        hub._last_fetch_time = clock.now
+
+        await hub.async_refresh_api_data()
+
+        # Not the 60 s wait before the request
+        assert len(latencies) == 1 and 0.05 <= latencies[0] < 1
+        hub.async_shutdown()
@@ -0,0 +1,73 @@
+"""Tests for the shared byte-level charset detector."""
+import random
+
+import pytest
+
+from custom_components.oekofen_pellematic_compact.charset import decode_payload, detect_charset
+
+from tests.benchmarks import harness
+from tests.benchmarks.bench_charset import legacy_detect_charset, payloads
+
+
+@pytest.fixture(scope="module")
+def all_payloads():
+    return payloads()
+
+
+def test_matches_previous_detection_on_fixtures(all_payloads):
+    """UTF-8, ISO-8859-1 and mixed variants of every fixture detect as before."""
+    for name, raw in all_payloads.items():
+        assert detect_charset(raw).charset == legacy_detect_charset(raw), name
+
+
+def test_matches_previous_detection_on_random_bytes():
+    """Random mixes of ASCII, UTF-8 sequences and stray high bytes detect as before."""
+    rng = random.Random(36)
+    pieces = [b"abc", b'"val":', "ä".encode("utf-8"), "€".encode("utf-8"), b"\xe4", b"\xfc", b"\xef\xbf\xbd", b"\xe2\x82"]
+    for _ in range(500):
+        raw = b"".join(rng.choice(pieces) for _ in range(rng.randint(1, 40)))
+        assert detect_charset(raw).charset == legacy_detect_charset(raw), raw
+
+
+def test_confidence_and_invalid_sequences():
+    """Clean payloads are certain, mixed ones report the share decoded as intended."""
+    assert detect_charset(b'{"a": "b"}') == ("utf-8", 1.0, 0)
+    assert detect_charset('{"a": "Wärme"}'.encode("utf-8")) == ("utf-8", 1.0, 0)
+
+    mixed = ("Öko Mödus läuft Wärme Füße größ möglich Überwachung Öl " * 2).encode("utf-8") + "Ä".encode("iso-8859-1")
+    detection = detect_charset(mixed)
+    assert detection.charset == "utf-8"
+    assert detection.invalid == 1
+    assert 0.9 < detection.confidence < 1.0
+
+    detection = detect_charset("Arrêt du brûleur".encode("iso-8859-1"))
+    assert detection.charset == "iso-8859-1"
+    assert detection.confidence == 1.0
+
+
+@pytest.mark.benchmark
+def test_faster_than_previous_detection_on_large_mixed_payload(all_payloads):
+    """On a 10k-key payload with ISO-8859-1 values the detector is much faster."""
+    raw = all_payloads["synthetic_10k/mixed"]
+
+    current, _ = harness.time_call(lambda: detect_charset(raw), repeat=3)
+    legacy, _ = harness.time_call(lambda: legacy_detect_charset(raw), repeat=3)
+
+    assert legacy / current > 3
+
+
+def test_decode_payload_falls_back_to_latin1_per_span():
+    """Only invalid UTF-8 spans are decoded as Latin-1."""
+    raw = '{"a": "Wärme", "b": "'.encode("utf-8") + "Außen °C".encode("iso-8859-1") + b'"}'
+
+    assert decode_payload(raw, "utf-8") == '{"a": "Wärme", "b": "Außen °C"}'
+    assert decode_payload(raw, "ISO-8859-1") == '{"a": "Wärme", "b": "Außen °C"}'
+    # The previous whole-payload decode lost the Latin-1 characters
+    assert raw.decode("utf-8", "ignore") == '{"a": "Wärme", "b": "Auen C"}'
+
+
+def test_decode_payload_respects_other_configured_charsets():
+    """Explicitly configured codecs other than UTF-8/Latin-1 decode as configured."""
+    raw = "Preis 5 €".encode("windows-1252")
+
+    assert decode_payload(raw, "windows-1252") == "Preis 5 €"
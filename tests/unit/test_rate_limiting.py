@@ -1,6 +1,7 @@
 """Tests for API rate limiting behavior."""
 import itertools
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
 
 import custom_components.oekofen_pellematic_compact as pellematic
@@ -10,7 +11,14 @@ import custom_components.oekofen_pellematic_compact as pellematic
 async def test_fetch_rate_limited_on_back_to_back_calls(monkeypatch):
     """Ensure back-to-back fetches wait to honor the 2.5s minimum interval."""
     hass = MagicMock()
-    hass.async_add_executor_job = AsyncMock(return_value={"system": {}})
+    hass.data = {}
+    fetch_calls = []
+
+    def fake_fetch_data(url, charset, api_suffix):
+        fetch_calls.append(url)
+        return {"system": {}}
+
+    monkeypatch.setattr(pellematic, "fetch_data", fake_fetch_data)
 
     hub = pellematic.PellematicHub(
         hass=hass,
@@ -23,7 +31,8 @@ async def test_fetch_rate_limited_on_back_to_back_calls(monkeypatch):
     hub._min_fetch_interval = 2.5
 
     monotonic_values = itertools.chain([100.0, 100.0, 101.0, 102.5], itertools.repeat(102.5))
-    monkeypatch.setattr(pellematic.time, "monotonic", lambda: next(monotonic_values))
+    # Only the hub's clock: the event loop needs the real one for the I/O executor
+    monkeypatch.setattr(pellematic, "time", SimpleNamespace(monotonic=lambda: next(monotonic_values)))
 
     sleep_mock = AsyncMock()
     monkeypatch.setattr(pellematic.asyncio, "sleep", sleep_mock)
@@ -31,7 +40,7 @@ async def test_fetch_rate_limited_on_back_to_back_calls(monkeypatch):
     assert await hub.fetch_pellematic_data() is True
     assert await hub.fetch_pellematic_data() is True
 
-    assert hass.async_add_executor_job.await_count == 2
+    assert len(fetch_calls) == 2
     sleep_mock.assert_awaited_once()
     wait_time = sleep_mock.await_args.args[0]
     assert wait_time == pytest.approx(1.5, rel=1e-3)